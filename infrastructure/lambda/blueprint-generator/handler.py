@@ -0,0 +1,143 @@
+"""
+Blueprint Generator Lambda
+
+Generates the dimensioned multi-page blueprint PDF for a DXF using
+tools/blueprint-generator/generate_blueprint.py (copied into the image).
+Invoked synchronously by the quote processor for DXF attachments and for
+DWG attachments once they are converted.
+
+The DXF is read and the PDF rendered in memory; the PDF is written to S3 and
+returned as a reference, so large blueprints stay under the 6MB response limit.
+"""
+
+import gzip
+import json
+import os
+import time
+import uuid
+
+import boto3
+
+import generate_blueprint
+
+s3 = boto3.client('s3')
+
+# Key prefix for blueprints when the caller does not choose an output key
+OUTPUT_PREFIX = 'blueprints/'
+
+# Geometry analyses of recently seen DXFs, reused while the container is warm. PDFs are
+# always rendered fresh, since the title page names the part and the generation date.
+analysis_cache = generate_blueprint.AnalysisCache(
+    os.environ.get('BLUEPRINT_CACHE_DIR', '/tmp/blueprint-cache'),
+    float(os.environ.get('BLUEPRINT_CACHE_MAX_MB', '128')))
+
+# Prime matplotlib fonts and the DXF renderer during Lambda init
+try:
+    init_start = time.perf_counter()
+    generate_blueprint.init_batch_worker()
+    print(f"Warmup: blueprint={round((time.perf_counter() - init_start) * 1000)}ms")
+except Exception as e:
+    print(f"Warmup for blueprint failed: {e}")
+
+
+def lambda_handler(event, context):
+    """
+    Generate a blueprint PDF from a DXF file in S3.
+
+    Input event:
+    {
+        "bucket": "bucket-name",
+        "key": "converted/<id>/file.dxf",  # gzip-compressed if stored with ContentEncoding=gzip
+        "filename": "Part_12.dxf",  # optional, names the part (default: key basename)
+        "thickness": 0.25,  # optional, material thickness in inches (default 0.5)
+        "output_key": "blueprints/<id>/file_blueprint.pdf",  # optional, generated if omitted
+        "png": true  # optional, also write the dimensioned view as a PNG
+    }
+
+    Returns:
+    {
+        "success": true,
+        "blueprint_bucket": "bucket-name",
+        "blueprint_key": "blueprints/<id>/file_blueprint.pdf",
+        "blueprint_filename": "Part_12_blueprint.pdf",
+        "blueprint_size": 123456,
+        "png_key": "blueprints/<id>/file_blueprint.png",  # only when png was requested
+        "part_name": "PART 12",
+        "dimensions": 53,
+        "analysis_cached": false
+    }
+    """
+    print(f"Received event: {json.dumps(event)}")
+
+    bucket = event.get('bucket')
+    key = event.get('key')
+
+    if not bucket or not key:
+        return {
+            'success': False,
+            'error': 'Missing bucket or key in event'
+        }
+
+    filename = event.get('filename') or os.path.basename(key)
+    stem = os.path.splitext(filename)[0]
+    output_key = event.get('output_key') or f"{OUTPUT_PREFIX}{uuid.uuid4()}/{stem}_blueprint.pdf"
+
+    try:
+        obj = s3.get_object(Bucket=bucket, Key=key)
+        dxf_content = obj['Body'].read()
+        # DWG converter output may be stored with ContentEncoding=gzip
+        if obj.get('ContentEncoding') == 'gzip':
+            dxf_content = gzip.decompress(dxf_content)
+        print(f"Downloaded {key} ({len(dxf_content)} bytes)")
+    except Exception as e:
+        print(f"Failed to download from S3: {e}")
+        return {
+            'success': False,
+            'error': f'Failed to download file: {str(e)}'
+        }
+
+    start = time.perf_counter()
+    try:
+        data = generate_blueprint.blueprint_data(
+            dxf_content, generate_blueprint.default_part_name(filename),
+            thickness=float(event.get('thickness') or 0.5), cache=analysis_cache)
+        pdf_content = generate_blueprint.blueprint_pdf(data)
+        png_content = generate_blueprint.blueprint_png(data) if event.get('png') else None
+    except Exception as e:
+        print(f"Blueprint generation failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return {
+            'success': False,
+            'error': f'Blueprint generation failed: {str(e)}'
+        }
+    elapsed_ms = round((time.perf_counter() - start) * 1000)
+
+    response = {
+        'success': True,
+        'blueprint_bucket': bucket,
+        'blueprint_key': output_key,
+        'blueprint_filename': f"{stem}_blueprint.pdf",
+        'blueprint_size': len(pdf_content),
+        'part_name': data.part_name,
+        'dimensions': len(data.dimensions),
+        'analysis_cached': data.analysis_cached,
+    }
+
+    try:
+        s3.put_object(Bucket=bucket, Key=output_key, Body=pdf_content, ContentType='application/pdf')
+        if png_content:
+            response['png_key'] = os.path.splitext(output_key)[0] + '.png'
+            s3.put_object(Bucket=bucket, Key=response['png_key'], Body=png_content,
+                          ContentType='image/png')
+    except Exception as e:
+        print(f"Failed to upload blueprint to S3: {e}")
+        return {
+            'success': False,
+            'error': f'Failed to upload blueprint: {str(e)}'
+        }
+
+    print(f"Blueprint generated in {elapsed_ms}ms (analysis cache {'hit' if data.analysis_cached else 'miss'}): "
+          f"{data.part_name}, {len(data.dimensions)} dimensions, {len(pdf_content)} bytes -> s3://{bucket}/{output_key}")
+
+    return response
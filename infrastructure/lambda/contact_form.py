@@ -6,7 +6,14 @@ import html
 import urllib.request
 import urllib.parse
 import base64
+import binascii
+import hashlib
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -37,8 +44,74 @@ ALLOWED_EXTENSIONS = {
 
 MAX_ATTACHMENT_SIZE = 10 * 1024 * 1024  # 10MB
 
-
-def verify_recaptcha(token):
+# Direct-to-S3 uploads: the browser POSTs the file to a staging key, then submits the key
+UPLOAD_PREFIX = 'uploads/'
+UPLOAD_URL_EXPIRY = 300  # seconds
+# Inline base64 attachments are decoded and uploaded in parts of this size (S3 minimum is 5MB)
+UPLOAD_PART_SIZE = 5 * 1024 * 1024
+BASE64_IGNORED_CHARS = re.compile(r'[^A-Za-z0-9+/=]')
+UPLOAD_KEY_PATTERN = re.compile(r'^uploads/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\.[a-z0-9_]+$')
+
+# Per-call timeouts for outbound lookups, and the shared budget for running them together
+RECAPTCHA_TIMEOUT = 5
+IP_LOOKUP_TIMEOUT = 3
+SECURITY_LOOKUP_DEADLINE = 6
+
+# Module-level so worker threads are reused across warm invocations
+lookup_executor = ThreadPoolExecutor(max_workers=2)
+
+# IP geolocation cache limits (failed lookups are cached for a shorter time)
+IP_CACHE_MAX_SIZE = 1024
+IP_CACHE_TTL = 6 * 60 * 60  # 6 hours
+IP_CACHE_NEGATIVE_TTL = 5 * 60  # 5 minutes
+
+
+class LocationCache:
+    """
+    Bounded LRU cache with per-entry expiry.
+
+    Lives at module level so entries survive across invocations in a warm
+    Lambda container. Thread-safe because lookups run on worker threads.
+    """
+
+    def __init__(self, max_size, clock=time.monotonic):
+        self.max_size = max_size
+        self.clock = clock
+        self.entries = OrderedDict()  # key -> (value, expires_at)
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value, or None if missing or expired."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] > self.clock():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, ttl):
+        """Store a value for ttl seconds, evicting the least recently used entry if full."""
+        with self.lock:
+            self.entries[key] = (value, self.clock() + ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def stats(self):
+        """Return a short hit/miss summary for log lines."""
+        return f'hits={self.hits} misses={self.misses} size={len(self.entries)}'
+
+
+ip_location_cache = LocationCache(IP_CACHE_MAX_SIZE)
+
+
+def verify_recaptcha(token, timeout=RECAPTCHA_TIMEOUT):
     """Verify reCAPTCHA token with Google and return score."""
     secret_key = os.environ.get('RECAPTCHA_SECRET_KEY')
 
@@ -57,7 +130,7 @@ def verify_recaptcha(token):
         }).encode('utf-8')
 
         req = urllib.request.Request(RECAPTCHA_VERIFY_URL, data=data, method='POST')
-        with urllib.request.urlopen(req, timeout=5) as response:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
             result = json.loads(response.read().decode('utf-8'))
 
         success = result.get('success', False)
@@ -78,14 +151,28 @@ def verify_recaptcha(token):
         return True, 0.5
 
 
-def lookup_ip_location(ip):
-    """Look up geographic location for an IP address."""
+def lookup_ip_location(ip, timeout=IP_LOOKUP_TIMEOUT):
+    """Look up geographic location for an IP address, using the warm-container cache."""
     if not ip or ip == 'unknown':
         return 'Unknown'
 
+    cached = ip_location_cache.get(ip)
+    if cached is not None:
+        return cached
+
+    location, success = fetch_ip_location(ip, timeout)
+    ip_location_cache.put(ip, location, IP_CACHE_TTL if success else IP_CACHE_NEGATIVE_TTL)
+    return location
+
+
+def fetch_ip_location(ip, timeout=IP_LOOKUP_TIMEOUT):
+    """
+    Query ip-api.com for an IP address.
+    Returns (location, success) where success is False for failed lookups.
+    """
     try:
         req = urllib.request.Request(f'{IP_GEOLOCATION_URL}{ip}?fields=status,city,regionName,country')
-        with urllib.request.urlopen(req, timeout=3) as response:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
             result = json.loads(response.read().decode('utf-8'))
 
         if result.get('status') == 'success':
@@ -93,11 +180,243 @@ def lookup_ip_location(ip):
             region = result.get('regionName', '')
             country = result.get('country', '')
             parts = [p for p in [city, region, country] if p]
-            return ', '.join(parts) if parts else 'Unknown'
-        return 'Unknown'
+            return (', '.join(parts) if parts else 'Unknown'), True
+        return 'Unknown', False
     except Exception as e:
         print(f'IP geolocation lookup failed: {e}')
-        return 'Unknown'
+        return 'Unknown', False
+
+
+def _timed_call(func, *args):
+    """Run func(*args) and return (result, elapsed_ms)."""
+    start = time.monotonic()
+    result = func(*args)
+    return result, (time.monotonic() - start) * 1000
+
+
+def run_security_lookups(client_ip, recaptcha_token, deadline=SECURITY_LOOKUP_DEADLINE):
+    """
+    Run IP geolocation and reCAPTCHA verification concurrently.
+
+    Both calls share one overall deadline, so request latency is bounded by the
+    slowest call rather than their sum. A call that misses the deadline falls back
+    to the same result it would return on error.
+
+    Returns (client_ip_location, (is_valid, score), timings) where timings maps
+    each call name to elapsed milliseconds (None if it missed the deadline).
+    """
+    start = time.monotonic()
+    ip_future = lookup_executor.submit(
+        _timed_call, lookup_ip_location, client_ip, min(IP_LOOKUP_TIMEOUT, deadline))
+    recaptcha_future = lookup_executor.submit(
+        _timed_call, verify_recaptcha, recaptcha_token, min(RECAPTCHA_TIMEOUT, deadline))
+
+    timings = {}
+
+    try:
+        client_ip_location, timings['ip_location'] = ip_future.result(timeout=deadline)
+    except FutureTimeoutError:
+        print(f'IP geolocation lookup exceeded {deadline}s deadline')
+        client_ip_location, timings['ip_location'] = 'Unknown', None
+
+    remaining = max(0, deadline - (time.monotonic() - start))
+    try:
+        recaptcha_result, timings['recaptcha'] = recaptcha_future.result(timeout=remaining)
+    except FutureTimeoutError:
+        # Fail open, matching verify_recaptcha's behaviour on errors
+        print(f'reCAPTCHA verification exceeded {deadline}s deadline')
+        recaptcha_result, timings['recaptcha'] = (True, 0.5), None
+
+    timings['total'] = (time.monotonic() - start) * 1000
+    return client_ip_location, recaptcha_result, timings
+
+
+def format_timings(timings):
+    """Format a timings dict as 'name=12ms' pairs for log lines."""
+    return ' '.join(
+        f'{name}={ms:.0f}ms' if ms is not None else f'{name}=timeout'
+        for name, ms in timings.items()
+    )
+
+
+class AttachmentTooLarge(Exception):
+    """Raised when a streamed attachment crosses MAX_ATTACHMENT_SIZE."""
+
+
+def decoded_base64_size(content):
+    """Return the decoded length of base64 text without decoding it (whitespace ignored)."""
+    chars = len(content) - sum(content.count(c) for c in ' \t\r\n')
+    tail = content[-8:].rstrip()
+    padding = len(tail) - len(tail.rstrip('='))
+    return max(0, chars * 3 // 4 - padding)
+
+
+def iter_base64_blocks(content, block_size):
+    """
+    Decode base64 text incrementally, yielding at most block_size bytes at a time.
+    Raises binascii.Error if the text is malformed.
+    """
+    chunk_chars = max(4, block_size // 3 * 4)
+    pending = ''
+    for start in range(0, len(content), chunk_chars):
+        chunk = pending + BASE64_IGNORED_CHARS.sub('', content[start:start + chunk_chars])
+        usable = len(chunk) // 4 * 4
+        pending = chunk[usable:]
+        if usable:
+            yield base64.b64decode(chunk[:usable])
+    if pending:
+        yield base64.b64decode(pending)
+
+
+def upload_base64_attachment(content, bucket, key, metadata,
+                             max_size=MAX_ATTACHMENT_SIZE, part_size=UPLOAD_PART_SIZE):
+    """
+    Decode a base64 attachment and upload it to S3 without holding the whole file in memory.
+
+    Small files are sent with a single put_object; larger ones go through a multipart
+    upload one part at a time, so peak memory stays around one part regardless of size.
+    Any failure aborts the multipart upload.
+
+    Returns (size_bytes, sha256_hex). Raises AttachmentTooLarge as soon as the running
+    size crosses max_size, or binascii.Error for malformed base64.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    buffer = bytearray()
+    upload_id = None
+    parts = []
+
+    def upload_buffered_part(length):
+        part_number = len(parts) + 1
+        response = s3.upload_part(
+            Bucket=bucket, Key=key, UploadId=upload_id,
+            PartNumber=part_number, Body=bytes(buffer[:length])
+        )
+        parts.append({'PartNumber': part_number, 'ETag': response['ETag']})
+        del buffer[:length]
+
+    try:
+        for block in iter_base64_blocks(content, part_size):
+            size += len(block)
+            if size > max_size:
+                raise AttachmentTooLarge(f'Attachment exceeds {max_size} bytes')
+            digest.update(block)
+            buffer += block
+
+            while len(buffer) >= part_size:
+                if upload_id is None:
+                    upload_id = s3.create_multipart_upload(
+                        Bucket=bucket, Key=key, Metadata=metadata)['UploadId']
+                upload_buffered_part(part_size)
+
+        if upload_id is None:
+            # A full-object SHA-256 lets the quote processor key its artifact cache without
+            # re-hashing the file (multipart uploads only get a composite checksum)
+            s3.put_object(Bucket=bucket, Key=key, Body=bytes(buffer), Metadata=metadata,
+                          ChecksumAlgorithm='SHA256')
+        else:
+            if buffer:
+                upload_buffered_part(len(buffer))
+            s3.complete_multipart_upload(
+                Bucket=bucket, Key=key, UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+    except Exception:
+        if upload_id is not None:
+            try:
+                s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+            except ClientError as abort_err:
+                print(f'Warning: Failed to abort multipart upload for {key}: {abort_err}')
+        raise
+
+    return size, digest.hexdigest()
+
+
+def get_file_extension(filename):
+    """Get lowercase file extension including the dot."""
+    if '.' in filename:
+        return '.' + filename.rsplit('.', 1)[1].lower()
+    return ''
+
+
+def upload_url_handler(event, context):
+    """
+    Issue a presigned POST so the browser can upload a quote attachment straight to S3.
+
+    Request body: {"filename": "part.step", "size": 12345}
+    Response: {"url": ..., "fields": {...}, "key": "uploads/<uuid>.step", "maxSize": ...}
+
+    The returned key is then sent as attachment.key in the contact form submission.
+    """
+    allowed_origin = os.environ.get('ALLOWED_ORIGIN', '*')
+    headers = {
+        'Content-Type': 'application/json',
+        'Access-Control-Allow-Origin': allowed_origin,
+        'Access-Control-Allow-Headers': 'Content-Type',
+        'Access-Control-Allow-Methods': 'POST, OPTIONS'
+    }
+
+    if event.get('requestContext', {}).get('http', {}).get('method') == 'OPTIONS':
+        return {'statusCode': 200, 'headers': headers, 'body': ''}
+
+    try:
+        body = json.loads(event.get('body') or '{}')
+
+        filename = body.get('filename', '')
+        ext = get_file_extension(filename)
+        if ext not in ALLOWED_EXTENSIONS:
+            print(f'Rejected upload URL request for extension: {ext}')
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'error': f'File type not allowed: {ext}'})
+            }
+
+        size = body.get('size')
+        if isinstance(size, int) and size > MAX_ATTACHMENT_SIZE:
+            print(f'Rejected upload URL request: size {size} exceeds max {MAX_ATTACHMENT_SIZE}')
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'error': 'File size exceeds 10MB limit'})
+            }
+
+        attachments_bucket = os.environ.get('ATTACHMENTS_BUCKET')
+        if not attachments_bucket:
+            print('Error: ATTACHMENTS_BUCKET not configured')
+            return {
+                'statusCode': 500,
+                'headers': headers,
+                'body': json.dumps({'error': 'Server configuration error'})
+            }
+
+        upload_key = f'{UPLOAD_PREFIX}{uuid.uuid4()}{ext}'
+        presigned = s3.generate_presigned_post(
+            Bucket=attachments_bucket,
+            Key=upload_key,
+            Conditions=[['content-length-range', 1, MAX_ATTACHMENT_SIZE]],
+            ExpiresIn=UPLOAD_URL_EXPIRY
+        )
+        print(f'Issued upload URL for {filename} -> s3://{attachments_bucket}/{upload_key}')
+
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': json.dumps({
+                'url': presigned['url'],
+                'fields': presigned['fields'],
+                'key': upload_key,
+                'maxSize': MAX_ATTACHMENT_SIZE,
+            })
+        }
+
+    except Exception as e:
+        print(f'Error: {e}')
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': json.dumps({'error': 'An unexpected error occurred.'})
+        }
 
 
 def handler(event, context):
@@ -123,21 +442,21 @@ def handler(event, context):
         forwarded_for = headers_in.get('x-forwarded-for', headers_in.get('X-Forwarded-For', ''))
         client_ip = forwarded_for.split(',')[0].strip() if forwarded_for else 'unknown'
         user_agent = headers_in.get('user-agent', headers_in.get('User-Agent', 'unknown'))
-        client_ip_location = lookup_ip_location(client_ip)
-        print(f'Request from IP: {client_ip} ({client_ip_location}) | User-Agent: {user_agent}')
 
-        # Honeypot check - if filled, silently succeed (bot trap)
+        # Honeypot check - if filled, silently succeed (bot trap) without spending lookups on it
         if body.get('website', ''):
-            print('Honeypot triggered - bot detected')
+            print(f'Honeypot triggered - bot detected | IP: {client_ip} | User-Agent: {user_agent}')
             return {
                 'statusCode': 200,
                 'headers': headers,
                 'body': json.dumps({'message': 'Message sent successfully'})
             }
 
-        # Verify reCAPTCHA token
+        # Geolocate the IP and verify reCAPTCHA in parallel
         recaptcha_token = body.get('recaptchaToken')
-        is_valid, score = verify_recaptcha(recaptcha_token)
+        client_ip_location, (is_valid, score), timings = run_security_lookups(client_ip, recaptcha_token)
+        print(f'Request from IP: {client_ip} ({client_ip_location}) | User-Agent: {user_agent} | '
+              f'Lookups: {format_timings(timings)} | IP cache: {ip_location_cache.stats()}')
 
         score_threshold = float(os.environ.get('RECAPTCHA_SCORE_THRESHOLD', '0.5'))
 
@@ -237,12 +556,14 @@ def handler(event, context):
         if attachment:
             # FLOW B: With attachment - upload to S3 for virus scanning
             # Email will be sent by quote_processor Lambda after scan completes
+            # The file either arrives inline (base64 'content') or was already uploaded
+            # by the browser via a presigned POST from upload_url_handler ('key')
 
             # Validate attachment
             filename = attachment.get('filename', '')
             if filename:
                 # Check file extension
-                ext = '.' + filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+                ext = get_file_extension(filename)
                 if ext not in ALLOWED_EXTENSIONS:
                     print(f'Rejected file with extension: {ext}')
                     return {
@@ -251,23 +572,32 @@ def handler(event, context):
                         'body': json.dumps({'error': f'File type not allowed: {ext}'})
                     }
 
-            # Decode and check size
-            try:
-                file_content = base64.b64decode(attachment.get('content', ''))
-                if len(file_content) > MAX_ATTACHMENT_SIZE:
-                    print(f'Rejected file: size {len(file_content)} exceeds max {MAX_ATTACHMENT_SIZE}')
+            upload_key = attachment.get('key')
+            if upload_key:
+                if not UPLOAD_KEY_PATTERN.match(upload_key) or get_file_extension(upload_key) not in ALLOWED_EXTENSIONS:
+                    print(f'Rejected invalid upload key: {upload_key}')
+                    return {
+                        'statusCode': 400,
+                        'headers': headers,
+                        'body': json.dumps({'error': 'Invalid file attachment'})
+                    }
+            else:
+                # Check size before decoding - content is decoded while it streams to S3
+                file_content_b64 = attachment.get('content', '')
+                if not isinstance(file_content_b64, str):
+                    return {
+                        'statusCode': 400,
+                        'headers': headers,
+                        'body': json.dumps({'error': 'Invalid file attachment'})
+                    }
+                file_size = decoded_base64_size(file_content_b64)
+                if file_size > MAX_ATTACHMENT_SIZE:
+                    print(f'Rejected file: size {file_size} exceeds max {MAX_ATTACHMENT_SIZE}')
                     return {
                         'statusCode': 400,
                         'headers': headers,
                         'body': json.dumps({'error': 'File size exceeds 10MB limit'})
                     }
-            except Exception as decode_err:
-                print(f'Failed to decode attachment: {decode_err}')
-                return {
-                    'statusCode': 400,
-                    'headers': headers,
-                    'body': json.dumps({'error': 'Invalid file attachment'})
-                }
 
             # Upload to S3 for virus scanning
             attachments_bucket = os.environ.get('ATTACHMENTS_BUCKET')
@@ -307,21 +637,76 @@ def handler(event, context):
                 'submitted-at': datetime.utcnow().isoformat(),
             }
 
-            try:
-                s3.put_object(
-                    Bucket=attachments_bucket,
-                    Key=s3_key,
-                    Body=file_content,
-                    Metadata=metadata
-                )
-                print(f'Uploaded attachment to s3://{attachments_bucket}/{s3_key} ({len(file_content)} bytes)')
-            except ClientError as s3_err:
-                print(f'Failed to upload to S3: {s3_err}')
-                return {
-                    'statusCode': 500,
-                    'headers': headers,
-                    'body': json.dumps({'error': 'Failed to process attachment. Please try again.'})
-                }
+            if upload_key:
+                # Browser already uploaded the file - check it and move it into quotes/ server-side
+                try:
+                    head = s3.head_object(Bucket=attachments_bucket, Key=upload_key)
+                except ClientError as head_err:
+                    print(f'Uploaded file not found: {upload_key}: {head_err}')
+                    return {
+                        'statusCode': 400,
+                        'headers': headers,
+                        'body': json.dumps({'error': 'Uploaded file not found. Please try again.'})
+                    }
+
+                if head['ContentLength'] > MAX_ATTACHMENT_SIZE:
+                    print(f'Rejected file: size {head["ContentLength"]} exceeds max {MAX_ATTACHMENT_SIZE}')
+                    return {
+                        'statusCode': 400,
+                        'headers': headers,
+                        'body': json.dumps({'error': 'File size exceeds 10MB limit'})
+                    }
+
+                try:
+                    s3.copy_object(
+                        Bucket=attachments_bucket,
+                        Key=s3_key,
+                        CopySource={'Bucket': attachments_bucket, 'Key': upload_key},
+                        Metadata=metadata,
+                        MetadataDirective='REPLACE',
+                        ChecksumAlgorithm='SHA256'
+                    )
+                    print(f'Copied s3://{attachments_bucket}/{upload_key} to {s3_key} ({head["ContentLength"]} bytes)')
+                except ClientError as s3_err:
+                    print(f'Failed to copy uploaded file: {s3_err}')
+                    return {
+                        'statusCode': 500,
+                        'headers': headers,
+                        'body': json.dumps({'error': 'Failed to process attachment. Please try again.'})
+                    }
+
+                try:
+                    s3.delete_object(Bucket=attachments_bucket, Key=upload_key)
+                except ClientError as del_err:
+                    # Lifecycle rule on uploads/ cleans up anything left behind
+                    print(f'Warning: Failed to delete {upload_key}: {del_err}')
+            else:
+                try:
+                    uploaded_size, sha256 = upload_base64_attachment(
+                        file_content_b64, attachments_bucket, s3_key, metadata)
+                    print(f'Uploaded attachment to s3://{attachments_bucket}/{s3_key} '
+                          f'({uploaded_size} bytes, sha256={sha256})')
+                except AttachmentTooLarge:
+                    print(f'Rejected file: decoded size exceeds max {MAX_ATTACHMENT_SIZE}')
+                    return {
+                        'statusCode': 400,
+                        'headers': headers,
+                        'body': json.dumps({'error': 'File size exceeds 10MB limit'})
+                    }
+                except (binascii.Error, ValueError) as decode_err:
+                    print(f'Failed to decode attachment: {decode_err}')
+                    return {
+                        'statusCode': 400,
+                        'headers': headers,
+                        'body': json.dumps({'error': 'Invalid file attachment'})
+                    }
+                except ClientError as s3_err:
+                    print(f'Failed to upload to S3: {s3_err}')
+                    return {
+                        'statusCode': 500,
+                        'headers': headers,
+                        'body': json.dumps({'error': 'Failed to process attachment. Please try again.'})
+                    }
 
             # Return success - email will be sent after virus scan completes
             return {
@@ -3,17 +3,26 @@ DWG to DXF Converter Lambda
 
 Converts DWG files to DXF format using LibreDWG.
 Invoked synchronously by the quote processor when a DWG file is uploaded.
+
+The DXF is written to S3 (optionally gzip-compressed) rather than returned in
+the invoke payload, which keeps large drawings under the 6MB response limit.
 """
 
+import gzip
+import hashlib
+import shutil
 import subprocess
 import tempfile
 import os
+import uuid
 import boto3
-import base64
 import json
 
 s3 = boto3.client('s3')
 
+# Read size used when hashing and compressing the converted DXF
+COPY_CHUNK_SIZE = 1024 * 1024
+
 
 def lambda_handler(event, context):
     """
@@ -22,14 +31,20 @@ def lambda_handler(event, context):
     Input event:
     {
         "bucket": "bucket-name",
-        "key": "quotes/file.dwg"
+        "key": "quotes/file.dwg",
+        "output_key": "converted/<id>/file.dxf",  # optional, generated if omitted
+        "compress": true  # optional, gzip the DXF (stored with ContentEncoding=gzip)
     }
 
     Returns:
     {
         "success": true,
-        "dxf_content": "<base64-encoded DXF>",
-        "dxf_filename": "file.dxf"
+        "dxf_bucket": "bucket-name",
+        "dxf_key": "converted/<id>/file.dxf",
+        "dxf_filename": "file.dxf",
+        "dxf_size": 123456,  # uncompressed bytes
+        "dxf_sha256": "<hex digest of uncompressed DXF>",
+        "compressed": true
     }
     """
     print(f"Received event: {json.dumps(event)}")
@@ -104,18 +119,58 @@ def lambda_handler(event, context):
                 'error': 'DXF output file not created'
             }
 
-        # Read converted DXF
-        with open(dxf_path, 'rb') as f:
-            dxf_content = f.read()
-
         # Generate DXF filename from original
         original_filename = os.path.basename(key)
         dxf_filename = os.path.splitext(original_filename)[0] + '.dxf'
+        output_key = event.get('output_key') or f"converted/{uuid.uuid4()}/{dxf_filename}"
+        compress = bool(event.get('compress', False))
+
+        # Stream the DXF to S3 without loading it into memory
+        try:
+            dxf_size, dxf_sha256 = file_size_and_sha256(dxf_path)
 
-        print(f"Conversion successful: {dxf_filename} ({len(dxf_content)} bytes)")
+            upload_path = dxf_path
+            extra_args = {'ContentType': 'application/dxf'}
+            if compress:
+                upload_path = dxf_path + '.gz'
+                gzip_file(dxf_path, upload_path)
+                extra_args['ContentEncoding'] = 'gzip'
+
+            s3.upload_file(upload_path, bucket, output_key, ExtraArgs=extra_args)
+            stored_size = os.path.getsize(upload_path)
+        except Exception as e:
+            print(f"Failed to upload DXF to S3: {e}")
+            return {
+                'success': False,
+                'error': f'Failed to upload DXF: {str(e)}'
+            }
+
+        print(f"Conversion successful: {dxf_filename} ({dxf_size} bytes, "
+              f"{stored_size} stored) -> s3://{bucket}/{output_key}")
 
         return {
             'success': True,
-            'dxf_content': base64.b64encode(dxf_content).decode('utf-8'),
-            'dxf_filename': dxf_filename
+            'dxf_bucket': bucket,
+            'dxf_key': output_key,
+            'dxf_filename': dxf_filename,
+            'dxf_size': dxf_size,
+            'dxf_sha256': dxf_sha256,
+            'compressed': compress
         }
+
+
+def file_size_and_sha256(path):
+    """Return (size_bytes, sha256_hex) for a file, reading it in chunks."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b''):
+            digest.update(chunk)
+            size += len(chunk)
+    return size, digest.hexdigest()
+
+
+def gzip_file(src_path, dest_path):
+    """Gzip-compress a file to dest_path, streaming in chunks."""
+    with open(src_path, 'rb') as src, gzip.open(dest_path, 'wb', compresslevel=6) as dest:
+        shutil.copyfileobj(src, dest, COPY_CHUNK_SIZE)
@@ -0,0 +1,392 @@
+"""
+Preview generator benchmarks
+
+Times the preview pipeline stages against local reference files so changes to
+the generators can be compared before and after. Not part of the Lambda image.
+
+Usage:
+    python benchmark.py step part1.step part2.stp assembly.step
+    python benchmark.py step --repeat 5 part1.step
+    python benchmark.py mesh                  # synthetic meshes, 1k-600k triangles
+    python benchmark.py mesh bracket.stl housing.stl
+    python benchmark.py meshing part1.step assembly.step
+    python benchmark.py coldstart part.dxf part.step drawing.pdf photo.jpg
+    python benchmark.py pdf vendor-drawing.pdf scanned-spec.pdf
+    python benchmark.py image                 # synthetic 2-48 MP JPEG/PNG/TIFF
+    python benchmark.py image photo.jpg scan.tif
+    python benchmark.py dxf                   # synthetic drawings, 1k-50k segments
+    python benchmark.py dxf bracket.dxf panel.dxf
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Benchmarks warm up explicitly; coldstart sets this per subprocess
+os.environ.setdefault('PREVIEW_WARMUP', 'none')
+
+import handler  # noqa: E402
+
+
+def timed(func, *args, repeat=3):
+    """Run func repeat times. Returns (last result, median seconds)."""
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        durations.append(time.perf_counter() - start)
+    return result, statistics.median(durations)
+
+
+def load_meshed_shape(input_path):
+    """Read and mesh a STEP/IGES file the same way generate_step_preview does."""
+    shape = handler.read_cad_shape(str(input_path))
+    handler.mesh_shape(shape)
+    return shape
+
+
+def mesh_fixed_deflection(shape):
+    """The original single pass at max_dim / 50, kept as the baseline."""
+    from OCP.Bnd import Bnd_Box
+    from OCP.BRepBndLib import BRepBndLib
+    from OCP.BRepMesh import BRepMesh_IncrementalMesh
+    from OCP.BRepTools import BRepTools
+
+    BRepTools.Clean_s(shape)
+    bbox = Bnd_Box()
+    BRepBndLib.AddClose_s(shape, bbox)
+    xmin, ymin, zmin, xmax, ymax, zmax = bbox.Get()
+    max_dim = max(xmax - xmin, ymax - ymin, zmax - zmin)
+    BRepMesh_IncrementalMesh(shape, max_dim / 50.0).Perform()
+    return handler.count_triangles(shape)
+
+
+def mesh_budgeted(shape, parallel):
+    """Budgeted tessellation from a clean shape, as generate_step_preview does it."""
+    from OCP.BRepTools import BRepTools
+
+    BRepTools.Clean_s(shape)
+    return handler.mesh_shape(shape, parallel=parallel)
+
+
+def extract_shape_mesh_per_node(shape):
+    """The original node-by-node extraction loop, kept as the baseline."""
+    from OCP.TopExp import TopExp_Explorer
+    from OCP.TopAbs import TopAbs_FACE
+    from OCP.TopoDS import TopoDS
+    from OCP.BRep import BRep_Tool
+    from OCP.TopLoc import TopLoc_Location
+    import numpy as np
+
+    all_vertices = []
+    all_faces = []
+    vertex_offset = 0
+
+    explorer = TopExp_Explorer(shape, TopAbs_FACE)
+    while explorer.More():
+        face = TopoDS.Face_s(explorer.Current())
+        location = TopLoc_Location()
+        triangulation = BRep_Tool.Triangulation_s(face, location)
+
+        if triangulation is not None:
+            nodes = []
+            for i in range(1, triangulation.NbNodes() + 1):
+                node = triangulation.Node(i)
+                if not location.IsIdentity():
+                    node = node.Transformed(location.Transformation())
+                nodes.append([node.X(), node.Y(), node.Z()])
+
+            for i in range(1, triangulation.NbTriangles() + 1):
+                n1, n2, n3 = triangulation.Triangle(i).Get()
+                all_faces.append([vertex_offset + n1 - 1,
+                                  vertex_offset + n2 - 1,
+                                  vertex_offset + n3 - 1])
+
+            all_vertices.extend(nodes)
+            vertex_offset += len(nodes)
+
+        explorer.Next()
+
+    return np.array(all_vertices), np.array(all_faces)
+
+
+def bench_step(paths, repeat):
+    """Per-node vs. bulk triangulation extraction on meshed STEP/IGES files."""
+    print(f"{'file':<32} {'triangles':>10} {'per-node ms':>12} {'bulk ms':>10} {'speedup':>8}")
+    for path in paths:
+        shape = load_meshed_shape(path)
+        (_, old_faces), old_s = timed(extract_shape_mesh_per_node, shape, repeat=repeat)
+        (_, new_faces), new_s = timed(handler.extract_shape_mesh, shape, repeat=repeat)
+        if len(old_faces) != len(new_faces):
+            print(f"  warning: triangle count differs ({len(old_faces)} vs {len(new_faces)})")
+        print(f"{Path(path).name:<32} {len(new_faces):>10} {old_s * 1000:>12.1f} "
+              f"{new_s * 1000:>10.1f} {old_s / new_s:>7.1f}x")
+
+
+def bench_meshing(paths, repeat):
+    """Fixed-deflection vs. budgeted (serial and parallel) tessellation of STEP/IGES files."""
+    print(f"budget {handler.STEP_TRIANGLE_BUDGET} triangles")
+    print(f"{'file':<32} {'fixed':>18} {'budgeted':>18} {'budgeted+parallel':>18}")
+    for path in paths:
+        shape = handler.read_cad_shape(str(path))
+        runs = [timed(mesh_fixed_deflection, shape, repeat=repeat),
+                timed(mesh_budgeted, shape, False, repeat=repeat),
+                timed(mesh_budgeted, shape, True, repeat=repeat)]
+        cells = [f"{count} / {seconds * 1000:.0f} ms" for count, seconds in runs]
+        print(f"{Path(path).name:<32} " + " ".join(f"{cell:>18}" for cell in cells))
+
+
+def render_mesh_matplotlib(vertices, faces, size):
+    """The original Poly3DCollection renderer, kept as the baseline."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
+    fig = plt.figure(figsize=(10, 8))
+    ax = fig.add_subplot(111, projection='3d')
+
+    mesh_collection = Poly3DCollection(vertices[faces], alpha=0.8)
+    mesh_collection.set_facecolor('steelblue')
+    mesh_collection.set_edgecolor('darkblue')
+    mesh_collection.set_linewidth(0.1)
+    ax.add_collection3d(mesh_collection)
+
+    scale = vertices.flatten()
+    ax.auto_scale_xyz(scale, scale, scale)
+    ax.set_axis_off()
+
+    image = handler.figure_to_image(fig, size)
+    plt.close(fig)
+    return image
+
+
+def synthetic_mesh(rings):
+    """A stretched UV sphere with roughly 4 * rings^2 triangles."""
+    import numpy as np
+
+    theta = np.linspace(0, np.pi, rings)
+    phi = np.linspace(0, 2 * np.pi, 2 * rings)
+    t, p = np.meshgrid(theta, phi, indexing='ij')
+    vertices = np.stack([3 * np.sin(t) * np.cos(p), np.sin(t) * np.sin(p), np.cos(t)], -1)
+
+    cols = 2 * rings
+    i, j = np.meshgrid(np.arange(rings - 1), np.arange(cols - 1), indexing='ij')
+    a = i * cols + j
+    faces = np.concatenate([np.stack([a, a + cols, a + 1], -1).reshape(-1, 3),
+                            np.stack([a + 1, a + cols, a + cols + 1], -1).reshape(-1, 3)])
+    return vertices.reshape(-1, 3), faces
+
+
+MATPLOTLIB_TRIANGLE_LIMIT = 150_000  # Beyond this the baseline takes minutes
+
+
+def bench_mesh(paths, repeat):
+    """Triangle count vs. latency: matplotlib Poly3DCollection vs. the rasterizer."""
+    from rasterizer import render_mesh
+
+    if paths:
+        import trimesh
+        meshes = [(Path(p).name, trimesh.load(p, force='mesh')) for p in paths]
+        meshes = [(name, (m.vertices, m.faces)) for name, m in meshes]
+    else:
+        meshes = [(f'sphere-{rings}', synthetic_mesh(rings)) for rings in (20, 50, 100, 200, 400)]
+
+    print(f"{'mesh':<24} {'triangles':>10} {'matplotlib ms':>14} {'rasterizer ms':>14} {'speedup':>8}")
+    for name, (vertices, faces) in meshes:
+        _, new_s = timed(render_mesh, vertices, faces, handler.MAX_IMAGE_SIZE, repeat=repeat)
+        if len(faces) <= MATPLOTLIB_TRIANGLE_LIMIT:
+            _, old_s = timed(render_mesh_matplotlib, vertices, faces, handler.MAX_IMAGE_SIZE,
+                             repeat=repeat)
+            old, speedup = f"{old_s * 1000:.1f}", f"{old_s / new_s:.1f}x"
+        else:
+            old, speedup = 'skipped', '-'
+        print(f"{name:<24} {len(faces):>10} {old:>14} {new_s * 1000:>14.1f} {speedup:>8}")
+
+
+def bench_pdf(paths, repeat):
+    """First-page render: poppler (pdf2image) vs. in-process pdfium, at the default size."""
+    size = handler.MAX_IMAGE_SIZE
+    print(f"{'file':<32} {'MB':>6} {'poppler ms':>11} {'pdfium ms':>10} {'speedup':>8}")
+    for path in paths:
+        mb = Path(path).stat().st_size / 1e6
+        _, new_s = timed(handler.render_pdf_page_pdfium, str(path), size, repeat=repeat)
+        try:
+            _, old_s = timed(handler.render_pdf_page_poppler, str(path), size, repeat=repeat)
+            old, speedup = f"{old_s * 1000:.1f}", f"{old_s / new_s:.1f}x"
+        except Exception as e:
+            print(f"  poppler unavailable: {e}")
+            old, speedup = '-', '-'
+        print(f"{Path(path).name:<32} {mb:>6.1f} {old:>11} {new_s * 1000:>10.1f} {speedup:>8}")
+
+
+def thumbnail_full_decode(input_path, size):
+    """The original thumbnailer (full decode, convert, then LANCZOS), kept as the baseline."""
+    from PIL import Image
+
+    img = Image.open(input_path)
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    img.thumbnail(size, Image.Resampling.LANCZOS)
+    return img
+
+
+def synthetic_images(directory):
+    """Photo-like test images from 2 to 48 megapixels in JPEG (RGB/CMYK), PNG (RGB/RGBA) and TIFF."""
+    import numpy as np
+    from PIL import Image, ImageFilter
+
+    rng = np.random.default_rng(0)
+    base = Image.fromarray((rng.random((375, 500, 3)) * 255).astype('uint8'))
+    base = base.filter(ImageFilter.GaussianBlur(2))
+
+    paths = []
+    for megapixels, (w, h) in ((2, (1600, 1200)), (12, (4000, 3000)),
+                               (24, (6000, 4000)), (48, (8000, 6000))):
+        img = base.resize((w, h), Image.Resampling.BILINEAR)
+        variants = (('jpg', img, {'quality': 90}),
+                    ('cmyk.jpg', img.convert('CMYK'), {'quality': 90}),
+                    ('png', img, {}),
+                    ('rgba.png', img.convert('RGBA'), {}),
+                    ('tif', img, {'compression': 'tiff_lzw'}))
+        for ext, variant, options in variants:
+            path = Path(directory) / f'{megapixels}mp.{ext}'
+            variant.save(path, **options)
+            paths.append(path)
+    return paths
+
+
+def bench_image(paths, repeat):
+    """Full decode vs. draft/reduce thumbnailing across image sizes and formats."""
+    import tempfile
+    from PIL import Image
+
+    size = handler.MAX_IMAGE_SIZE
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = paths or synthetic_images(tmpdir)
+        print(f"{'image':<24} {'pixels':>12} {'full decode ms':>15} {'draft ms':>9} {'speedup':>8}")
+        for path in paths:
+            with Image.open(path) as img:
+                pixels = f"{img.width}x{img.height}"
+            _, old_s = timed(thumbnail_full_decode, str(path), size, repeat=repeat)
+            _, new_s = timed(handler.generate_image_thumbnail, str(path), size, repeat=repeat)
+            print(f"{Path(path).name:<24} {pixels:>12} {old_s * 1000:>15.1f} "
+                  f"{new_s * 1000:>9.1f} {old_s / new_s:>7.1f}x")
+
+
+def synthetic_dxf(segments):
+    """A drawing with the given number of polyline segments, some circles and hatches."""
+    import ezdxf
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    per_polyline = 50
+    for _ in range(max(1, segments // per_polyline)):
+        start = rng.random(2) * 1000
+        points = start + np.cumsum(rng.normal(0, 5, (per_polyline + 1, 2)), axis=0)
+        msp.add_lwpolyline(points.tolist())
+    for _ in range(max(1, segments // 500)):
+        cx, cy = rng.random(2) * 1000
+        msp.add_circle((cx, cy), rng.random() * 20 + 1)
+        hatch = msp.add_hatch(color=int(rng.integers(1, 8)))
+        hatch.paths.add_polyline_path([(cx, cy), (cx + 30, cy), (cx + 30, cy + 20), (cx, cy + 20)],
+                                      is_closed=True)
+    return doc
+
+
+def bench_dxf(paths, repeat):
+    """ezdxf matplotlib backend vs. the recorder-based raster renderer."""
+    import ezdxf
+    from dxf_raster import render_dxf
+
+    size = handler.MAX_IMAGE_SIZE
+    if paths:
+        docs = [(Path(p).name, ezdxf.readfile(p)) for p in paths]
+    else:
+        docs = [(f'synthetic-{n}', synthetic_dxf(n)) for n in (1_000, 10_000, 50_000)]
+
+    print(f"{'drawing':<24} {'entities':>9} {'matplotlib ms':>14} {'raster ms':>10} {'speedup':>8}")
+    for name, doc in docs:
+        entities = len(doc.modelspace())
+        _, old_s = timed(handler.render_dxf_matplotlib, doc, size, repeat=repeat)
+        _, new_s = timed(render_dxf, doc, size, repeat=repeat)
+        print(f"{name:<24} {entities:>9} {old_s * 1000:>14.1f} {new_s * 1000:>10.1f} "
+              f"{old_s / new_s:>7.1f}x")
+
+
+GENERATORS = {
+    'dxf': 'generate_dxf_preview',
+    'stl': 'generate_stl_preview',
+    'step': 'generate_step_preview',
+    'pdf': 'generate_pdf_preview',
+    'image': 'generate_image_thumbnail',
+}
+
+
+def probe_generation(path, init_s):
+    """
+    Run in a fresh interpreter after timing the handler import (the Lambda
+    init phase): time two generations of path and print everything as JSON.
+    """
+    generate = getattr(handler, GENERATORS[handler.PREVIEW_FORMATS[Path(path).suffix.lower()]])
+    _, first_s = timed(generate, path, repeat=1)
+    _, second_s = timed(generate, path, repeat=1)
+    print(json.dumps({'init': init_s, 'first': first_s, 'second': second_s}))
+
+
+def run_probe(path, warmup_setting):
+    """Run probe_generation for path in a new interpreter with the given PREVIEW_WARMUP."""
+    env = dict(os.environ, PREVIEW_WARMUP=warmup_setting)
+    env.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    code = ("import time; start = time.perf_counter(); import handler; "
+            "init = time.perf_counter() - start; import benchmark; "
+            f"benchmark.probe_generation({str(path)!r}, init)")
+    result = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True,
+                            text=True, check=True, cwd=Path(__file__).parent)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def bench_coldstart(paths, repeat):
+    """Per format: init time, first and second generation, with and without warmup."""
+    print(f"{'file':<28} {'warmup':>7} {'init ms':>8} {'first ms':>9} {'warm ms':>8}")
+    for path in paths:
+        for setting in ('none', 'all'):
+            runs = [run_probe(Path(path).resolve(), setting) for _ in range(repeat)]
+            init, first, second = (statistics.median(r[k] for r in runs)
+                                   for k in ('init', 'first', 'second'))
+            print(f"{Path(path).name:<28} {setting:>7} {init * 1000:>8.0f} "
+                  f"{first * 1000:>9.0f} {second * 1000:>8.0f}")
+
+
+BENCHMARKS = {
+    'step': bench_step,
+    'mesh': bench_mesh,
+    'meshing': bench_meshing,
+    'coldstart': bench_coldstart,
+    'pdf': bench_pdf,
+    'image': bench_image,
+    'dxf': bench_dxf,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark preview generator stages')
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('files', nargs='*', help='Reference input files')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (median reported)')
+    args = parser.parse_args()
+
+    BENCHMARKS[args.benchmark](args.files, args.repeat)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
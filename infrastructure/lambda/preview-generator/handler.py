@@ -3,41 +3,108 @@ Preview Generator Lambda
 
 Generates preview images (PNG) from various CAD and document formats.
 Supports: DXF, STL, STEP, STP, IGES, IGS, PDF, PNG, JPG, JPEG, TIFF, TIF
+
+Each file is parsed once into a single master image, which is then resized and
+encoded into every requested rendition (size, format, quality).
 """
 
 import base64
+import gzip
 import io
 import json
+import math
 import os
+import shutil
 import tempfile
+import time
+import uuid
+from itertools import chain
 from pathlib import Path
 
 import boto3
 
+import warmup
+
 s3 = boto3.client('s3')
 
+# Import libraries and prime caches during Lambda init (see warmup.py)
+warmup.warm(warmup.warmup_formats())
+
+# Formats that have been generated at least once in this container
+served_formats = set()
+
 # Image settings
 MAX_IMAGE_SIZE = (800, 600)  # Max preview dimensions
+MAX_RENDITION_SIZE = (4000, 4000)  # Largest rendition that may be requested
 BACKGROUND_COLOR = 'white'
 IMAGE_FORMAT = 'PNG'
 
+# Output formats accepted in rendition requests -> (PIL format, file extension, content type)
+RENDITION_FORMATS = {
+    'png': ('PNG', 'png', 'image/png'),
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg'),
+    'jpg': ('JPEG', 'jpg', 'image/jpeg'),
+    'webp': ('WEBP', 'webp', 'image/webp'),
+}
+
+# Image thumbnails shrink with reduce() until within this factor of the target,
+# then finish with LANCZOS
+THUMBNAIL_REDUCING_GAP = 2.0
+
+# File extension -> preview format
+PREVIEW_FORMATS = {
+    '.dxf': 'dxf',
+    '.stl': 'stl',
+    '.step': 'step', '.stp': 'step', '.iges': 'step', '.igs': 'step',
+    '.pdf': 'pdf',
+    '.png': 'image', '.jpg': 'image', '.jpeg': 'image', '.tiff': 'image', '.tif': 'image',
+}
+
+# STEP/IGES tessellation: a coarse first pass is refined only while the
+# estimated triangle count stays under the budget
+STEP_TRIANGLE_BUDGET = int(os.environ.get('STEP_TRIANGLE_BUDGET', '250000'))
+STEP_COARSE_DEFLECTION = 1 / 20  # Linear deflection as a fraction of the largest dimension
+STEP_FINE_DEFLECTION = 1 / 50  # Never refine past this
+STEP_ANGULAR_DEFLECTION = 0.5  # Radians; the same for both passes so the estimate holds
+STEP_PARALLEL_MESHING = os.environ.get('STEP_PARALLEL_MESHING', 'true').lower() == 'true'
+
+# Key prefix for renditions written to S3 when the caller does not choose one;
+# each invocation gets its own <uuid>/ below it so outputs never collide
+OUTPUT_PREFIX = 'previews/'
+
+# Used when the event does not ask for specific renditions
+DEFAULT_RENDITIONS = [
+    {'name': 'preview', 'width': MAX_IMAGE_SIZE[0], 'height': MAX_IMAGE_SIZE[1], 'format': 'png'},
+]
+
 
 def lambda_handler(event, context):
     """
-    Generate a preview image from a file in S3.
+    Generate preview images from a file in S3.
 
     Input event:
     {
         "bucket": "bucket-name",
         "key": "quotes/file.step",
-        "content_type": "application/step"  # optional, will guess from extension
+        "content_type": "application/step",  # optional, will guess from extension
+        "renditions": [  # optional, defaults to one 800x600 PNG
+            {"name": "thumbnail", "width": 200, "height": 150, "format": "jpeg", "quality": 80},
+            {"name": "full", "width": 2400, "height": 1800, "format": "png"},
+            {"name": "dashboard", "width": 1200, "height": 900, "format": "webp", "quality": 85}
+        ],
+        "output_bucket": "bucket-name",  # optional, write renditions to S3
+        "output_prefix": "previews/abc/"  # optional, key prefix for S3 output (default: previews/<uuid>/)
     }
 
     Returns:
     {
         "success": true,
-        "preview_content": "<base64-encoded PNG>",
-        "preview_filename": "file_preview.png"
+        "preview_content": "<base64-encoded first rendition>",  # omitted when written to S3
+        "preview_filename": "file_preview.png",
+        "renditions": [
+            {"name": "thumbnail", "format": "jpeg", "width": 200, "height": 150,
+             "size": 12345, "key": "previews/abc/file_thumbnail.jpg"}  # or "content" when inline
+        ]
     }
     """
     print(f"Received event: {json.dumps(event)}")
@@ -51,6 +118,14 @@ def lambda_handler(event, context):
             'error': 'Missing bucket or key in event'
         }
 
+    try:
+        renditions = parse_renditions(event.get('renditions'))
+    except ValueError as e:
+        return {
+            'success': False,
+            'error': f'Invalid renditions: {str(e)}'
+        }
+
     # Determine file type from extension
     filename = os.path.basename(key)
     ext = Path(filename).suffix.lower()
@@ -59,12 +134,14 @@ def lambda_handler(event, context):
 
     with tempfile.TemporaryDirectory() as tmpdir:
         input_path = os.path.join(tmpdir, filename)
-        output_path = os.path.join(tmpdir, 'preview.png')
 
         # Download file from S3
         try:
-            s3.download_file(bucket, key, input_path)
-            print(f"Downloaded {key} ({os.path.getsize(input_path)} bytes)")
+            # DWG converter output may be stored with ContentEncoding=gzip; customer
+            # uploads are written as-is, whatever their first bytes happen to be
+            compressed = download_object(s3.get_object(Bucket=bucket, Key=key), input_path)
+            print(f"Downloaded {key} ({os.path.getsize(input_path)} bytes"
+                  f"{', decompressed' if compressed else ''})")
         except Exception as e:
             print(f"Failed to download from S3: {e}")
             return {
@@ -72,24 +149,31 @@ def lambda_handler(event, context):
                 'error': f'Failed to download file: {str(e)}'
             }
 
-        # Generate preview based on file type
+        # Parse the file once into a master image large enough for every rendition
+        size = master_size(renditions)
+        preview_format = PREVIEW_FORMATS.get(ext)
+        if preview_format is None:
+            print(f"Unsupported file type: {ext}")
+            return {
+                'success': False,
+                'error': f'Unsupported file type: {ext}'
+            }
+
+        start = time.perf_counter()
         try:
-            if ext == '.dxf':
-                generate_dxf_preview(input_path, output_path)
-            elif ext == '.stl':
-                generate_stl_preview(input_path, output_path)
-            elif ext in ['.step', '.stp', '.iges', '.igs']:
-                generate_step_preview(input_path, output_path)
-            elif ext == '.pdf':
-                generate_pdf_preview(input_path, output_path)
-            elif ext in ['.png', '.jpg', '.jpeg', '.tiff', '.tif']:
-                generate_image_thumbnail(input_path, output_path)
+            if preview_format == 'dxf':
+                image = generate_dxf_preview(input_path, size)
+            elif preview_format == 'stl':
+                image = generate_stl_preview(input_path, size)
+            elif preview_format == 'step':
+                image = generate_step_preview(input_path, size)
+            elif preview_format == 'pdf':
+                image = generate_pdf_preview(input_path, size)
             else:
-                print(f"Unsupported file type: {ext}")
-                return {
-                    'success': False,
-                    'error': f'Unsupported file type: {ext}'
-                }
+                image = generate_image_thumbnail(input_path, size)
+
+            log_generation_timing(preview_format, start)
+            outputs = [(spec, encode_rendition(image, spec)) for spec in renditions]
 
         except Exception as e:
             print(f"Preview generation failed: {e}")
@@ -100,77 +184,234 @@ def lambda_handler(event, context):
                 'error': f'Preview generation failed: {str(e)}'
             }
 
-        # Read and return the preview
-        if not os.path.exists(output_path):
+    stem = Path(filename).stem
+    output_bucket = event.get('output_bucket')
+    output_prefix = event.get('output_prefix') or f"{OUTPUT_PREFIX}{uuid.uuid4()}/"
+
+    results = []
+    for spec, (content, width, height) in outputs:
+        _, file_ext, content_type = RENDITION_FORMATS[spec['format']]
+        result = {
+            'name': spec['name'],
+            'format': spec['format'],
+            'width': width,
+            'height': height,
+            'size': len(content),
+        }
+        if output_bucket:
+            result['key'] = f"{output_prefix}{stem}_{spec['name']}.{file_ext}"
+        else:
+            result['content'] = base64.b64encode(content).decode('utf-8')
+        results.append(result)
+
+    # Write all renditions to S3 after rendering is complete
+    if output_bucket:
+        try:
+            for result, (spec, (content, _, _)) in zip(results, outputs):
+                s3.put_object(Bucket=output_bucket, Key=result['key'], Body=content,
+                              ContentType=RENDITION_FORMATS[spec['format']][2])
+        except Exception as e:
+            print(f"Failed to upload renditions: {e}")
             return {
                 'success': False,
-                'error': 'Preview file was not created'
+                'error': f'Failed to upload renditions: {str(e)}'
             }
 
-        with open(output_path, 'rb') as f:
-            preview_content = f.read()
+    first_spec, (first_content, _, _) = outputs[0]
+    preview_filename = f"{stem}_preview.{RENDITION_FORMATS[first_spec['format']][1]}"
+    print(f"Preview generated: {preview_filename} | " + ', '.join(
+        f"{r['name']}={r['width']}x{r['height']} {r['format']} ({r['size']} bytes)" for r in results))
 
-        preview_filename = Path(filename).stem + '_preview.png'
-        print(f"Preview generated: {preview_filename} ({len(preview_content)} bytes)")
+    response = {
+        'success': True,
+        'preview_filename': preview_filename,
+        'renditions': results
+    }
+    if not output_bucket:
+        response['preview_content'] = base64.b64encode(first_content).decode('utf-8')
+    return response
 
-        return {
-            'success': True,
-            'preview_content': base64.b64encode(preview_content).decode('utf-8'),
-            'preview_filename': preview_filename
-        }
+
+def log_generation_timing(preview_format, start):
+    """Log generation time, noting whether this was the format's first use in the container."""
+    elapsed_ms = round((time.perf_counter() - start) * 1000)
+    if preview_format in served_formats:
+        state = 'warm'
+    elif preview_format in warmup.warmup_timings:
+        state = f"first use, warmed at init in {warmup.warmup_timings[preview_format]}ms"
+    else:
+        state = 'cold, not warmed at init'
+    served_formats.add(preview_format)
+    print(f"Generated {preview_format} preview in {elapsed_ms}ms ({state})")
+
+
+def parse_renditions(requested):
+    """
+    Validate and normalize requested renditions.
+    Returns DEFAULT_RENDITIONS when none are requested. Raises ValueError on bad input.
+    """
+    if not requested:
+        return DEFAULT_RENDITIONS
+    if not isinstance(requested, list):
+        raise ValueError('renditions must be a list')
+
+    renditions = []
+    for i, spec in enumerate(requested):
+        if not isinstance(spec, dict):
+            raise ValueError(f'rendition {i + 1} must be an object')
+        name = str(spec.get('name') or f'rendition{i + 1}')
+        fmt = spec.get('format', 'png')
+        if not isinstance(fmt, str) or fmt.lower() not in RENDITION_FORMATS:
+            raise ValueError(f'unsupported format {fmt!r} for {name}')
+        width = rendition_int(spec, 'width', MAX_IMAGE_SIZE[0], name)
+        height = rendition_int(spec, 'height', MAX_IMAGE_SIZE[1], name)
+        if not (0 < width <= MAX_RENDITION_SIZE[0] and 0 < height <= MAX_RENDITION_SIZE[1]):
+            raise ValueError(f'size {width}x{height} out of range for {name}')
+        quality = rendition_int(spec, 'quality', 85, name)
+        renditions.append({'name': name, 'width': width, 'height': height,
+                           'format': fmt.lower(), 'quality': max(1, min(100, quality))})
+    return renditions
+
+
+def rendition_int(spec, field, default, name):
+    """Integer field of a rendition spec. Raises ValueError for non-integers (including bools)."""
+    value = spec.get(field, default)
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(f'{field} must be an integer for {name}, got {value!r}')
+    return value
+
+
+def master_size(renditions):
+    """Smallest (width, height) box that covers every requested rendition."""
+    return (max(r['width'] for r in renditions), max(r['height'] for r in renditions))
+
+
+def encode_rendition(image, spec):
+    """
+    Resize the master image to fit the rendition and encode it.
+    Returns (content_bytes, width, height).
+    """
+    from PIL import Image
+
+    pil_format = RENDITION_FORMATS[spec['format']][0]
+    img = image.copy()
+    img.thumbnail((spec['width'], spec['height']), Image.Resampling.LANCZOS)
+
+    if pil_format == 'JPEG' and img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+
+    buf = io.BytesIO()
+    if pil_format == 'PNG':
+        img.save(buf, 'PNG', optimize=True)
+    else:
+        img.save(buf, pil_format, quality=spec.get('quality', 85))
+    return buf.getvalue(), img.width, img.height
+
+
+def figure_to_image(fig, size):
+    """
+    Render a matplotlib figure to a PIL Image at least as large as size.
+    Uses the figure's own dpi unless a larger rendition needs more pixels.
+    """
+    from PIL import Image
+
+    fig_w, fig_h = fig.get_size_inches()
+    dpi = max(fig.dpi, math.ceil(max(size[0] / fig_w, size[1] / fig_h)))
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight',
+                facecolor=BACKGROUND_COLOR, dpi=dpi)
+    buf.seek(0)
+    image = Image.open(buf)
+    image.load()
+    return image
 
 
-def generate_dxf_preview(input_path: str, output_path: str):
-    """Generate preview from DXF file using ezdxf + matplotlib."""
+def download_object(obj, path: str) -> bool:
+    """
+    Stream an S3 get_object response to path, decoding it if it was stored with
+    ContentEncoding=gzip. Returns True if the object was compressed.
+    """
+    compressed = obj.get('ContentEncoding') == 'gzip'
+    body = gzip.GzipFile(fileobj=obj['Body']) if compressed else obj['Body']
+    with open(path, 'wb') as dest:
+        shutil.copyfileobj(body, dest)
+    return compressed
+
+
+def generate_dxf_preview(input_path: str, size=MAX_IMAGE_SIZE):
+    """Generate preview image from DXF file using ezdxf + the fast raster renderer."""
     import ezdxf
-    from ezdxf.addons.drawing import Frontend, RenderContext
-    from ezdxf.addons.drawing.matplotlib import MatplotlibBackend
-    import matplotlib.pyplot as plt
+    from dxf_raster import render_dxf
 
     print("Generating DXF preview...")
 
     doc = ezdxf.readfile(input_path)
+
+    try:
+        image = render_dxf(doc, size)
+    except Exception as e:
+        print(f"Fast DXF rendering failed: {e}, falling back to matplotlib")
+        image = render_dxf_matplotlib(doc, size)
+
+    print("DXF preview generated")
+    return image
+
+
+def render_dxf_matplotlib(doc, size):
+    """Render DXF modelspace through ezdxf's matplotlib backend."""
+    from ezdxf.addons.drawing import Frontend, RenderContext
+    from ezdxf.addons.drawing.config import BackgroundPolicy, Configuration
+    from ezdxf.addons.drawing.matplotlib import MatplotlibBackend
+
     msp = doc.modelspace()
 
-    # Create figure
-    fig = plt.figure(figsize=(10, 8), dpi=100)
-    ax = fig.add_axes([0, 0, 1, 1])
+    # Reuse a figure from the warmup pool
+    fig = warmup.acquire_figure(figsize=(10, 8), dpi=100)
+    try:
+        ax = fig.add_axes([0, 0, 1, 1])
 
-    # Render DXF
-    ctx = RenderContext(doc)
-    out = MatplotlibBackend(ax)
-    Frontend(ctx, out).draw_layout(msp, finalize=True)
+        # Render DXF (dark entities on the white page)
+        ctx = RenderContext(doc)
+        out = MatplotlibBackend(ax)
+        config = Configuration(background_policy=BackgroundPolicy.WHITE)
+        Frontend(ctx, out, config=config).draw_layout(msp, finalize=True)
 
-    # Style
-    ax.set_facecolor(BACKGROUND_COLOR)
-    fig.patch.set_facecolor(BACKGROUND_COLOR)
+        # Style
+        ax.set_facecolor(BACKGROUND_COLOR)
+        fig.patch.set_facecolor(BACKGROUND_COLOR)
 
-    # Save
-    fig.savefig(output_path, format='png', bbox_inches='tight',
-                facecolor=BACKGROUND_COLOR, dpi=100)
-    plt.close(fig)
+        # Render
+        return figure_to_image(fig, size)
+    finally:
+        warmup.release_figure(fig)
 
-    print("DXF preview generated")
 
+def generate_step_preview(input_path: str, size=MAX_IMAGE_SIZE):
+    """Generate preview image from STEP/IGES file using OpenCASCADE (OCP)."""
+    from rasterizer import render_mesh
+
+    print("Generating STEP/IGES preview...")
 
-def generate_step_preview(input_path: str, output_path: str):
-    """Generate preview from STEP/IGES file using OpenCASCADE (OCP)."""
+    shape = read_cad_shape(input_path)
+    mesh_shape(shape)
+
+    vertices, faces = extract_shape_mesh(shape)
+    if len(faces) == 0:
+        raise Exception("No geometry found in file")
+
+    print(f"Rendering {len(faces)} triangles")
+    image = render_mesh(vertices, faces, size)
+
+    print("STEP/IGES preview generated")
+    return image
+
+
+def read_cad_shape(input_path: str):
+    """Read a STEP or IGES file into a single OCP shape."""
     from OCP.STEPControl import STEPControl_Reader
     from OCP.IGESControl import IGESControl_Reader
     from OCP.IFSelect import IFSelect_RetDone
-    from OCP.Bnd import Bnd_Box
-    from OCP.BRepBndLib import BRepBndLib
-    from OCP.BRepMesh import BRepMesh_IncrementalMesh
-    from OCP.TopExp import TopExp_Explorer
-    from OCP.TopAbs import TopAbs_FACE
-    from OCP.TopoDS import TopoDS
-    from OCP.BRep import BRep_Tool
-    from OCP.TopLoc import TopLoc_Location
-    import matplotlib.pyplot as plt
-    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
-    import numpy as np
-
-    print("Generating STEP/IGES preview...")
 
     ext = Path(input_path).suffix.lower()
 
@@ -186,204 +427,302 @@ def generate_step_preview(input_path: str, output_path: str):
         raise Exception(f"Failed to read {ext} file")
 
     reader.TransferRoots()
-    shape = reader.OneShape()
+    return reader.OneShape()
+
+
+def mesh_shape(shape, budget=STEP_TRIANGLE_BUDGET, parallel=STEP_PARALLEL_MESHING):
+    """
+    Tessellate a shape, aiming for at most budget triangles.
+
+    A coarse pass gives a triangle count at a known deflection. Triangle
+    count grows roughly with 1 / deflection, so that count predicts the
+    deflection that would land on the budget; the shape is re-meshed at that
+    deflection (never finer than STEP_FINE_DEFLECTION) only if it is finer
+    than the coarse pass. If the refined mesh still overshoots the budget, the
+    coarse mesh is restored. Returns the final triangle count.
+    """
+    from OCP.Bnd import Bnd_Box
+    from OCP.BRepBndLib import BRepBndLib
+    from OCP.BRepMesh import BRepMesh_IncrementalMesh
+    from OCP.BRepTools import BRepTools
 
     # Get bounding box for scale
     bbox = Bnd_Box()
     BRepBndLib.AddClose_s(shape, bbox)
     xmin, ymin, zmin, xmax, ymax, zmax = bbox.Get()
-
-    # Calculate mesh deflection based on size
     max_dim = max(xmax - xmin, ymax - ymin, zmax - zmin)
-    deflection = max_dim / 50.0  # Adjust for quality vs speed
 
-    # Mesh the shape
-    mesh = BRepMesh_IncrementalMesh(shape, deflection)
-    mesh.Perform()
+    coarse = max_dim * STEP_COARSE_DEFLECTION
+    BRepMesh_IncrementalMesh(shape, coarse, False, STEP_ANGULAR_DEFLECTION, parallel)
+    coarse_triangles = count_triangles(shape)
+    print(f"Coarse mesh: {coarse_triangles} triangles at deflection {coarse:.4g}")
+
+    if coarse_triangles == 0 or coarse_triangles * 1.5 > budget:
+        return coarse_triangles
+
+    target = max(coarse * coarse_triangles / budget, max_dim * STEP_FINE_DEFLECTION)
+    BRepTools.Clean_s(shape)
+    BRepMesh_IncrementalMesh(shape, target, False, STEP_ANGULAR_DEFLECTION, parallel)
+    triangles = count_triangles(shape)
+    print(f"Refined mesh: {triangles} triangles at deflection {target:.4g} (budget {budget})")
+
+    if triangles > budget:
+        print("Refined mesh is over budget, falling back to the coarse mesh")
+        BRepTools.Clean_s(shape)
+        BRepMesh_IncrementalMesh(shape, coarse, False, STEP_ANGULAR_DEFLECTION, parallel)
+        triangles = coarse_triangles
+    return triangles
+
+
+def count_triangles(shape):
+    """Total triangles across the current triangulation of every face."""
+    from OCP.TopExp import TopExp_Explorer
+    from OCP.TopAbs import TopAbs_FACE
+    from OCP.TopoDS import TopoDS
+    from OCP.BRep import BRep_Tool
+    from OCP.TopLoc import TopLoc_Location
+
+    total = 0
+    explorer = TopExp_Explorer(shape, TopAbs_FACE)
+    while explorer.More():
+        triangulation = BRep_Tool.Triangulation_s(TopoDS.Face_s(explorer.Current()),
+                                                  TopLoc_Location())
+        if triangulation is not None:
+            total += triangulation.NbTriangles()
+        explorer.Next()
+    return total
+
+
+def extract_shape_mesh(shape):
+    """
+    Collect the triangulation of every face of a meshed shape.
+    Returns (vertices, faces) as (N, 3) float64 and (M, 3) int64 arrays.
 
-    # Extract triangles from all faces
-    all_vertices = []
-    all_faces = []
-    vertex_offset = 0
+    Node and triangle counts are read up front so the output arrays are
+    allocated once; each face's nodes are then copied in bulk and moved into
+    place with a single matrix multiply for its TopLoc_Location.
+    """
+    from OCP.TopExp import TopExp_Explorer
+    from OCP.TopAbs import TopAbs_FACE, TopAbs_REVERSED
+    from OCP.TopoDS import TopoDS
+    from OCP.BRep import BRep_Tool
+    from OCP.TopLoc import TopLoc_Location
+    import numpy as np
 
+    # First pass: triangulations and their sizes
+    meshed_faces = []
+    nb_nodes = nb_triangles = 0
     explorer = TopExp_Explorer(shape, TopAbs_FACE)
     while explorer.More():
         face = TopoDS.Face_s(explorer.Current())
         location = TopLoc_Location()
         triangulation = BRep_Tool.Triangulation_s(face, location)
+        if triangulation is not None and triangulation.NbTriangles() > 0:
+            reversed_face = face.Orientation() == TopAbs_REVERSED
+            meshed_faces.append((triangulation, location, reversed_face))
+            nb_nodes += triangulation.NbNodes()
+            nb_triangles += triangulation.NbTriangles()
+        explorer.Next()
 
-        if triangulation is not None:
-            # Get vertices
-            nodes = []
-            for i in range(1, triangulation.NbNodes() + 1):
-                node = triangulation.Node(i)
-                if not location.IsIdentity():
-                    node = node.Transformed(location.Transformation())
-                nodes.append([node.X(), node.Y(), node.Z()])
-
-            # Get triangles
-            for i in range(1, triangulation.NbTriangles() + 1):
-                tri = triangulation.Triangle(i)
-                n1, n2, n3 = tri.Get()
-                all_faces.append([
-                    vertex_offset + n1 - 1,
-                    vertex_offset + n2 - 1,
-                    vertex_offset + n3 - 1
-                ])
-
-            all_vertices.extend(nodes)
-            vertex_offset += len(nodes)
+    vertices = np.empty((nb_nodes, 3), dtype=np.float64)
+    faces = np.empty((nb_triangles, 3), dtype=np.int64)
 
-        explorer.Next()
+    # Second pass: fill the preallocated arrays face by face
+    node_offset = tri_offset = 0
+    for triangulation, location, reversed_face in meshed_faces:
+        n = triangulation.NbNodes()
+        t = triangulation.NbTriangles()
 
-    if not all_vertices:
-        raise Exception("No geometry found in file")
+        nodes = triangulation_nodes(triangulation)
+        if not location.IsIdentity():
+            matrix = location_matrix(location)
+            nodes = nodes @ matrix[:, :3].T + matrix[:, 3]
+        vertices[node_offset:node_offset + n] = nodes
 
-    vertices = np.array(all_vertices)
-    faces = np.array(all_faces)
-
-    # Create matplotlib 3D plot
-    fig = plt.figure(figsize=(10, 8))
-    ax = fig.add_subplot(111, projection='3d')
-
-    # Create polygon collection
-    mesh_collection = Poly3DCollection(vertices[faces], alpha=0.8)
-    mesh_collection.set_facecolor('steelblue')
-    mesh_collection.set_edgecolor('darkblue')
-    mesh_collection.set_linewidth(0.1)
-
-    ax.add_collection3d(mesh_collection)
-
-    # Set axis limits
-    ax.set_xlim(xmin, xmax)
-    ax.set_ylim(ymin, ymax)
-    ax.set_zlim(zmin, zmax)
-
-    # Set equal aspect ratio
-    max_range = max(xmax - xmin, ymax - ymin, zmax - zmin) / 2.0
-    mid_x = (xmax + xmin) / 2.0
-    mid_y = (ymax + ymin) / 2.0
-    mid_z = (zmax + zmin) / 2.0
-    ax.set_xlim(mid_x - max_range, mid_x + max_range)
-    ax.set_ylim(mid_y - max_range, mid_y + max_range)
-    ax.set_zlim(mid_z - max_range, mid_z + max_range)
-
-    # Style
-    ax.set_facecolor(BACKGROUND_COLOR)
-    fig.patch.set_facecolor(BACKGROUND_COLOR)
-    ax.set_axis_off()
-
-    # Save
-    fig.savefig(output_path, format='png', bbox_inches='tight',
-                facecolor=BACKGROUND_COLOR, dpi=100)
-    plt.close(fig)
+        triangles = triangulation_triangles(triangulation)
+        if reversed_face:
+            triangles = triangles[:, ::-1]
+        faces[tri_offset:tri_offset + t] = triangles + (node_offset - 1)
 
-    print("STEP/IGES preview generated")
+        node_offset += n
+        tri_offset += t
 
+    return vertices, faces
 
-def generate_stl_preview(input_path: str, output_path: str):
-    """Generate preview from STL file using trimesh."""
-    import trimesh
+
+def triangulation_nodes(triangulation):
+    """Node coordinates of a Poly_Triangulation as an (N, 3) array."""
     import numpy as np
-    from PIL import Image
 
-    print("Generating STL preview...")
+    n = triangulation.NbNodes()
+    points = map(triangulation.Node, range(1, n + 1))
+    coords = np.fromiter(
+        chain.from_iterable((p.X(), p.Y(), p.Z()) for p in points),
+        dtype=np.float64, count=3 * n)
+    return coords.reshape(n, 3)
 
-    # Load mesh
-    mesh = trimesh.load(input_path)
 
-    # Create a scene and render
-    scene = trimesh.Scene(mesh)
+def triangulation_triangles(triangulation):
+    """1-based node indices of a Poly_Triangulation as a (M, 3) array."""
+    import numpy as np
 
-    # Try to get a good camera angle
-    try:
-        # Render to image
-        png = scene.save_image(resolution=(800, 600), visible=False)
+    t = triangulation.NbTriangles()
+    triangles = map(triangulation.Triangle, range(1, t + 1))
+    indices = np.fromiter(
+        chain.from_iterable(tri.Get() for tri in triangles),
+        dtype=np.int64, count=3 * t)
+    return indices.reshape(t, 3)
 
-        # Save
-        with open(output_path, 'wb') as f:
-            f.write(png)
-    except Exception as e:
-        print(f"Trimesh rendering failed: {e}, falling back to matplotlib")
-        # Fallback: use matplotlib for a simpler 2D projection
-        generate_stl_matplotlib_preview(mesh, output_path)
 
-    print("STL preview generated")
+def location_matrix(location):
+    """The 3x4 affine matrix [R | t] of a TopLoc_Location."""
+    import numpy as np
+
+    trsf = location.Transformation()
+    return np.array([[trsf.Value(row, col) for col in range(1, 5)]
+                     for row in range(1, 4)])
+
+
+def generate_stl_preview(input_path: str, size=MAX_IMAGE_SIZE):
+    """Generate preview image from STL file using trimesh + the mesh rasterizer."""
+    import trimesh
+    from rasterizer import render_mesh
+
+    print("Generating STL preview...")
 
+    # Load mesh (multi-body files are merged into one mesh)
+    mesh = trimesh.load(input_path, force='mesh')
+    if len(mesh.faces) == 0:
+        raise Exception("No geometry found in file")
 
-def generate_stl_matplotlib_preview(mesh, output_path: str):
-    """Fallback STL preview using matplotlib."""
-    import matplotlib.pyplot as plt
-    from mpl_toolkits.mplot3d import Axes3D
-    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+    print(f"Rendering {len(mesh.faces)} triangles")
+    image = render_mesh(mesh.vertices, mesh.faces, size)
 
-    fig = plt.figure(figsize=(10, 8))
-    ax = fig.add_subplot(111, projection='3d')
+    print("STL preview generated")
+    return image
 
-    # Get mesh vertices and faces
-    vertices = mesh.vertices
-    faces = mesh.faces
 
-    # Create polygon collection
-    mesh_collection = Poly3DCollection(vertices[faces], alpha=0.7)
-    mesh_collection.set_facecolor('steelblue')
-    mesh_collection.set_edgecolor('darkblue')
-    mesh_collection.set_linewidth(0.1)
+def generate_pdf_preview(input_path: str, size=MAX_IMAGE_SIZE):
+    """
+    Generate preview image from PDF first page.
+    Renders in-process with pdfium at the target size; falls back to poppler.
+    """
+    print("Generating PDF preview...")
 
-    ax.add_collection3d(mesh_collection)
+    try:
+        image = render_pdf_page_pdfium(input_path, size)
+    except ImportError:
+        print("pypdfium2 not available, using poppler")
+        image = render_pdf_page_poppler(input_path, size)
+    except Exception as e:
+        print(f"pdfium rendering failed: {e}, falling back to poppler")
+        image = render_pdf_page_poppler(input_path, size)
 
-    # Auto-scale
-    scale = vertices.flatten()
-    ax.auto_scale_xyz(scale, scale, scale)
+    print("PDF preview generated")
+    return image
 
-    ax.set_facecolor(BACKGROUND_COLOR)
-    fig.patch.set_facecolor(BACKGROUND_COLOR)
 
-    fig.savefig(output_path, format='png', bbox_inches='tight',
-                facecolor=BACKGROUND_COLOR, dpi=100)
-    plt.close(fig)
+def render_pdf_page_pdfium(input_path: str, size):
+    """Render page 1 scaled to fit size, without a subprocess or full-resolution bitmap."""
+    import pypdfium2 as pdfium
 
+    pdf = pdfium.PdfDocument(input_path)
+    try:
+        if len(pdf) == 0:
+            raise Exception("No pages found in PDF")
 
-def generate_pdf_preview(input_path: str, output_path: str):
-    """Generate preview from PDF first page."""
+        page = pdf[0]
+        width_pt, height_pt = page.get_size()  # PDF points, rotation applied
+        scale = min(size[0] / width_pt, size[1] / height_pt)
+        bitmap = page.render(scale=scale, draw_annots=True)
+        return bitmap.to_pil()
+    finally:
+        pdf.close()
+
+
+def render_pdf_page_poppler(input_path: str, size):
+    """Render page 1 with poppler's pdftoppm via pdf2image."""
     from pdf2image import convert_from_path
-    from PIL import Image
 
-    print("Generating PDF preview...")
+    # Enough resolution for the largest rendition of a letter-size page
+    dpi = max(150, math.ceil(max(size[0] / 8.5, size[1] / 11)))
 
     # Convert first page only
-    images = convert_from_path(input_path, first_page=1, last_page=1, dpi=150)
+    images = convert_from_path(input_path, first_page=1, last_page=1, dpi=dpi)
 
     if not images:
         raise Exception("No pages found in PDF")
 
-    img = images[0]
-
-    # Resize if needed
-    img.thumbnail(MAX_IMAGE_SIZE, Image.Resampling.LANCZOS)
+    return images[0]
 
-    # Save
-    img.save(output_path, 'PNG')
-
-    print("PDF preview generated")
 
+def generate_image_thumbnail(input_path: str, size=MAX_IMAGE_SIZE):
+    """
+    Generate thumbnail image from image file.
 
-def generate_image_thumbnail(input_path: str, output_path: str):
-    """Generate thumbnail from image file."""
+    Avoids decoding more pixels than the thumbnail needs: multi-resolution
+    TIFFs use their smallest sufficient level, JPEGs decode with DCT scaling
+    (draft mode), and the remaining reduction is done with reduce() before
+    the final LANCZOS pass. Colour conversion happens after downscaling.
+    """
     from PIL import Image
 
     print("Generating image thumbnail...")
 
     img = Image.open(input_path)
+    full_size = img.size
+
+    # Pyramidal TIFFs: start from the smallest stored level that is still large enough
+    if getattr(img, 'n_frames', 1) > 1 and img.format == 'TIFF':
+        select_tiff_level(img, thumbnail_size(full_size, size))
 
-    # Convert to RGB if necessary (handles RGBA, palette modes, etc.)
+    # JPEG: let the decoder scale by 1/2, 1/4 or 1/8 while decoding
+    if img.format == 'JPEG':
+        img.draft('RGB', size)
+    decoded_size = img.size
+
+    # Palette and bilevel images cannot be resampled smoothly, and dropping an
+    # alpha channel is cheaper than resampling it, so convert those up front
+    if img.mode in ('P', '1', 'RGBA', 'RGBX', 'LA', 'PA'):
+        img = img.convert('RGB')
+
+    # reduce() rejects 16-bit greyscale, so scale it (and 32-bit integer) down to 8-bit
+    if img.mode in ('I', 'I;16', 'I;16B', 'I;16L', 'I;16N'):
+        img = img.convert('I').point(lambda value: value / 256).convert('L')
+
+    # Resize, shrinking by an integer factor first where the image is much larger
+    img.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=THUMBNAIL_REDUCING_GAP)
+    img.load()
+
+    # Convert to RGB if necessary (handles CMYK, YCbCr, 16-bit, etc.)
     if img.mode not in ('RGB', 'L'):
         img = img.convert('RGB')
 
-    # Resize
-    img.thumbnail(MAX_IMAGE_SIZE, Image.Resampling.LANCZOS)
+    print(f"Image thumbnail generated from {full_size[0]}x{full_size[1]} "
+          f"(decoded at {decoded_size[0]}x{decoded_size[1]})")
+    return img
 
-    # Save
-    img.save(output_path, 'PNG')
 
-    print("Image thumbnail generated")
+def thumbnail_size(image_size, box):
+    """Size image_size would have after Image.thumbnail(box)."""
+    scale = min(box[0] / image_size[0], box[1] / image_size[1], 1.0)
+    return (max(1, round(image_size[0] * scale)), max(1, round(image_size[1] * scale)))
+
+
+def select_tiff_level(img, needed):
+    """
+    Seek a multi-page TIFF to its smallest reduced-resolution copy of page 1
+    (NewSubfileType bit 0) that is at least needed in both dimensions.
+    Leaves the image on page 1 if there is no such level.
+    """
+    full_w, full_h = img.size
+    best = None
+    for index in range(1, img.n_frames):
+        img.seek(index)
+        w, h = img.size
+        reduced = img.tag_v2.get(254, 0) & 1
+        same_aspect = abs(w / h - full_w / full_h) < 0.01 * (full_w / full_h)
+        if reduced and same_aspect and w >= needed[0] and h >= needed[1]:
+            if best is None or w < best[1]:
+                best = (index, w)
+    img.seek(best[0] if best else 0)
@@ -0,0 +1,206 @@
+"""
+Software mesh rasterizer
+
+Renders a triangle mesh straight to a PIL image with a NumPy z-buffer, flat
+Lambert shading and a fixed isometric camera. Used for STEP/IGES and STL
+previews in place of matplotlib's Poly3DCollection, which draws every triangle
+as a separate path and does not scale to large meshes.
+
+Triangles are scan-converted in batches: every (triangle, row) span is computed
+from the edge equations at once and expanded into fragments, so the work is
+proportional to the pixels actually covered.
+"""
+
+import numpy as np
+from PIL import Image
+
+BACKGROUND_RGB = (255, 255, 255)
+MESH_RGB = (70, 130, 180)  # steelblue
+AMBIENT = 0.35
+DIFFUSE = 0.65
+MARGIN = 0.04  # Fraction of the image left empty around the mesh
+SUPERSAMPLE = 2  # Render at this multiple and downsample for anti-aliasing
+MAX_SUPERSAMPLED_SIDE = 4096
+FRAGMENT_BATCH = 1 << 22  # Candidate pixels evaluated per array operation
+SPAN_EPSILON = 1e-6  # Pixels of slack on span ends
+
+# Isometric view: camera looks at the origin from (1, 1, 1), Z up
+VIEW_DIR = np.array([1.0, 1.0, 1.0]) / np.sqrt(3.0)
+LIGHT_DIR = np.array([0.4, 0.2, 1.0]) / np.linalg.norm([0.4, 0.2, 1.0])
+
+
+def view_basis(view_dir=VIEW_DIR, up=(0.0, 0.0, 1.0)):
+    """Rows are the camera's right, up and towards-viewer axes in world space."""
+    right = np.cross(up, view_dir)
+    right /= np.linalg.norm(right)
+    cam_up = np.cross(view_dir, right)
+    return np.stack([right, cam_up, view_dir])
+
+
+def render_mesh(vertices, faces, size, color=MESH_RGB, background=BACKGROUND_RGB):
+    """
+    Render a triangle mesh to an RGB PIL image that fits within size.
+
+    Args:
+        vertices: (N, 3) array of vertex positions
+        faces: (M, 3) array of vertex indices
+        size: (width, height) bounding box for the output image
+        color: RGB base colour of the mesh
+        background: RGB background colour
+
+    The image keeps the aspect ratio of the projected mesh, so it is usually
+    smaller than size along one axis.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    if len(vertices) == 0 or len(faces) == 0:
+        raise ValueError("mesh has no triangles")
+
+    # Camera space: x right, y up, z towards the viewer
+    camera = vertices @ view_basis().T
+    lo = camera[:, :2].min(axis=0)
+    extent = np.maximum(camera[:, :2].max(axis=0) - lo, 1e-12)
+
+    # Fit the projected mesh into the requested box
+    scale = min(size[0] / extent[0], size[1] / extent[1]) * (1 - 2 * MARGIN)
+    out_w = max(1, min(size[0], int(np.ceil(extent[0] * scale / (1 - 2 * MARGIN)))))
+    out_h = max(1, min(size[1], int(np.ceil(extent[1] * scale / (1 - 2 * MARGIN)))))
+    ss = SUPERSAMPLE if max(out_w, out_h) * SUPERSAMPLE <= MAX_SUPERSAMPLED_SIDE else 1
+    width, height = out_w * ss, out_h * ss
+    scale *= ss
+
+    # Screen space: pixel units, y down, depth grows away from the viewer
+    screen = np.empty_like(camera)
+    screen[:, 0] = (camera[:, 0] - lo[0]) * scale + (width - extent[0] * scale) / 2
+    screen[:, 1] = height - ((camera[:, 1] - lo[1]) * scale + (height - extent[1] * scale) / 2)
+    screen[:, 2] = -camera[:, 2]
+
+    shades = face_shades(vertices, faces)
+    frame = rasterize(screen[faces], shades, width, height)
+
+    rgb = np.empty((height * width, 3), dtype=np.uint8)
+    rgb[:] = background
+    covered = frame >= 0
+    rgb[covered] = np.clip(np.outer(frame[covered], color), 0, 255).astype(np.uint8)
+
+    image = Image.fromarray(rgb.reshape(height, width, 3), 'RGB')
+    if ss > 1:
+        image = image.resize((out_w, out_h), Image.Resampling.LANCZOS)
+    return image
+
+
+def face_shades(vertices, faces):
+    """Flat Lambert intensity per triangle (two-sided, so winding does not matter)."""
+    tri = vertices[faces]
+    normals = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)
+    lengths[lengths == 0] = 1.0
+    lambert = np.abs(normals @ LIGHT_DIR) / lengths
+    return AMBIENT + DIFFUSE * lambert
+
+
+def rasterize(triangles, shades, width, height):
+    """
+    Z-buffer rasterize screen-space triangles.
+
+    Args:
+        triangles: (M, 3, 3) array of (x, y, depth) per corner, in pixels
+        shades: (M,) intensity per triangle
+        width, height: frame size in pixels
+
+    Returns a flat (height * width,) array holding the shade of the nearest
+    triangle at each pixel centre, or -1 where nothing was drawn.
+    """
+    depth = np.full(width * height, np.inf)
+    winner = np.full(width * height, -1, dtype=np.int64)
+
+    # Rows whose pixel centres fall inside each triangle's vertical extent
+    y0 = np.clip(np.ceil(triangles[:, :, 1].min(axis=1) - 0.5), 0, height).astype(np.int64)
+    y1 = np.clip(np.floor(triangles[:, :, 1].max(axis=1) - 0.5), -1, height - 1).astype(np.int64)
+    x0 = np.clip(triangles[:, :, 0].min(axis=1), 0, width)
+    x1 = np.clip(triangles[:, :, 0].max(axis=1), 0, width)
+
+    # Signed area; degenerate and off-screen triangles are skipped
+    a, b, c = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+    area = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+    visible = np.flatnonzero((np.abs(area) > 1e-12) & (y1 >= y0) & (x1 > x0))
+    if len(visible) == 0:
+        return np.full(width * height, -1.0)
+
+    # Edge functions and depth as planes over the screen: value = a*x + b*y + c
+    planes = edge_planes(triangles, area)
+
+    # Batch triangles so the candidate fragments (bounded by bounding box area) fit in memory
+    rows = y1[visible] - y0[visible] + 1
+    box_area = np.cumsum(rows * (np.ceil(x1[visible] - x0[visible]).astype(np.int64) + 1))
+    bounds = np.searchsorted(box_area, np.arange(FRAGMENT_BATCH, box_area[-1], FRAGMENT_BATCH))
+    for idx in np.split(visible, np.unique(bounds)):
+        if len(idx):
+            _rasterize_spans(idx, y0, y1, planes, width, depth, winner)
+
+    frame = np.full(width * height, -1.0)
+    drawn = winner >= 0
+    frame[drawn] = shades[winner[drawn]]
+    return frame
+
+
+def edge_planes(triangles, area):
+    """
+    Per-triangle plane coefficients (a, b, c) with value = a*x + b*y + c for
+    the three barycentric weights and the depth, as a (M, 4, 3) array.
+    """
+    ax, ay, az = triangles[:, 0, 0], triangles[:, 0, 1], triangles[:, 0, 2]
+    bx, by, bz = triangles[:, 1, 0], triangles[:, 1, 1], triangles[:, 1, 2]
+    cx, cy, cz = triangles[:, 2, 0], triangles[:, 2, 1], triangles[:, 2, 2]
+    inv_area = np.divide(1.0, area, out=np.zeros_like(area), where=area != 0)
+
+    # Weight of each corner is the signed area of the opposite edge and the point
+    planes = np.empty((len(triangles), 4, 3))
+    for i, (px, py, qx, qy) in enumerate(((bx, by, cx, cy), (cx, cy, ax, ay), (ax, ay, bx, by))):
+        planes[:, i, 0] = (py - qy) * inv_area
+        planes[:, i, 1] = (qx - px) * inv_area
+        planes[:, i, 2] = (px * qy - py * qx) * inv_area
+    planes[:, 3] = (planes[:, 0] * az[:, None] + planes[:, 1] * bz[:, None]
+                    + planes[:, 2] * cz[:, None])
+    return planes
+
+
+def _rasterize_spans(idx, y0, y1, planes, width, depth, winner):
+    """Rasterize triangles idx row by row into the depth/winner buffers."""
+    # One entry per (triangle, row)
+    rows = y1[idx] - y0[idx] + 1
+    owner = np.repeat(idx, rows)
+    row_start = np.cumsum(rows) - rows
+    y = y0[owner] + np.arange(len(owner)) - np.repeat(row_start, rows)
+    cy = y + 0.5
+
+    # Each weight is a*x + (b*y + c) >= 0, which bounds x from one side
+    p = planes[owner]
+    left = np.zeros(len(owner))
+    right = np.full(len(owner), float(width))
+    for i in range(3):
+        slope = p[:, i, 0]
+        offset = p[:, i, 1] * cy + p[:, i, 2]
+        limit = np.divide(-offset, slope, out=np.zeros_like(slope), where=slope != 0)
+        left = np.where(slope > 0, np.maximum(left, limit), left)
+        right = np.where(slope < 0, np.minimum(right, limit), right)
+        right = np.where((slope == 0) & (offset < 0), -1.0, right)
+
+    # Pixel centres x + 0.5 within [left, right], with a little slack so
+    # shared edges do not leave cracks
+    start = np.ceil(left - 0.5 - SPAN_EPSILON).astype(np.int64)
+    stop = np.minimum(np.floor(right - 0.5 + SPAN_EPSILON).astype(np.int64), width - 1)
+    count = np.maximum(stop - start + 1, 0)
+
+    # Expand spans into fragments
+    span = np.repeat(np.arange(len(owner)), count)
+    if len(span) == 0:
+        return
+    x = start[span] + np.arange(len(span)) - np.repeat(np.cumsum(count) - count, count)
+    z = p[span, 3, 0] * (x + 0.5) + (p[span, 3, 1] * cy[span] + p[span, 3, 2])
+    pixel = y[span] * width + x
+
+    # Nearest fragment per pixel wins, including against earlier batches
+    np.minimum.at(depth, pixel, z)
+    nearest = z <= depth[pixel]
+    winner[pixel[nearest]] = owner[span[nearest]]
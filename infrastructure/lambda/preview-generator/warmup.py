@@ -0,0 +1,128 @@
+"""
+Preview generator warmup
+
+Runs during Lambda init (imported by handler.py) so the first invocation on a
+new container does not pay for heavy imports, matplotlib/ezdxf font loading
+and figure setup. Controlled by the PREVIEW_WARMUP environment variable:
+
+    PREVIEW_WARMUP=all          # default: every format
+    PREVIEW_WARMUP=dxf,step     # only these formats
+    PREVIEW_WARMUP=none         # skip warmup
+
+Also keeps a small pool of Agg figures that matplotlib-based rendering can
+reuse instead of creating a new pyplot figure per request.
+"""
+
+import importlib
+import os
+import time
+
+WARMUP_ENV = 'PREVIEW_WARMUP'
+
+# Modules each preview format imports on first use
+FORMAT_MODULES = {
+    'dxf': ['ezdxf', 'ezdxf.addons.drawing', 'ezdxf.addons.drawing.recorder', 'dxf_raster',
+            'ezdxf.addons.drawing.matplotlib', 'matplotlib.figure',
+            'matplotlib.backends.backend_agg'],
+    'step': ['OCP.STEPControl', 'OCP.IGESControl', 'OCP.IFSelect', 'OCP.Bnd', 'OCP.BRepBndLib',
+             'OCP.BRepMesh', 'OCP.BRepTools', 'OCP.TopExp', 'OCP.TopAbs', 'OCP.TopoDS',
+             'OCP.BRep', 'OCP.TopLoc', 'numpy', 'rasterizer'],
+    'stl': ['trimesh', 'numpy', 'rasterizer'],
+    'pdf': ['pypdfium2', 'pdf2image'],
+    'image': ['PIL.Image', 'PIL.PngImagePlugin', 'PIL.JpegImagePlugin',
+              'PIL.TiffImagePlugin', 'PIL.WebPImagePlugin'],
+}
+
+FIGURE_POOL_SIZE = 2
+FIGURE_SIZE = (10, 8)  # inches
+FIGURE_DPI = 100
+
+# Milliseconds spent warming each format during init
+warmup_timings = {}
+
+_figure_pool = []
+
+
+def warmup_formats():
+    """Formats selected by PREVIEW_WARMUP."""
+    setting = os.environ.get(WARMUP_ENV, 'all').strip().lower()
+    if setting in ('', 'none', 'false', '0'):
+        return []
+    if setting == 'all':
+        return list(FORMAT_MODULES)
+    return [fmt.strip() for fmt in setting.split(',') if fmt.strip() in FORMAT_MODULES]
+
+
+def warm(formats):
+    """
+    Import and prime the libraries for each format, recording the time taken.
+    Failures are logged and skipped so a missing optional library never breaks init.
+    """
+    for fmt in formats:
+        start = time.perf_counter()
+        try:
+            for module in FORMAT_MODULES[fmt]:
+                importlib.import_module(module)
+            if fmt == 'dxf':
+                warm_dxf()
+        except Exception as e:
+            print(f"Warmup for {fmt} failed: {e}")
+            continue
+        warmup_timings[fmt] = round((time.perf_counter() - start) * 1000)
+
+    if warmup_timings:
+        print("Warmup: " + ', '.join(f"{fmt}={ms}ms" for fmt, ms in warmup_timings.items()))
+
+
+def warm_dxf():
+    """
+    Render a one-line DXF with the fast renderer and into a pooled figure for
+    the matplotlib fallback. This loads ezdxf's fonts and builds matplotlib's
+    font cache and text path cache.
+    """
+    import ezdxf
+    from ezdxf.addons.drawing import Frontend, RenderContext
+    from ezdxf.addons.drawing.matplotlib import MatplotlibBackend
+    from dxf_raster import render_dxf
+
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    msp.add_line((0, 0), (10, 0))
+    msp.add_text('0123456789 ABC', dxfattribs={'height': 1})
+
+    render_dxf(doc, (100, 100))
+
+    figures = [acquire_figure() for _ in range(FIGURE_POOL_SIZE)]
+    for fig in figures:
+        release_figure(fig)
+
+    fig = acquire_figure()
+    try:
+        ax = fig.add_axes([0, 0, 1, 1])
+        Frontend(RenderContext(doc), MatplotlibBackend(ax)).draw_layout(msp, finalize=True)
+        fig.canvas.draw()
+    finally:
+        release_figure(fig)
+
+
+def acquire_figure(figsize=FIGURE_SIZE, dpi=FIGURE_DPI):
+    """Take a blank Agg figure from the pool, or create one if the pool is empty."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    if _figure_pool:
+        fig = _figure_pool.pop()
+        fig.set_size_inches(figsize)
+        fig.set_dpi(dpi)
+        return fig
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def release_figure(fig):
+    """Clear a figure and return it to the pool."""
+    fig.clear()
+    if len(_figure_pool) < FIGURE_POOL_SIZE:
+        _figure_pool.append(fig)
@@ -5,14 +5,20 @@ Triggered by EventBridge when GuardDuty Malware Protection completes scanning
 a file uploaded to the quote attachments S3 bucket.
 
 Sends the quote request email with or without the attachment based on scan results.
-Includes inline preview images for supported file types.
+Includes inline preview images for supported file types, and a dimensioned
+blueprint PDF for DXF and DWG drawings.
 """
 
 import json
 import boto3
 import os
 import base64
+import gzip
+import hashlib
 import html
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
@@ -27,6 +33,24 @@ lambda_client = boto3.client('lambda')
 
 DWG_CONVERTER_FUNCTION = os.environ.get('DWG_CONVERTER_FUNCTION', '')
 PREVIEW_GENERATOR_FUNCTION = os.environ.get('PREVIEW_GENERATOR_FUNCTION', '')
+BLUEPRINT_GENERATOR_FUNCTION = os.environ.get('BLUEPRINT_GENERATOR_FUNCTION', '')
+
+# Prefix for DXF files written by the DWG converter (deleted after processing)
+CONVERTED_PREFIX = 'converted/'
+
+# Prefix for PDFs written by the blueprint generator (deleted once read)
+BLUEPRINT_PREFIX = 'blueprints/'
+
+# Content-addressed cache of converted DXFs and previews, keyed by attachment SHA-256 and
+# the deployed converter/preview generator code (see artifact_cache_version).
+# Entries expire via the bucket lifecycle rule for this prefix. Blueprints are not cached:
+# their title page carries the submitted filename and generation date.
+CACHE_PREFIX = 'cache/'
+CACHED_DXF_NAME = 'converted.dxf'
+CACHED_PREVIEW_NAME = 'preview.png'
+
+# Maximum number of pipeline stages (S3 read, conversion, preview, blueprint) run at once
+MAX_STAGE_WORKERS = 4
 
 # File extensions that support preview generation
 PREVIEW_SUPPORTED_EXTENSIONS = {
@@ -68,11 +92,17 @@ def handler(event, context):
             print("Missing bucket or key in event")
             return {'statusCode': 400, 'body': 'Missing bucket or key'}
 
+        # Browser uploads are scanned again once contact_form copies them into quotes/,
+        # and converter/blueprint output and cache entries are intermediate files, not submissions
+        if key.startswith(('uploads/', CONVERTED_PREFIX, BLUEPRINT_PREFIX, CACHE_PREFIX)):
+            print(f"Ignoring scan result for staged upload {key}")
+            return {'statusCode': 200, 'body': 'Staged upload ignored'}
+
         print(f"Processing scan result for s3://{bucket}/{key}: {scan_result}")
 
         # Get object and metadata
         try:
-            obj = s3.get_object(Bucket=bucket, Key=key)
+            obj = s3.get_object(Bucket=bucket, Key=key, ChecksumMode='ENABLED')
             metadata = obj['Metadata']
         except ClientError as e:
             if e.response['Error']['Code'] == 'NoSuchKey':
@@ -95,46 +125,88 @@ def handler(event, context):
         # Process based on scan result
         if scan_result == 'NO_THREATS_FOUND':
             # Clean file - send email with attachment
-            file_content = obj['Body'].read()
+            file_ext = get_file_extension(original_filename)
+            dxf_filename = original_filename.rsplit('.', 1)[0] + '.dxf'
+            blueprint_filename = original_filename.rsplit('.', 1)[0] + '_blueprint.pdf'
+
+            # Independent stages run concurrently; only true dependencies are serialized.
+            # Conversion and preview wait on the cache lookup so repeat drawings skip them.
+            # contact_form stores attachments with an S3 SHA-256 checksum, so the lookup
+            # usually starts at once instead of after reading and hashing the body.
+            stages = {
+                'read_body': (obj['Body'].read, ()),
+                'cache_lookup': (lambda digest: lookup_cached_artifacts(bucket, digest), ('hash',)),
+            }
+            checksum_digest = object_sha256(obj)
+            if checksum_digest:
+                stages['hash'] = (lambda: checksum_digest, ())
+            else:
+                stages['hash'] = (lambda body: hashlib.sha256(body).hexdigest(), ('read_body',))
+
+            if file_ext == '.dwg':
+                # If DWG file, also convert to DXF and attach both
+                print("DWG file detected, attempting conversion to DXF")
+                stages['convert_dwg'] = (
+                    lambda cached: cached_conversion(cached, dxf_filename) or convert_dwg_to_dxf(bucket, key),
+                    ('cache_lookup',)
+                )
+                # The converter leaves the DXF in S3; fetch it for the email while the
+                # preview generator reads the same key directly
+                stages['read_dxf'] = (read_converted_dxf, ('convert_dwg',))
+                stages['preview'] = (
+                    lambda cached, conversion: (read_cached_artifact(cached, CACHED_PREVIEW_NAME)
+                                                or generate_converted_preview(conversion, dxf_filename)),
+                    ('cache_lookup', 'convert_dwg')
+                )
+                stages['blueprint'] = (
+                    lambda conversion: generate_converted_blueprint(conversion, dxf_filename),
+                    ('convert_dwg',)
+                )
+            elif file_ext in PREVIEW_SUPPORTED_EXTENSIONS:
+                # Generate preview directly from the file
+                print(f"Generating preview for {file_ext} file")
+                stages['preview'] = (
+                    lambda cached: read_cached_artifact(cached, CACHED_PREVIEW_NAME) or generate_preview(bucket, key),
+                    ('cache_lookup',)
+                )
+                if file_ext == '.dxf':
+                    stages['blueprint'] = (lambda: generate_blueprint_pdf(bucket, key, original_filename), ())
+
+            results, timings = run_stages(stages)
+            print(f"Stage timings: {format_timings(timings)}")
+
+            file_content = results['read_body']
             print(f"File is clean: {original_filename} ({len(file_content)} bytes)")
 
             # Build list of attachments (original file first)
             attachments = [(file_content, original_filename, content_type)]
 
-            # Track if we have a DXF for preview (converted from DWG)
-            dxf_content_for_preview = None
-
-            # If DWG file, also convert to DXF and attach both
-            if original_filename.lower().endswith('.dwg'):
-                print("DWG file detected, attempting conversion to DXF")
-                dxf_content, _ = convert_dwg_to_dxf(bucket, key)
+            if 'convert_dwg' in results:
+                dxf_content = results['read_dxf']
                 if dxf_content:
                     # Use original filename with .dxf extension
-                    dxf_filename = original_filename.rsplit('.', 1)[0] + '.dxf'
                     attachments.append((dxf_content, dxf_filename, 'application/dxf'))
-                    dxf_content_for_preview = dxf_content
                     print(f"Will attach both {original_filename} and {dxf_filename} to email")
                 else:
                     print("DXF conversion failed, will attach DWG only")
 
-            # Generate preview image
-            preview_content = None
-            file_ext = get_file_extension(original_filename)
+            blueprint_content = results.get('blueprint')
+            if blueprint_content:
+                attachments.append((blueprint_content, blueprint_filename, 'application/pdf'))
 
-            if original_filename.lower().endswith('.dwg') and dxf_content_for_preview:
-                # For DWG, generate preview from the converted DXF
-                print("Generating preview from converted DXF")
-                preview_content = generate_preview_from_content(
-                    dxf_content_for_preview,
-                    original_filename.rsplit('.', 1)[0] + '.dxf'
-                )
-            elif file_ext in PREVIEW_SUPPORTED_EXTENSIONS:
-                # Generate preview directly from the file
-                print(f"Generating preview for {file_ext} file")
-                preview_content = generate_preview(bucket, key)
+            preview_content = results.get('preview')
 
             send_email_with_attachment(form_data, attachments, preview_content)
 
+            update_artifact_cache(bucket, results, timings)
+
+            converted_key = (results.get('convert_dwg') or {}).get('dxf_key', '')
+            if converted_key.startswith(CONVERTED_PREFIX):
+                try:
+                    s3.delete_object(Bucket=bucket, Key=converted_key)
+                except Exception as del_err:
+                    print(f"Warning: Failed to delete {converted_key}: {del_err}")
+
         elif scan_result == 'THREATS_FOUND':
             # Malicious file - send email WITHOUT attachment
             print(f"THREAT DETECTED in {key}! Sending email without attachment.")
@@ -159,6 +231,61 @@ def handler(event, context):
         raise
 
 
+def run_stages(stages, max_workers=MAX_STAGE_WORKERS):
+    """
+    Run a small dependency graph of pipeline stages on a thread pool.
+
+    Args:
+        stages: Dict of name -> (func, dependency_names). Each func is called with
+            the results of its dependencies, in order, once they have all finished.
+        max_workers: Maximum number of stages running at once
+
+    Returns:
+        (results, timings) where results maps stage name to return value and
+        timings maps stage name (plus 'total') to wall-clock milliseconds.
+    """
+    for name, (_, deps) in stages.items():
+        missing = [dep for dep in deps if dep not in stages]
+        if missing:
+            raise ValueError(f"Stage {name} depends on unknown stage(s): {missing}")
+
+    def timed(func, *args):
+        stage_start = time.monotonic()
+        result = func(*args)
+        return result, (time.monotonic() - stage_start) * 1000
+
+    start = time.monotonic()
+    results = {}
+    timings = {}
+    pending = dict(stages)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            # Start every stage whose dependencies have completed
+            for name, (func, deps) in list(pending.items()):
+                if all(dep in results for dep in deps):
+                    del pending[name]
+                    future = pool.submit(timed, func, *[results[dep] for dep in deps])
+                    running[future] = name
+
+            if not running:
+                raise ValueError(f"Circular stage dependencies: {sorted(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name], timings[name] = future.result()
+
+    timings['total'] = (time.monotonic() - start) * 1000
+    return results, timings
+
+
+def format_timings(timings):
+    """Format a timings dict as 'name=12ms' pairs for log lines."""
+    return ' '.join(f"{name}={ms:.0f}ms" for name, ms in timings.items())
+
+
 def get_file_extension(filename):
     """Get lowercase file extension including the dot."""
     if '.' in filename:
@@ -169,37 +296,293 @@ def get_file_extension(filename):
 def convert_dwg_to_dxf(bucket, key):
     """
     Invoke DWG converter Lambda to convert file to DXF.
-    Returns (dxf_content_bytes, dxf_filename) or (None, None) on failure.
+
+    The converter writes the DXF to S3 and returns a reference to it. Returns a dict
+    with 'dxf_filename' and either 'dxf_key' (S3 reference, plus size/checksum) or
+    'dxf_content' (bytes, from converters that still return the DXF inline).
+    Returns None on failure.
     """
     if not DWG_CONVERTER_FUNCTION:
         print("DWG converter function not configured, skipping conversion")
-        return None, None
+        return None
 
     try:
         print(f"Invoking DWG converter for s3://{bucket}/{key}")
+        dxf_name = os.path.basename(key).rsplit('.', 1)[0] + '.dxf'
         response = lambda_client.invoke(
             FunctionName=DWG_CONVERTER_FUNCTION,
             InvocationType='RequestResponse',
             Payload=json.dumps({
                 'bucket': bucket,
-                'key': key
+                'key': key,
+                'output_key': f"{CONVERTED_PREFIX}{uuid.uuid4()}/{dxf_name}",
+                'compress': True
             })
         )
 
         result = json.loads(response['Payload'].read())
 
-        if result.get('success'):
-            dxf_content = base64.b64decode(result['dxf_content'])
-            dxf_filename = result['dxf_filename']
-            print(f"DWG converted successfully: {dxf_filename} ({len(dxf_content)} bytes)")
-            return dxf_content, dxf_filename
-        else:
+        if not result.get('success'):
             print(f"DWG conversion failed: {result.get('error', 'Unknown error')}")
-            return None, None
+            return None
+
+        if result.get('dxf_key'):
+            print(f"DWG converted successfully: s3://{bucket}/{result['dxf_key']} "
+                  f"({result.get('dxf_size')} bytes, sha256={result.get('dxf_sha256')})")
+            return {
+                'dxf_filename': result['dxf_filename'],
+                'dxf_bucket': result.get('dxf_bucket', bucket),
+                'dxf_key': result['dxf_key'],
+                'dxf_sha256': result.get('dxf_sha256'),
+                'compressed': result.get('compressed', False),
+            }
+
+        dxf_content = base64.b64decode(result['dxf_content'])
+        print(f"DWG converted successfully: {result['dxf_filename']} ({len(dxf_content)} bytes)")
+        return {'dxf_filename': result['dxf_filename'], 'dxf_content': dxf_content}
 
     except Exception as e:
         print(f"Error invoking DWG converter: {e}")
-        return None, None
+        return None
+
+
+def read_converted_dxf(conversion):
+    """
+    Return the DXF bytes for a conversion result, or None if conversion failed.
+    Fetches and decompresses the converter's S3 output when it was not returned inline.
+    """
+    if not conversion:
+        return None
+    if 'dxf_content' in conversion:
+        return conversion['dxf_content']
+
+    try:
+        obj = s3.get_object(Bucket=conversion['dxf_bucket'], Key=conversion['dxf_key'])
+        dxf_content = obj['Body'].read()
+        if obj.get('ContentEncoding') == 'gzip':
+            dxf_content = gzip.decompress(dxf_content)
+        return dxf_content
+    except Exception as e:
+        print(f"Error reading converted DXF: {e}")
+        return None
+
+
+def generate_converted_preview(conversion, dxf_filename):
+    """Generate a preview for a DWG conversion result, or None if conversion failed."""
+    if not conversion:
+        return None
+    print("Generating preview from converted DXF")
+    if 'dxf_key' in conversion:
+        return generate_preview(conversion['dxf_bucket'], conversion['dxf_key'])
+    return generate_preview_from_content(conversion['dxf_content'], dxf_filename)
+
+
+def generate_blueprint_pdf(bucket, key, filename):
+    """
+    Invoke blueprint generator Lambda to create a dimensioned blueprint of a DXF.
+
+    The generator writes the PDF to S3 and returns its key; the PDF is read back and
+    the S3 copy deleted. Returns pdf_content_bytes or None on failure.
+    """
+    if not BLUEPRINT_GENERATOR_FUNCTION:
+        print("Blueprint generator function not configured, skipping blueprint")
+        return None
+
+    try:
+        print(f"Invoking blueprint generator for s3://{bucket}/{key}")
+        stem = filename.rsplit('.', 1)[0]
+        response = lambda_client.invoke(
+            FunctionName=BLUEPRINT_GENERATOR_FUNCTION,
+            InvocationType='RequestResponse',
+            Payload=json.dumps({
+                'bucket': bucket,
+                'key': key,
+                'filename': filename,
+                'output_key': f"{BLUEPRINT_PREFIX}{uuid.uuid4()}/{stem}_blueprint.pdf"
+            })
+        )
+
+        result = json.loads(response['Payload'].read())
+
+        if not result.get('success'):
+            print(f"Blueprint generation failed: {result.get('error', 'Unknown error')}")
+            return None
+
+        blueprint_bucket = result.get('blueprint_bucket', bucket)
+        pdf_content = s3.get_object(Bucket=blueprint_bucket, Key=result['blueprint_key'])['Body'].read()
+        print(f"Blueprint generated successfully: {result.get('part_name')}, "
+              f"{result.get('dimensions')} dimensions ({len(pdf_content)} bytes)")
+
+        try:
+            s3.delete_object(Bucket=blueprint_bucket, Key=result['blueprint_key'])
+        except Exception as del_err:
+            print(f"Warning: Failed to delete {result['blueprint_key']}: {del_err}")
+
+        return pdf_content
+
+    except Exception as e:
+        print(f"Error invoking blueprint generator: {e}")
+        return None
+
+
+def generate_converted_blueprint(conversion, dxf_filename):
+    """Generate a blueprint for a DWG conversion result, or None if conversion failed."""
+    if not conversion:
+        return None
+    if 'dxf_key' not in conversion:
+        print("Converted DXF was returned inline, skipping blueprint")
+        return None
+    print("Generating blueprint from converted DXF")
+    return generate_blueprint_pdf(conversion['dxf_bucket'], conversion['dxf_key'], dxf_filename)
+
+
+def object_sha256(obj):
+    """
+    Hex SHA-256 of an object's content from its S3 checksum, or None if it was not
+    stored with a full-object SHA-256 (multipart uploads get a composite checksum).
+    """
+    checksum = obj.get('ChecksumSHA256')
+    if not checksum or '-' in checksum or obj.get('ChecksumType', 'FULL_OBJECT') != 'FULL_OBJECT':
+        return None
+    return base64.b64decode(checksum).hex()
+
+
+# CodeSha256 of each generator function, read once per container
+generator_code_hashes = {}
+
+
+def artifact_cache_version():
+    """
+    Short hash of the deployed DWG converter and preview generator code, so cached
+    artifacts are not reused once either function is redeployed.
+    Returns None if a function's code hash cannot be read.
+    """
+    try:
+        for function_name in (DWG_CONVERTER_FUNCTION, PREVIEW_GENERATOR_FUNCTION):
+            if function_name and function_name not in generator_code_hashes:
+                config = lambda_client.get_function_configuration(FunctionName=function_name)
+                generator_code_hashes[function_name] = config['CodeSha256']
+        code_hashes = [generator_code_hashes.get(name, '')
+                       for name in (DWG_CONVERTER_FUNCTION, PREVIEW_GENERATOR_FUNCTION)]
+        return hashlib.sha256('|'.join(code_hashes).encode()).hexdigest()[:12]
+    except Exception as e:
+        print(f"Warning: Could not read generator code hashes, skipping artifact cache: {e}")
+        return None
+
+
+def artifact_cache_key(digest, version, name):
+    """S3 key for a cached artifact of the attachment with the given SHA-256."""
+    return f"{CACHE_PREFIX}{digest}/{version}/{name}"
+
+
+def lookup_cached_artifacts(bucket, digest):
+    """
+    Check the cache for a converted DXF and preview of this attachment.
+
+    Returns a dict with 'bucket', 'digest', 'version', 'hits' and 'served', where
+    hits maps artifact name to {'key', 'generation_ms'} for each artifact already in
+    the cache, and served collects the names actually used in place of generating them.
+    The lookup is best-effort: any error is logged and treated as a miss, and
+    version is None when the cache cannot be used at all.
+    """
+    version = artifact_cache_version()
+    hits = {}
+    for name in (CACHED_DXF_NAME, CACHED_PREVIEW_NAME) if version else ():
+        cache_key = artifact_cache_key(digest, version, name)
+        try:
+            head = s3.head_object(Bucket=bucket, Key=cache_key)
+        except ClientError:
+            continue
+        except Exception as e:
+            print(f"Warning: Artifact cache lookup failed, treating as a miss: {e}")
+            break
+        generation_ms = float(head.get('Metadata', {}).get('generation-ms', 0) or 0)
+        hits[name] = {'key': cache_key, 'generation_ms': generation_ms}
+    return {'bucket': bucket, 'digest': digest, 'version': version, 'hits': hits, 'served': set()}
+
+
+def cached_conversion(cached, dxf_filename):
+    """Return a conversion result pointing at the cached DXF, or None on a cache miss."""
+    hit = cached['hits'].get(CACHED_DXF_NAME)
+    if not hit:
+        return None
+    print(f"Using cached DXF s3://{cached['bucket']}/{hit['key']}")
+    cached['served'].add(CACHED_DXF_NAME)
+    return {
+        'dxf_filename': dxf_filename,
+        'dxf_bucket': cached['bucket'],
+        'dxf_key': hit['key'],
+        'cached': True,
+    }
+
+
+def read_cached_artifact(cached, name):
+    """Return cached artifact bytes, or None on a cache miss or read failure."""
+    hit = cached['hits'].get(name)
+    if not hit:
+        return None
+    try:
+        content = s3.get_object(Bucket=cached['bucket'], Key=hit['key'])['Body'].read()
+        print(f"Using cached {name} s3://{cached['bucket']}/{hit['key']} ({len(content)} bytes)")
+        cached['served'].add(name)
+        return content
+    except Exception as e:
+        print(f"Error reading cached {name}: {e}")
+        return None
+
+
+def update_artifact_cache(bucket, results, timings):
+    """
+    Store newly generated artifacts in the cache and log the hit rate and time saved.
+    Only artifacts actually served from the cache count as hits.
+    Cache failures are logged but never fail the event.
+    """
+    cached = results.get('cache_lookup')
+    if not cached or not cached['version']:
+        return
+
+    digest = cached['digest']
+    version = cached['version']
+    hits = cached['hits']
+    wanted = []
+    if 'convert_dwg' in results:
+        wanted.append(CACHED_DXF_NAME)
+    if 'preview' in results:
+        wanted.append(CACHED_PREVIEW_NAME)
+
+    try:
+        conversion = results.get('convert_dwg')
+        if (CACHED_DXF_NAME in wanted and CACHED_DXF_NAME not in hits
+                and conversion and conversion.get('dxf_key')):
+            copy_args = {}
+            if conversion.get('compressed'):
+                copy_args['ContentEncoding'] = 'gzip'
+            s3.copy_object(
+                Bucket=bucket,
+                Key=artifact_cache_key(digest, version, CACHED_DXF_NAME),
+                CopySource={'Bucket': conversion['dxf_bucket'], 'Key': conversion['dxf_key']},
+                Metadata={'generation-ms': f"{timings.get('convert_dwg', 0):.0f}"},
+                MetadataDirective='REPLACE',
+                **copy_args
+            )
+
+        preview_content = results.get('preview')
+        if CACHED_PREVIEW_NAME in wanted and CACHED_PREVIEW_NAME not in hits and preview_content:
+            s3.put_object(
+                Bucket=bucket,
+                Key=artifact_cache_key(digest, version, CACHED_PREVIEW_NAME),
+                Body=preview_content,
+                ContentType='image/png',
+                Metadata={'generation-ms': f"{timings.get('preview', 0):.0f}"}
+            )
+    except Exception as e:
+        print(f"Warning: Failed to update artifact cache: {e}")
+
+    served = cached['served']
+    hit_count = sum(1 for name in wanted if name in served)
+    saved_ms = sum(hits[name]['generation_ms'] for name in wanted if name in served)
+    status = ' '.join(f"{name}={'hit' if name in served else 'miss'}" for name in wanted)
+    print(f"Artifact cache {digest[:12]}: {status} | hits={hit_count}/{len(wanted)} saved={saved_ms:.0f}ms")
 
 
 def generate_preview(bucket, key):
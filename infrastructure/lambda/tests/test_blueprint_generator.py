@@ -0,0 +1,122 @@
+"""
+Unit tests for the blueprint generator's geometry analysis.
+
+The generator lives in tools/blueprint-generator and is copied into the
+blueprint-generator Lambda image.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the blueprint generator to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', '..', 'tools', 'blueprint-generator'))
+
+
+def chained_edge(length, pieces, jitter, angle=0.0, seed=0):
+    """One straight edge split into pieces whose shared vertices are jittered across it."""
+    rng = np.random.default_rng(seed)
+    along = np.linspace(0.0, length, pieces + 1)
+    points = np.stack([along, rng.uniform(-jitter, jitter, pieces + 1)], axis=1)
+    cos, sin = np.cos(angle), np.sin(angle)
+    points = points @ np.array([[cos, sin], [-sin, cos]])
+    segments = np.stack([points[:-1], points[1:]], axis=1)
+    return segments[rng.permutation(pieces)]
+
+
+class TestMergeCollinearSegments:
+    """Tests for the merge_collinear_segments function."""
+
+    @pytest.mark.parametrize('length,pieces,jitter', [
+        (10.0, 40, 0.0001),
+        (10.0, 40, 0.0004),
+        (48.0, 200, 0.0002),
+    ])
+    def test_merges_pieces_with_jittered_shared_vertices(self, length, pieces, jitter):
+        """Test that an edge written as jittered pieces merges back into one segment."""
+        from generate_blueprint import merge_collinear_segments
+
+        merged = merge_collinear_segments(chained_edge(length, pieces, jitter))
+
+        assert len(merged) == 1
+        assert np.hypot(*(merged[0][1] - merged[0][0])) == pytest.approx(length, abs=0.001)
+
+    @pytest.mark.parametrize('angle', [np.pi / 2, 0.7, np.pi - 1e-5])
+    def test_merges_pieces_in_any_direction(self, angle):
+        """Test that vertical, angled and near-pi edges merge like horizontal ones."""
+        from generate_blueprint import merge_collinear_segments
+
+        merged = merge_collinear_segments(chained_edge(10.0, 40, 0.0004, angle=angle))
+
+        assert len(merged) == 1
+
+    def test_keeps_parallel_edges_apart(self):
+        """Test that parallel edges further apart than the tolerance stay separate."""
+        from generate_blueprint import merge_collinear_segments
+
+        segments = np.concatenate([chained_edge(10.0, 40, 0.0001),
+                                   chained_edge(10.0, 40, 0.0001, seed=1) + [0.0, 0.01]])
+
+        assert len(merge_collinear_segments(segments)) == 2
+
+    def test_keeps_shallow_angle_edges_apart(self):
+        """Test that long edges meeting at a shallow angle are not merged."""
+        from generate_blueprint import merge_collinear_segments
+
+        segments = np.array([[[0.0, 0.0], [10.0, 0.0]], [[10.0, 0.0], [20.0, 0.01]]])
+
+        assert len(merge_collinear_segments(segments)) == 2
+
+    def test_does_not_chord_finely_tessellated_circle(self):
+        """Test that merged edges of a 1000-edge circle stay within tolerance of the arc."""
+        from generate_blueprint import COORDINATE_TOLERANCE, merge_collinear_segments
+
+        angles = np.linspace(0.0, 2 * np.pi, 1001)
+        points = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+        segments = np.stack([points[:-1], points[1:]], axis=1)
+
+        merged = merge_collinear_segments(segments)
+
+        midpoints = merged.mean(axis=1)
+        assert np.abs(np.hypot(midpoints[:, 0], midpoints[:, 1]) - 1.0).max() <= COORDINATE_TOLERANCE
+
+    def test_keeps_rectangle_edges(self):
+        """Test that edges meeting at corners are returned unchanged."""
+        from generate_blueprint import merge_collinear_segments
+
+        segments = np.array([
+            [[0.0, 0.0], [4.0, 0.0]],
+            [[4.0, 0.0], [4.0, 3.0]],
+            [[4.0, 3.0], [0.0, 3.0]],
+            [[0.0, 3.0], [0.0, 0.0]],
+        ])
+
+        np.testing.assert_array_equal(merge_collinear_segments(segments), segments)
+
+
+class TestClusterValues:
+    """Tests for the cluster_values function."""
+
+    def test_clusters_values_within_tolerance(self):
+        """Test that values either side of a rounding boundary share a cluster."""
+        from generate_blueprint import cluster_values
+
+        labels, centers = cluster_values([1.0, 2.0, 1.0004, 0.9996, 2.0003], 0.001)
+
+        assert labels.tolist() == [0, 1, 0, 0, 1]
+        assert centers.tolist() == [1.0, 2.0]
+
+    def test_caps_cluster_span_at_tolerance(self):
+        """Test that evenly spaced values do not chain into one wide cluster."""
+        from generate_blueprint import cluster_values
+
+        values = np.arange(0, 0.05, 0.0009)
+        labels, centers = cluster_values(values, 0.001)
+
+        assert len(centers) == 28
+        for label in range(len(centers)):
+            members = values[labels == label]
+            assert members.max() - members.min() <= 0.001
@@ -0,0 +1,112 @@
+"""
+Unit tests for the blueprint generator Lambda handler.
+"""
+
+import gzip
+import importlib.util
+import io
+import os
+import sys
+
+import boto3
+import pytest
+from moto import mock_aws
+
+LAMBDA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BLUEPRINT_GENERATOR_DIR = os.path.join(LAMBDA_DIR, 'blueprint-generator')
+BLUEPRINT_TOOL_DIR = os.path.join(LAMBDA_DIR, '..', '..', 'tools', 'blueprint-generator')
+
+
+def plate_dxf():
+    """A 4 x 3 plate with a hole, as DXF bytes."""
+    import ezdxf
+
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    msp.add_lwpolyline([(0, 0), (4, 0), (4, 3), (0, 3)], close=True)
+    msp.add_circle((1, 1), 0.25)
+    stream = io.StringIO()
+    doc.write(stream)
+    return stream.getvalue().encode()
+
+
+@pytest.fixture
+def blueprint_handler(tmp_path):
+    """Load blueprint-generator/handler.py under a unique module name with a fresh analysis cache."""
+    os.environ['BLUEPRINT_CACHE_DIR'] = str(tmp_path / 'blueprint-cache')
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    sys.path.insert(0, BLUEPRINT_TOOL_DIR)
+    try:
+        spec = importlib.util.spec_from_file_location(
+            'blueprint_generator_handler', os.path.join(BLUEPRINT_GENERATOR_DIR, 'handler.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        yield module
+    finally:
+        sys.path.remove(BLUEPRINT_TOOL_DIR)
+        os.environ.pop('BLUEPRINT_CACHE_DIR', None)
+
+
+@pytest.fixture
+def s3():
+    """A mocked S3 bucket the handler's client can reach."""
+    with mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket='test-bucket')
+        yield client
+
+
+class TestLambdaHandler:
+    """Tests for the lambda_handler function."""
+
+    def _generate(self, handler_module, s3, key, **event):
+        handler_module.s3 = s3
+        return handler_module.lambda_handler(
+            {'bucket': 'test-bucket', 'key': key, 'output_key': 'blueprints/test/plate_blueprint.pdf',
+             **event}, None)
+
+    def test_generates_blueprint_from_plain_dxf(self, blueprint_handler, s3):
+        """Test that an uncompressed DXF produces a PDF blueprint in S3."""
+        s3.put_object(Bucket='test-bucket', Key='quotes/plate.dxf', Body=plate_dxf())
+
+        response = self._generate(blueprint_handler, s3, 'quotes/plate.dxf')
+
+        assert response['success'] is True
+        assert response['blueprint_filename'] == 'plate_blueprint.pdf'
+        assert response['dimensions'] > 0
+        pdf = s3.get_object(Bucket='test-bucket', Key=response['blueprint_key'])['Body'].read()
+        assert pdf.startswith(b'%PDF')
+        assert len(pdf) == response['blueprint_size']
+
+    def test_decompresses_gzip_content_encoding(self, blueprint_handler, s3):
+        """Test that converter output stored with ContentEncoding=gzip is decompressed."""
+        s3.put_object(Bucket='test-bucket', Key='converted/abc/plate.dxf',
+                      Body=gzip.compress(plate_dxf()), ContentEncoding='gzip')
+
+        response = self._generate(blueprint_handler, s3, 'converted/abc/plate.dxf', png=True)
+
+        assert response['success'] is True
+        png = s3.get_object(Bucket='test-bucket', Key=response['png_key'])['Body'].read()
+        assert png.startswith(b'\x89PNG')
+
+    def test_does_not_guess_gzip_from_magic_bytes(self, blueprint_handler, s3):
+        """Test that gzip-looking content without ContentEncoding=gzip is not decompressed."""
+        s3.put_object(Bucket='test-bucket', Key='quotes/plate.dxf', Body=gzip.compress(plate_dxf()))
+
+        response = self._generate(blueprint_handler, s3, 'quotes/plate.dxf')
+
+        assert response['success'] is False
+        assert 'Blueprint generation failed' in response['error']
+
+    def test_missing_object(self, blueprint_handler, s3):
+        """Test that a missing DXF is reported as a download failure."""
+        response = self._generate(blueprint_handler, s3, 'quotes/missing.dxf')
+
+        assert response['success'] is False
+        assert 'Failed to download file' in response['error']
+
+    def test_missing_bucket_or_key(self, blueprint_handler):
+        """Test that events without a bucket and key are rejected."""
+        response = blueprint_handler.lambda_handler({'bucket': 'test-bucket'}, None)
+
+        assert response == {'success': False, 'error': 'Missing bucket or key in event'}
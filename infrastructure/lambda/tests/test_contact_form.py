@@ -163,6 +163,27 @@ class TestHoneypot:
         mock_recaptcha.assert_not_called()
         mock_ses.send_email.assert_not_called()
 
+    def test_honeypot_skips_security_lookups(self):
+        """Test that honeypot submissions are dropped before the IP and reCAPTCHA lookups."""
+        import contact_form
+        importlib.reload(contact_form)
+
+        event = self._create_event({
+            'firstName': 'Bot',
+            'lastName': 'User',
+            'email': 'bot@spam.com',
+            'subject': 'quote',
+            'message': 'Buy our stuff!',
+            'recaptchaToken': 'token',
+            'website': 'http://spam-link.com'
+        })
+
+        with patch.object(contact_form, 'run_security_lookups') as mock_lookups:
+            response = contact_form.handler(event, None)
+
+        assert response['statusCode'] == 200
+        mock_lookups.assert_not_called()
+
     @mock_aws
     @patch('contact_form.verify_recaptcha')
     def test_empty_honeypot_proceeds_normally(self, mock_recaptcha):
@@ -473,3 +494,352 @@ class TestCorsHandling:
 
         assert 'headers' in response
         assert 'Access-Control-Allow-Origin' in response['headers']
+
+
+class TestSecurityLookups:
+    """Tests for concurrent reCAPTCHA verification and IP geolocation."""
+
+    def test_runs_lookups_concurrently(self):
+        """Test that total latency is bounded by the slowest call, not the sum."""
+        import time
+        import contact_form
+        importlib.reload(contact_form)
+
+        def slow_lookup(ip, timeout):
+            time.sleep(0.3)
+            return 'Boston, Massachusetts, United States'
+
+        def slow_recaptcha(token, timeout):
+            time.sleep(0.3)
+            return True, 0.9
+
+        contact_form.lookup_ip_location = slow_lookup
+        contact_form.verify_recaptcha = slow_recaptcha
+
+        start = time.monotonic()
+        location, (is_valid, score), timings = contact_form.run_security_lookups('1.2.3.4', 'token')
+        elapsed = time.monotonic() - start
+
+        assert location == 'Boston, Massachusetts, United States'
+        assert is_valid is True
+        assert score == 0.9
+        assert elapsed < 0.5
+        assert timings['ip_location'] >= 300
+        assert timings['recaptcha'] >= 300
+
+    def test_falls_back_when_deadline_exceeded(self):
+        """Test that calls missing the shared deadline use their error defaults."""
+        import time
+        import contact_form
+        importlib.reload(contact_form)
+
+        def slow_lookup(ip, timeout):
+            time.sleep(0.5)
+            return 'Somewhere'
+
+        def slow_recaptcha(token, timeout):
+            time.sleep(0.5)
+            return False, 0.0
+
+        contact_form.lookup_ip_location = slow_lookup
+        contact_form.verify_recaptcha = slow_recaptcha
+
+        location, (is_valid, score), timings = contact_form.run_security_lookups(
+            '1.2.3.4', 'token', deadline=0.1)
+
+        assert location == 'Unknown'
+        assert (is_valid, score) == (True, 0.5)
+        assert timings['ip_location'] is None
+        assert timings['recaptcha'] is None
+
+    def test_format_timings(self):
+        """Test timing breakdown formatting for log lines."""
+        import contact_form
+        importlib.reload(contact_form)
+
+        result = contact_form.format_timings({'ip_location': 12.4, 'recaptcha': None, 'total': 250.6})
+
+        assert result == 'ip_location=12ms recaptcha=timeout total=251ms'
+
+
+class TestIpLocationCache:
+    """Tests for the warm-container IP geolocation cache."""
+
+    def test_caches_successful_lookup(self):
+        """Test that repeat lookups for the same IP skip the HTTP call."""
+        import contact_form
+        importlib.reload(contact_form)
+
+        contact_form.fetch_ip_location = MagicMock(return_value=('Boston, United States', True))
+
+        assert contact_form.lookup_ip_location('1.2.3.4') == 'Boston, United States'
+        assert contact_form.lookup_ip_location('1.2.3.4') == 'Boston, United States'
+
+        contact_form.fetch_ip_location.assert_called_once()
+        assert contact_form.ip_location_cache.hits == 1
+        assert contact_form.ip_location_cache.misses == 1
+
+    def test_caches_failed_lookup_with_shorter_ttl(self):
+        """Test that failures are cached, but expire sooner than successes."""
+        import contact_form
+        importlib.reload(contact_form)
+
+        now = [1000.0]
+        contact_form.ip_location_cache.clock = lambda: now[0]
+        contact_form.fetch_ip_location = MagicMock(return_value=('Unknown', False))
+
+        assert contact_form.lookup_ip_location('5.6.7.8') == 'Unknown'
+        assert contact_form.lookup_ip_location('5.6.7.8') == 'Unknown'
+        assert contact_form.fetch_ip_location.call_count == 1
+
+        now[0] += contact_form.IP_CACHE_NEGATIVE_TTL + 1
+        contact_form.lookup_ip_location('5.6.7.8')
+        assert contact_form.fetch_ip_location.call_count == 2
+
+    def test_evicts_least_recently_used(self):
+        """Test that the cache stays within its size limit."""
+        import contact_form
+        importlib.reload(contact_form)
+
+        cache = contact_form.LocationCache(max_size=2)
+        cache.put('a', 'A', 60)
+        cache.put('b', 'B', 60)
+        cache.get('a')
+        cache.put('c', 'C', 60)
+
+        assert cache.get('a') == 'A'
+        assert cache.get('b') is None
+        assert cache.get('c') == 'C'
+        assert len(cache.entries) == 2
+
+    def test_skips_cache_for_unknown_ip(self):
+        """Test that missing IPs are not looked up or cached."""
+        import contact_form
+        importlib.reload(contact_form)
+
+        contact_form.fetch_ip_location = MagicMock()
+
+        assert contact_form.lookup_ip_location('unknown') == 'Unknown'
+        contact_form.fetch_ip_location.assert_not_called()
+        assert len(contact_form.ip_location_cache.entries) == 0
+
+
+class TestUploadUrl:
+    """Tests for presigned direct-to-S3 attachment uploads."""
+
+    def _create_event(self, body):
+        """Helper to create a Lambda event with given body."""
+        return {
+            'body': json.dumps(body),
+            'requestContext': {'http': {'method': 'POST'}}
+        }
+
+    @mock_aws
+    def test_issues_presigned_post_for_allowed_extension(self):
+        """Test that a presigned POST is returned for allowed file types."""
+        os.environ['ATTACHMENTS_BUCKET'] = 'test-bucket'
+
+        import contact_form
+        importlib.reload(contact_form)
+
+        response = contact_form.upload_url_handler(
+            self._create_event({'filename': 'Part.STEP', 'size': 1024}), None)
+
+        assert response['statusCode'] == 200
+        body = json.loads(response['body'])
+        assert body['key'].startswith('uploads/')
+        assert body['key'].endswith('.step')
+        assert contact_form.UPLOAD_KEY_PATTERN.match(body['key'])
+        assert body['fields']['key'] == body['key']
+        assert 'policy' in body['fields']
+        assert body['maxSize'] == contact_form.MAX_ATTACHMENT_SIZE
+
+    def test_rejects_disallowed_extension(self):
+        """Test that upload URLs are not issued for disallowed file types."""
+        os.environ['ATTACHMENTS_BUCKET'] = 'test-bucket'
+
+        import contact_form
+        importlib.reload(contact_form)
+
+        response = contact_form.upload_url_handler(
+            self._create_event({'filename': 'malware.exe', 'size': 1024}), None)
+
+        assert response['statusCode'] == 400
+        assert 'not allowed' in json.loads(response['body'])['error'].lower()
+
+    def test_rejects_oversized_declared_size(self):
+        """Test that upload URLs are not issued for files over the size limit."""
+        os.environ['ATTACHMENTS_BUCKET'] = 'test-bucket'
+
+        import contact_form
+        importlib.reload(contact_form)
+
+        response = contact_form.upload_url_handler(
+            self._create_event({'filename': 'part.step', 'size': 11 * 1024 * 1024}), None)
+
+        assert response['statusCode'] == 400
+
+    @mock_aws
+    @patch('contact_form.verify_recaptcha')
+    def test_submission_with_key_moves_upload_into_quotes(self, mock_recaptcha):
+        """Test that a submitted upload key is copied to quotes/ with form metadata."""
+        mock_recaptcha.return_value = (True, 0.9)
+        os.environ['ATTACHMENTS_BUCKET'] = 'test-bucket'
+
+        s3 = boto3.client('s3', region_name='us-east-1')
+        s3.create_bucket(Bucket='test-bucket')
+        upload_key = 'uploads/0f8fad5b-d9cb-469f-a165-70867728950e.step'
+        s3.put_object(Bucket='test-bucket', Key=upload_key, Body=b'STEP content')
+
+        import contact_form
+        importlib.reload(contact_form)
+
+        response = contact_form.handler(self._create_event({
+            'firstName': 'John',
+            'lastName': 'Doe',
+            'email': 'john@example.com',
+            'subject': 'quote',
+            'message': 'Test',
+            'attachment': {
+                'filename': 'part.step',
+                'key': upload_key,
+                'contentType': 'application/step'
+            }
+        }), None)
+
+        assert response['statusCode'] == 200
+        keys = [obj['Key'] for obj in s3.list_objects_v2(Bucket='test-bucket')['Contents']]
+        assert upload_key not in keys
+        assert len(keys) == 1 and keys[0].startswith('quotes/')
+
+        obj = s3.get_object(Bucket='test-bucket', Key=keys[0])
+        assert obj['Body'].read() == b'STEP content'
+        assert obj['Metadata']['original-filename'] == 'part.step'
+        form_data = json.loads(base64.b64decode(obj['Metadata']['form-data']))
+        assert form_data['email'] == 'john@example.com'
+
+    @mock_aws
+    @patch('contact_form.verify_recaptcha')
+    def test_rejects_key_outside_upload_prefix(self, mock_recaptcha):
+        """Test that arbitrary bucket keys cannot be submitted as attachments."""
+        mock_recaptcha.return_value = (True, 0.9)
+        os.environ['ATTACHMENTS_BUCKET'] = 'test-bucket'
+
+        import contact_form
+        importlib.reload(contact_form)
+
+        response = contact_form.handler(self._create_event({
+            'firstName': 'John',
+            'lastName': 'Doe',
+            'email': 'john@example.com',
+            'subject': 'quote',
+            'message': 'Test',
+            'attachment': {
+                'filename': 'part.step',
+                'key': 'quotes/someone-elses-file.step',
+            }
+        }), None)
+
+        assert response['statusCode'] == 400
+
+    @mock_aws
+    @patch('contact_form.verify_recaptcha')
+    def test_rejects_missing_upload(self, mock_recaptcha):
+        """Test that a key the browser never uploaded is rejected."""
+        mock_recaptcha.return_value = (True, 0.9)
+        os.environ['ATTACHMENTS_BUCKET'] = 'test-bucket'
+
+        s3 = boto3.client('s3', region_name='us-east-1')
+        s3.create_bucket(Bucket='test-bucket')
+
+        import contact_form
+        importlib.reload(contact_form)
+
+        response = contact_form.handler(self._create_event({
+            'firstName': 'John',
+            'lastName': 'Doe',
+            'email': 'john@example.com',
+            'subject': 'quote',
+            'message': 'Test',
+            'attachment': {
+                'filename': 'part.step',
+                'key': 'uploads/0f8fad5b-d9cb-469f-a165-70867728950e.step',
+            }
+        }), None)
+
+        assert response['statusCode'] == 400
+        assert 'not found' in json.loads(response['body'])['error'].lower()
+
+
+class TestStreamingAttachmentUpload:
+    """Tests for incremental base64 decoding and multipart attachment uploads."""
+
+    def test_decoded_size_matches_actual_size(self):
+        """Test that decoded size is computed exactly without decoding."""
+        import contact_form
+        importlib.reload(contact_form)
+
+        for length in [0, 1, 2, 3, 4, 100, 1001]:
+            data = os.urandom(length)
+            encoded = base64.b64encode(data).decode()
+            wrapped = base64.encodebytes(data).decode()  # MIME-style line breaks
+            assert contact_form.decoded_base64_size(encoded) == length
+            assert contact_form.decoded_base64_size(wrapped) == length
+
+    def test_incremental_decode_matches_one_shot_decode(self):
+        """Test that block-wise decoding reproduces the original bytes."""
+        import contact_form
+        importlib.reload(contact_form)
+
+        data = os.urandom(10_000)
+        wrapped = base64.encodebytes(data).decode()
+
+        blocks = list(contact_form.iter_base64_blocks(wrapped, 999))
+
+        assert b''.join(blocks) == data
+        assert all(len(block) <= 999 for block in blocks)
+
+    def test_large_attachment_uses_multipart_upload(self):
+        """Test that files larger than one part are uploaded part by part."""
+        import hashlib
+        import contact_form
+        importlib.reload(contact_form)
+
+        mock_s3 = MagicMock()
+        mock_s3.create_multipart_upload.return_value = {'UploadId': 'upload-1'}
+        mock_s3.upload_part.side_effect = lambda **kwargs: {'ETag': f"etag-{kwargs['PartNumber']}"}
+        contact_form.s3 = mock_s3
+
+        data = os.urandom(2500)
+        size, sha256 = contact_form.upload_base64_attachment(
+            base64.b64encode(data).decode(), 'bucket', 'quotes/x.step', {'a': 'b'},
+            max_size=10_000, part_size=1024)
+
+        assert size == 2500
+        assert sha256 == hashlib.sha256(data).hexdigest()
+        mock_s3.put_object.assert_not_called()
+        uploaded = b''.join(call.kwargs['Body'] for call in mock_s3.upload_part.call_args_list)
+        assert uploaded == data
+        parts = mock_s3.complete_multipart_upload.call_args.kwargs['MultipartUpload']['Parts']
+        assert [p['PartNumber'] for p in parts] == [1, 2, 3]
+
+    def test_aborts_multipart_upload_when_size_limit_crossed(self):
+        """Test that the upload stops and is aborted once the size limit is exceeded."""
+        import contact_form
+        importlib.reload(contact_form)
+
+        mock_s3 = MagicMock()
+        mock_s3.create_multipart_upload.return_value = {'UploadId': 'upload-1'}
+        mock_s3.upload_part.return_value = {'ETag': 'etag'}
+        contact_form.s3 = mock_s3
+
+        content = base64.b64encode(os.urandom(5000)).decode()
+
+        with pytest.raises(contact_form.AttachmentTooLarge):
+            contact_form.upload_base64_attachment(
+                content, 'bucket', 'quotes/x.step', {}, max_size=3000, part_size=1024)
+
+        mock_s3.abort_multipart_upload.assert_called_once_with(
+            Bucket='bucket', Key='quotes/x.step', UploadId='upload-1')
+        mock_s3.complete_multipart_upload.assert_not_called()
+        assert mock_s3.upload_part.call_count == 1
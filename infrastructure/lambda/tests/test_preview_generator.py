@@ -0,0 +1,102 @@
+"""
+Unit tests for the preview generator Lambda handler.
+"""
+
+import importlib.util
+import os
+import sys
+
+import numpy as np
+import pytest
+
+PREVIEW_GENERATOR_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                     'preview-generator')
+
+
+@pytest.fixture
+def preview_handler():
+    """Load preview-generator/handler.py (skipping warmup) under a unique module name."""
+    os.environ['PREVIEW_WARMUP'] = 'none'
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    sys.path.insert(0, PREVIEW_GENERATOR_DIR)
+    try:
+        spec = importlib.util.spec_from_file_location(
+            'preview_generator_handler', os.path.join(PREVIEW_GENERATOR_DIR, 'handler.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        yield module
+    finally:
+        sys.path.remove(PREVIEW_GENERATOR_DIR)
+        os.environ.pop('PREVIEW_WARMUP', None)
+
+
+class TestGenerateImageThumbnail:
+    """Tests for the generate_image_thumbnail function."""
+
+    @pytest.mark.parametrize('suffix', ['.png', '.tif'])
+    def test_thumbnails_16_bit_greyscale(self, preview_handler, tmp_path, suffix):
+        """Test that 16-bit greyscale images are scaled to 8-bit instead of failing in reduce()."""
+        from PIL import Image
+
+        ramp = np.tile(np.linspace(0, 65535, 3200), (2400, 1)).astype(np.uint16)
+        path = tmp_path / f'scan{suffix}'
+        Image.fromarray(ramp).save(path)
+
+        image = preview_handler.generate_image_thumbnail(str(path), (800, 600))
+
+        assert image.mode == 'L'
+        assert image.size == (800, 600)
+        assert image.getextrema() == (0, 255)
+
+    def test_thumbnails_palette_image(self, preview_handler, tmp_path):
+        """Test that palette images are converted to RGB before resampling."""
+        from PIL import Image
+
+        path = tmp_path / 'logo.png'
+        Image.new('RGB', (1600, 1200), 'red').convert('P').save(path)
+
+        image = preview_handler.generate_image_thumbnail(str(path), (800, 600))
+
+        assert image.mode == 'RGB'
+        assert image.size == (800, 600)
+
+
+class TestParseRenditions:
+    """Tests for the parse_renditions function."""
+
+    def test_defaults_when_none_requested(self, preview_handler):
+        """Test that an empty request falls back to the default renditions."""
+        assert preview_handler.parse_renditions(None) == preview_handler.DEFAULT_RENDITIONS
+
+    def test_normalizes_rendition(self, preview_handler):
+        """Test that a valid rendition is normalized with defaults filled in."""
+        renditions = preview_handler.parse_renditions([{'width': 200, 'height': 150, 'format': 'JPEG'}])
+
+        assert renditions == [{'name': 'rendition1', 'width': 200, 'height': 150,
+                               'format': 'jpeg', 'quality': 85}]
+
+    @pytest.mark.parametrize('requested', [
+        ['thumb', 'large'],
+        {'name': 'thumb', 'width': 200},
+        'thumb',
+        [{'width': 'wide'}],
+        [{'width': '200'}],
+        [{'height': 150.5}],
+        [{'width': True}],
+        [{'width': None}],
+        [{'quality': 'high'}],
+        [{'format': 42}],
+        [{'width': 0}],
+    ])
+    def test_rejects_malformed_renditions(self, preview_handler, requested):
+        """Test that anything but a list of objects with integer sizes raises ValueError."""
+        with pytest.raises(ValueError):
+            preview_handler.parse_renditions(requested)
+
+    def test_handler_reports_malformed_renditions(self, preview_handler):
+        """Test that the handler returns an error instead of raising on malformed renditions."""
+        response = preview_handler.lambda_handler(
+            {'bucket': 'test-bucket', 'key': 'quotes/part.step', 'renditions': [{'width': 'wide'}]}, None)
+
+        assert response['success'] is False
+        assert response['error'].startswith('Invalid renditions:')
@@ -9,7 +9,7 @@ import base64
 import json
 import os
 import sys
-from unittest.mock import patch, MagicMock
+from unittest.mock import call, patch, MagicMock
 import importlib
 
 import boto3
@@ -39,7 +39,8 @@ def env_vars():
     yield
     # Cleanup
     for key in ['RECIPIENT_EMAIL', 'FROM_EMAIL', 'ATTACHMENTS_BUCKET',
-                'CC_EMAIL', 'BCC_EMAIL', 'DWG_CONVERTER_FUNCTION', 'PREVIEW_GENERATOR_FUNCTION']:
+                'CC_EMAIL', 'BCC_EMAIL', 'DWG_CONVERTER_FUNCTION', 'PREVIEW_GENERATOR_FUNCTION',
+                'BLUEPRINT_GENERATOR_FUNCTION']:
         os.environ.pop(key, None)
 
 
@@ -103,6 +104,75 @@ class TestGetFileExtension:
         assert quote_processor.get_file_extension('Makefile') == ''
 
 
+class TestRunStages:
+    """Tests for the pipeline stage dependency-graph executor."""
+
+    def test_runs_independent_stages_concurrently(self):
+        """Test that independent stages overlap instead of running back to back."""
+        import time
+        import quote_processor
+        importlib.reload(quote_processor)
+
+        def slow(value):
+            def stage():
+                time.sleep(0.2)
+                return value
+            return stage
+
+        start = time.monotonic()
+        results, timings = quote_processor.run_stages({
+            'a': (slow('A'), ()),
+            'b': (slow('B'), ()),
+            'c': (slow('C'), ()),
+        })
+        elapsed = time.monotonic() - start
+
+        assert results == {'a': 'A', 'b': 'B', 'c': 'C'}
+        assert elapsed < 0.4
+        assert set(timings) == {'a', 'b', 'c', 'total'}
+
+    def test_passes_dependency_results_in_order(self):
+        """Test that a stage runs after its dependencies and receives their results."""
+        import quote_processor
+        importlib.reload(quote_processor)
+
+        order = []
+
+        def record(name, value):
+            def stage(*args):
+                order.append(name)
+                return value
+            return stage
+
+        results, _ = quote_processor.run_stages({
+            'combine': (lambda x, y: f'{x}+{y}', ('first', 'second')),
+            'first': (record('first', 'X'), ()),
+            'second': (record('second', 'Y'), ('first',)),
+        })
+
+        assert order == ['first', 'second']
+        assert results['combine'] == 'X+Y'
+
+    def test_rejects_circular_dependencies(self):
+        """Test that unsatisfiable dependency graphs raise instead of hanging."""
+        import quote_processor
+        importlib.reload(quote_processor)
+
+        with pytest.raises(ValueError):
+            quote_processor.run_stages({
+                'a': (lambda b: b, ('b',)),
+                'b': (lambda a: a, ('a',)),
+            })
+
+    def test_rejects_unknown_dependencies(self):
+        """Test that a dependency on a missing stage raises."""
+        import quote_processor
+        importlib.reload(quote_processor)
+
+        with pytest.raises(ValueError):
+            quote_processor.run_stages({'a': (lambda b: b, ('missing',))})
+
+
 class TestGetDestination:
     """Tests for email destination routing."""
 
@@ -304,6 +374,28 @@ class TestHandlerEventParsing:
         assert response['statusCode'] == 400
         assert 'form data' in response['body'].lower()
 
+    @mock_aws
+    def test_ignores_staged_browser_uploads(self):
+        """Test that scans of uploads/ objects are skipped until copied into quotes/."""
+        s3 = boto3.client('s3', region_name='us-east-1')
+        s3.create_bucket(Bucket='test-bucket')
+        s3.put_object(Bucket='test-bucket', Key='uploads/abc.step', Body=b'STEP content')
+
+        import quote_processor
+        importlib.reload(quote_processor)
+
+        mock_ses = MagicMock()
+        quote_processor.ses = mock_ses
+
+        event = create_guardduty_event('test-bucket', 'uploads/abc.step')
+        response = quote_processor.handler(event, None)
+
+        assert response['statusCode'] == 200
+        mock_ses.send_email.assert_not_called()
+        mock_ses.send_raw_email.assert_not_called()
+        # Object is left for contact_form to copy
+        s3.head_object(Bucket='test-bucket', Key='uploads/abc.step')
+
 
 class TestCleanFileFlow:
     """Tests for NO_THREATS_FOUND scan result handling."""
@@ -629,6 +721,338 @@ class TestDwgConversion:
         assert 'part.dxf' in raw_message
 
 
+class TestConvertedDxfReference:
+    """Tests for DWG conversions returned as S3 references instead of inline content."""
+
+    @mock_aws
+    def test_reads_compressed_dxf_from_s3_and_cleans_up(self):
+        """Test that the converter's gzipped S3 output is attached and then deleted."""
+        import gzip
+        os.environ['DWG_CONVERTER_FUNCTION'] = 'dwg-converter-function'
+        os.environ['PREVIEW_GENERATOR_FUNCTION'] = 'preview-generator-function'
+
+        s3 = boto3.client('s3', region_name='us-east-1')
+        s3.create_bucket(Bucket='test-bucket')
+
+        form_data = create_form_data()
+        s3.put_object(
+            Bucket='test-bucket',
+            Key='quotes/part.dwg',
+            Body=b'DWG content',
+            Metadata={
+                'form-data': base64.b64encode(json.dumps(form_data).encode()).decode(),
+                'original-filename': 'part.dwg',
+                'content-type': 'application/acad'
+            }
+        )
+
+        import quote_processor
+        importlib.reload(quote_processor)
+
+        mock_ses = MagicMock()
+        quote_processor.ses = mock_ses
+
+        invocations = []
+
+        def fake_invoke(FunctionName, InvocationType, Payload):
+            request = json.loads(Payload)
+            invocations.append((FunctionName, request))
+            if FunctionName == 'dwg-converter-function':
+                s3.put_object(Bucket=request['bucket'], Key=request['output_key'],
+                              Body=gzip.compress(b'0\nSECTION\nDXF content'),
+                              ContentEncoding='gzip')
+                result = {
+                    'success': True,
+                    'dxf_bucket': request['bucket'],
+                    'dxf_key': request['output_key'],
+                    'dxf_filename': 'part.dxf',
+                    'dxf_size': 21,
+                    'dxf_sha256': 'abc',
+                    'compressed': True
+                }
+            else:
+                result = {
+                    'success': True,
+                    'preview_content': base64.b64encode(b'\x89PNG\r\n\x1a\n').decode()
+                }
+            return {'Payload': MagicMock(read=lambda: json.dumps(result).encode())}
+
+        mock_lambda = MagicMock()
+        mock_lambda.invoke.side_effect = fake_invoke
+        quote_processor.lambda_client = mock_lambda
+
+        event = create_guardduty_event('test-bucket', 'quotes/part.dwg', 'NO_THREATS_FOUND')
+        quote_processor.handler(event, None)
+
+        converter_request = invocations[0][1] if invocations[0][0] == 'dwg-converter-function' else invocations[1][1]
+        preview_request = [req for name, req in invocations if name == 'preview-generator-function'][0]
+
+        # Preview generator reads the converter output directly - no temp re-upload
+        assert preview_request['key'] == converter_request['output_key']
+        assert converter_request['output_key'].startswith('converted/')
+
+        raw_message = mock_ses.send_raw_email.call_args[1]['RawMessage']['Data']
+        assert 'part.dxf' in raw_message
+        assert base64.b64encode(b'0\nSECTION\nDXF content').decode() in raw_message.replace('\n', '')
+        assert 'cid:preview_image' in raw_message
+
+        remaining = [obj['Key'] for obj in s3.list_objects_v2(Bucket='test-bucket').get('Contents', [])]
+        assert not [k for k in remaining if k.startswith(('quotes/', 'converted/'))]
+
+
+    @mock_aws
+    def test_decompresses_only_gzip_content_encoding(self):
+        """Test that converter output is gunzipped based on ContentEncoding, not magic bytes."""
+        import gzip
+        s3 = boto3.client('s3', region_name='us-east-1')
+        s3.create_bucket(Bucket='test-bucket')
+        compressed = gzip.compress(b'0\nSECTION\nDXF content')
+        s3.put_object(Bucket='test-bucket', Key='converted/a/part.dxf', Body=compressed,
+                      ContentEncoding='gzip')
+        s3.put_object(Bucket='test-bucket', Key='converted/b/part.dxf', Body=compressed)
+
+        import quote_processor
+        importlib.reload(quote_processor)
+
+        encoded = quote_processor.read_converted_dxf(
+            {'dxf_bucket': 'test-bucket', 'dxf_key': 'converted/a/part.dxf'})
+        unencoded = quote_processor.read_converted_dxf(
+            {'dxf_bucket': 'test-bucket', 'dxf_key': 'converted/b/part.dxf'})
+
+        assert encoded == b'0\nSECTION\nDXF content'
+        assert unencoded == compressed
+
+class TestArtifactCache:
+    """Tests for the content-addressed conversion/preview cache."""
+
+    def _put_submission(self, s3, key, filename, body, **kwargs):
+        s3.put_object(
+            Bucket='test-bucket',
+            Key=key,
+            Body=body,
+            **kwargs,
+            Metadata={
+                'form-data': base64.b64encode(json.dumps(create_form_data()).encode()).decode(),
+                'original-filename': filename,
+                'content-type': 'application/octet-stream'
+            }
+        )
+
+    def _fake_lambda(self, s3, invocations, code_version='v1'):
+        import gzip
+
+        def fake_invoke(FunctionName, InvocationType, Payload):
+            request = json.loads(Payload)
+            invocations.append(FunctionName)
+            if FunctionName == 'dwg-converter-function':
+                s3.put_object(Bucket=request['bucket'], Key=request['output_key'],
+                              Body=gzip.compress(b'DXF content'), ContentEncoding='gzip')
+                result = {'success': True, 'dxf_bucket': request['bucket'],
+                          'dxf_key': request['output_key'], 'dxf_filename': 'part.dxf',
+                          'compressed': True}
+            else:
+                result = {'success': True,
+                          'preview_content': base64.b64encode(b'\x89PNG\r\n\x1a\npreview').decode()}
+            return {'Payload': MagicMock(read=lambda: json.dumps(result).encode())}
+
+        mock_lambda = MagicMock()
+        mock_lambda.invoke.side_effect = fake_invoke
+        mock_lambda.get_function_configuration.side_effect = (
+            lambda FunctionName: {'CodeSha256': f'{FunctionName}-{code_version}'})
+        return mock_lambda
+
+    @mock_aws
+    def test_reuses_cached_preview_for_identical_attachment(self):
+        """Test that a resubmitted file skips the preview generator."""
+        os.environ['PREVIEW_GENERATOR_FUNCTION'] = 'preview-generator-function'
+
+        s3 = boto3.client('s3', region_name='us-east-1')
+        s3.create_bucket(Bucket='test-bucket')
+
+        import quote_processor
+        importlib.reload(quote_processor)
+
+        mock_ses = MagicMock()
+        quote_processor.ses = mock_ses
+        invocations = []
+        quote_processor.lambda_client = self._fake_lambda(s3, invocations)
+
+        self._put_submission(s3, 'quotes/first.step', 'part.step', b'STEP content')
+        quote_processor.handler(create_guardduty_event('test-bucket', 'quotes/first.step'), None)
+        assert invocations == ['preview-generator-function']
+
+        self._put_submission(s3, 'quotes/second.step', 'part-rev2.step', b'STEP content')
+        quote_processor.handler(create_guardduty_event('test-bucket', 'quotes/second.step'), None)
+
+        # Second submission served from cache
+        assert invocations == ['preview-generator-function']
+        raw_message = mock_ses.send_raw_email.call_args[1]['RawMessage']['Data']
+        assert 'cid:preview_image' in raw_message
+
+    @mock_aws
+    def test_reuses_cached_dxf_for_identical_dwg(self):
+        """Test that a resubmitted DWG skips both the converter and preview generator."""
+        os.environ['DWG_CONVERTER_FUNCTION'] = 'dwg-converter-function'
+        os.environ['PREVIEW_GENERATOR_FUNCTION'] = 'preview-generator-function'
+
+        s3 = boto3.client('s3', region_name='us-east-1')
+        s3.create_bucket(Bucket='test-bucket')
+
+        import quote_processor
+        importlib.reload(quote_processor)
+
+        mock_ses = MagicMock()
+        quote_processor.ses = mock_ses
+        invocations = []
+        quote_processor.lambda_client = self._fake_lambda(s3, invocations)
+
+        self._put_submission(s3, 'quotes/first.dwg', 'part.dwg', b'DWG content')
+        quote_processor.handler(create_guardduty_event('test-bucket', 'quotes/first.dwg'), None)
+        assert sorted(invocations) == ['dwg-converter-function', 'preview-generator-function']
+
+        self._put_submission(s3, 'quotes/second.dwg', 'part.dwg', b'DWG content')
+        quote_processor.handler(create_guardduty_event('test-bucket', 'quotes/second.dwg'), None)
+
+        assert len(invocations) == 2
+        raw_message = mock_ses.send_raw_email.call_args[1]['RawMessage']['Data']
+        assert 'part.dxf' in raw_message
+        assert base64.b64encode(b'DXF content').decode() in raw_message
+        assert 'cid:preview_image' in raw_message
+
+        # Cached DXF survives cleanup; converter output does not
+        keys = [obj['Key'] for obj in s3.list_objects_v2(Bucket='test-bucket')['Contents']]
+        assert not [k for k in keys if k.startswith('converted/')]
+        assert len([k for k in keys if k.endswith('/converted.dxf')]) == 1
+
+    @mock_aws
+    def test_generates_when_cache_lookup_fails(self):
+        """Test that a non-ClientError from the cache lookup is treated as a miss."""
+        from botocore.exceptions import EndpointConnectionError
+        os.environ['PREVIEW_GENERATOR_FUNCTION'] = 'preview-generator-function'
+
+        s3 = boto3.client('s3', region_name='us-east-1')
+        s3.create_bucket(Bucket='test-bucket')
+        self._put_submission(s3, 'quotes/first.step', 'part.step', b'STEP content')
+
+        import quote_processor
+        importlib.reload(quote_processor)
+
+        mock_ses = MagicMock()
+        quote_processor.ses = mock_ses
+        invocations = []
+        quote_processor.lambda_client = self._fake_lambda(s3, invocations)
+
+        with patch.object(quote_processor.s3, 'head_object',
+                          side_effect=EndpointConnectionError(endpoint_url='https://s3')):
+            quote_processor.handler(create_guardduty_event('test-bucket', 'quotes/first.step'), None)
+
+        assert invocations == ['preview-generator-function']
+        raw_message = mock_ses.send_raw_email.call_args[1]['RawMessage']['Data']
+        assert 'cid:preview_image' in raw_message
+
+    @mock_aws
+    def test_keys_cache_on_stored_sha256_checksum(self):
+        """Test that the cache is keyed on the object's stored SHA-256 checksum without reading first."""
+        import hashlib
+        os.environ['PREVIEW_GENERATOR_FUNCTION'] = 'preview-generator-function'
+
+        s3 = boto3.client('s3', region_name='us-east-1')
+        s3.create_bucket(Bucket='test-bucket')
+
+        import quote_processor
+        importlib.reload(quote_processor)
+
+        quote_processor.ses = MagicMock()
+        invocations = []
+        quote_processor.lambda_client = self._fake_lambda(s3, invocations)
+
+        for key in ('quotes/first.step', 'quotes/second.step'):
+            self._put_submission(s3, key, 'part.step', b'STEP content', ChecksumAlgorithm='SHA256')
+            with patch.object(quote_processor, 'hashlib', wraps=hashlib) as hashed:
+                quote_processor.handler(create_guardduty_event('test-bucket', key), None)
+            # The body digest comes from S3 rather than hashing the attachment
+            assert call(b'STEP content') not in hashed.sha256.call_args_list
+
+        assert invocations == ['preview-generator-function']
+        keys = [obj['Key'] for obj in s3.list_objects_v2(Bucket='test-bucket')['Contents']]
+        digest = hashlib.sha256(b'STEP content').hexdigest()
+        assert [k for k in keys if k.endswith('/preview.png')][0].startswith(f'cache/{digest}/')
+
+    @mock_aws
+    def test_regenerates_after_generator_redeploy(self):
+        """Test that artifacts cached by a previous generator version are not reused."""
+        os.environ['PREVIEW_GENERATOR_FUNCTION'] = 'preview-generator-function'
+
+        s3 = boto3.client('s3', region_name='us-east-1')
+        s3.create_bucket(Bucket='test-bucket')
+
+        import quote_processor
+        importlib.reload(quote_processor)
+
+        quote_processor.ses = MagicMock()
+        invocations = []
+        quote_processor.lambda_client = self._fake_lambda(s3, invocations)
+
+        self._put_submission(s3, 'quotes/first.step', 'part.step', b'STEP content')
+        quote_processor.handler(create_guardduty_event('test-bucket', 'quotes/first.step'), None)
+
+        # A new container sees the redeployed generator's code hash
+        importlib.reload(quote_processor)
+        quote_processor.ses = MagicMock()
+        quote_processor.lambda_client = self._fake_lambda(s3, invocations, code_version='v2')
+        self._put_submission(s3, 'quotes/second.step', 'part.step', b'STEP content')
+        quote_processor.handler(create_guardduty_event('test-bucket', 'quotes/second.step'), None)
+
+        assert invocations == ['preview-generator-function', 'preview-generator-function']
+
+    @mock_aws
+    def test_skips_cache_when_generator_version_unavailable(self):
+        """Test that the cache is bypassed when the generator code hashes cannot be read."""
+        os.environ['PREVIEW_GENERATOR_FUNCTION'] = 'preview-generator-function'
+
+        s3 = boto3.client('s3', region_name='us-east-1')
+        s3.create_bucket(Bucket='test-bucket')
+        self._put_submission(s3, 'quotes/first.step', 'part.step', b'STEP content')
+
+        import quote_processor
+        importlib.reload(quote_processor)
+
+        mock_ses = MagicMock()
+        quote_processor.ses = mock_ses
+        invocations = []
+        quote_processor.lambda_client = self._fake_lambda(s3, invocations)
+        quote_processor.lambda_client.get_function_configuration.side_effect = Exception('denied')
+
+        quote_processor.handler(create_guardduty_event('test-bucket', 'quotes/first.step'), None)
+
+        assert invocations == ['preview-generator-function']
+        assert 'cid:preview_image' in mock_ses.send_raw_email.call_args[1]['RawMessage']['Data']
+        # Nothing is cached under an unknown version
+        assert 'Contents' not in s3.list_objects_v2(Bucket='test-bucket')
+
+    @pytest.mark.parametrize('response', [
+        {},
+        {'ChecksumCRC32': 'AAAAAA=='},
+        {'ChecksumSHA256': 'AAAA-3', 'ChecksumType': 'COMPOSITE'},
+    ])
+    def test_object_sha256_ignores_unusable_checksums(self, response):
+        """Test that missing, non-SHA-256 and multipart checksums fall back to hashing the body."""
+        import quote_processor
+        importlib.reload(quote_processor)
+
+        assert quote_processor.object_sha256(response) is None
+
+    def test_ignores_cache_prefix_scan_events(self):
+        """Test that cache writes are not processed as submissions."""
+        import quote_processor
+        importlib.reload(quote_processor)
+
+        response = quote_processor.handler(
+            create_guardduty_event('test-bucket', 'cache/abc/preview.png'), None)
+
+        assert response['statusCode'] == 200
+
+
 class TestPreviewGeneration:
     """Tests for preview image generation."""
 
@@ -713,6 +1137,146 @@ class TestPreviewGeneration:
         assert 'preview.png' in raw_message
 
 
+class TestBlueprintGeneration:
+    """Tests for blueprint PDFs generated for DXF and DWG drawings."""
+
+    def _put_submission(self, s3, key, filename, body):
+        s3.put_object(
+            Bucket='test-bucket',
+            Key=key,
+            Body=body,
+            Metadata={
+                'form-data': base64.b64encode(json.dumps(create_form_data()).encode()).decode(),
+                'original-filename': filename,
+                'content-type': 'application/octet-stream'
+            }
+        )
+
+    def _fake_lambda(self, s3, invocations, code_version='v1'):
+        def fake_invoke(FunctionName, InvocationType, Payload):
+            request = json.loads(Payload)
+            invocations.append((FunctionName, request))
+            if FunctionName == 'dwg-converter-function':
+                s3.put_object(Bucket=request['bucket'], Key=request['output_key'], Body=b'DXF content')
+                result = {'success': True, 'dxf_bucket': request['bucket'],
+                          'dxf_key': request['output_key'], 'dxf_filename': 'part.dxf'}
+            elif FunctionName == 'blueprint-generator-function':
+                s3.put_object(Bucket=request['bucket'], Key=request['output_key'], Body=b'%PDF-blueprint')
+                result = {'success': True, 'blueprint_bucket': request['bucket'],
+                          'blueprint_key': request['output_key'], 'part_name': 'PART', 'dimensions': 4}
+            else:
+                result = {'success': False, 'error': 'unexpected function'}
+            return {'Payload': MagicMock(read=lambda: json.dumps(result).encode())}
+
+        mock_lambda = MagicMock()
+        mock_lambda.invoke.side_effect = fake_invoke
+        mock_lambda.get_function_configuration.side_effect = (
+            lambda FunctionName: {'CodeSha256': f'{FunctionName}-{code_version}'})
+        return mock_lambda
+
+    @mock_aws
+    def test_skips_blueprint_when_not_configured(self):
+        """Test that a DXF is emailed without a blueprint when the function is not configured."""
+        s3 = boto3.client('s3', region_name='us-east-1')
+        s3.create_bucket(Bucket='test-bucket')
+        self._put_submission(s3, 'quotes/abc.dxf', 'bracket.dxf', b'DXF content')
+
+        import quote_processor
+        importlib.reload(quote_processor)
+
+        mock_ses = MagicMock()
+        quote_processor.ses = mock_ses
+
+        quote_processor.handler(create_guardduty_event('test-bucket', 'quotes/abc.dxf'), None)
+
+        raw_message = mock_ses.send_raw_email.call_args[1]['RawMessage']['Data']
+        assert 'bracket.dxf' in raw_message
+        assert 'bracket_blueprint.pdf' not in raw_message
+
+    @mock_aws
+    def test_attaches_blueprint_for_dxf(self):
+        """Test that the blueprint PDF is attached and its S3 output removed."""
+        os.environ['BLUEPRINT_GENERATOR_FUNCTION'] = 'blueprint-generator-function'
+
+        s3 = boto3.client('s3', region_name='us-east-1')
+        s3.create_bucket(Bucket='test-bucket')
+        self._put_submission(s3, 'quotes/abc.dxf', 'bracket.dxf', b'DXF content')
+
+        import quote_processor
+        importlib.reload(quote_processor)
+
+        mock_ses = MagicMock()
+        quote_processor.ses = mock_ses
+        invocations = []
+        quote_processor.lambda_client = self._fake_lambda(s3, invocations)
+
+        quote_processor.handler(create_guardduty_event('test-bucket', 'quotes/abc.dxf'), None)
+
+        assert [name for name, _ in invocations] == ['blueprint-generator-function']
+        request = invocations[0][1]
+        assert request['key'] == 'quotes/abc.dxf'
+        assert request['filename'] == 'bracket.dxf'
+        assert request['output_key'].startswith('blueprints/')
+
+        raw_message = mock_ses.send_raw_email.call_args[1]['RawMessage']['Data']
+        assert 'bracket_blueprint.pdf' in raw_message
+        assert base64.b64encode(b'%PDF-blueprint').decode() in raw_message
+
+        keys = [obj['Key'] for obj in s3.list_objects_v2(Bucket='test-bucket').get('Contents', [])]
+        assert not [k for k in keys if k.startswith(('quotes/', 'blueprints/'))]
+        # Blueprints name the submitted part, so they are never cached
+        assert [k for k in keys if k.startswith('cache/')] == []
+
+    @mock_aws
+    def test_generates_blueprint_from_converted_dwg(self):
+        """Test that a DWG gets a blueprint of its converted DXF, regenerated for resubmissions."""
+        os.environ['DWG_CONVERTER_FUNCTION'] = 'dwg-converter-function'
+        os.environ['BLUEPRINT_GENERATOR_FUNCTION'] = 'blueprint-generator-function'
+
+        s3 = boto3.client('s3', region_name='us-east-1')
+        s3.create_bucket(Bucket='test-bucket')
+
+        import quote_processor
+        importlib.reload(quote_processor)
+
+        mock_ses = MagicMock()
+        quote_processor.ses = mock_ses
+        invocations = []
+        quote_processor.lambda_client = self._fake_lambda(s3, invocations)
+
+        self._put_submission(s3, 'quotes/first.dwg', 'part.dwg', b'DWG content')
+        quote_processor.handler(create_guardduty_event('test-bucket', 'quotes/first.dwg'), None)
+
+        converter_request = dict(invocations)['dwg-converter-function']
+        blueprint_request = dict(invocations)['blueprint-generator-function']
+        assert blueprint_request['key'] == converter_request['output_key']
+        assert blueprint_request['filename'] == 'part.dxf'
+
+        raw_message = mock_ses.send_raw_email.call_args[1]['RawMessage']['Data']
+        assert 'part.dxf' in raw_message
+        assert 'part_blueprint.pdf' in raw_message
+
+        # A resubmission under another name reuses the cached DXF but gets its own blueprint
+        self._put_submission(s3, 'quotes/second.dwg', 'bracket.dwg', b'DWG content')
+        quote_processor.handler(create_guardduty_event('test-bucket', 'quotes/second.dwg'), None)
+
+        assert [name for name, _ in invocations[2:]] == ['blueprint-generator-function']
+        assert invocations[2][1]['key'].startswith('cache/')
+        assert invocations[2][1]['filename'] == 'bracket.dxf'
+        raw_message = mock_ses.send_raw_email.call_args[1]['RawMessage']['Data']
+        assert 'bracket_blueprint.pdf' in raw_message
+
+    def test_ignores_blueprint_prefix_scan_events(self):
+        """Test that blueprint generator output is not processed as a submission."""
+        import quote_processor
+        importlib.reload(quote_processor)
+
+        response = quote_processor.handler(
+            create_guardduty_event('test-bucket', 'blueprints/abc/part_blueprint.pdf'), None)
+
+        assert response['statusCode'] == 200
+
+
 class TestEmailSubjectFormat:
     """Tests for email subject formatting."""
 
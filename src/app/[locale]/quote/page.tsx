@@ -122,18 +122,33 @@ function QuotePageContent() {
     }
   };
 
-  const fileToBase64 = (file: File): Promise<string> => {
-    return new Promise((resolve, reject) => {
-      const reader = new FileReader();
-      reader.readAsDataURL(file);
-      reader.onload = () => {
-        const result = reader.result as string;
-        // Remove the data URL prefix (e.g., "data:application/pdf;base64,")
-        const base64 = result.split(',')[1];
-        resolve(base64);
-      };
-      reader.onerror = (error) => reject(error);
+  // Upload the file straight to S3 using a presigned POST; returns the staged object key
+  const uploadAttachment = async (apiUrl: string, file: File): Promise<string> => {
+    const uploadUrlEndpoint = apiUrl.replace(/\/contact$/, '/upload-url');
+    const urlResponse = await fetch(uploadUrlEndpoint, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ filename: file.name, size: file.size }),
     });
+    const upload = await urlResponse.json();
+    if (!urlResponse.ok) {
+      throw new Error(upload.error || 'Failed to upload file attachment');
+    }
+
+    const uploadForm = new FormData();
+    Object.entries(upload.fields as Record<string, string>).forEach(([name, value]) => {
+      uploadForm.append(name, value);
+    });
+    // S3 requires the file to be the last field in the form
+    uploadForm.append('file', file);
+
+    const s3Response = await fetch(upload.url, { method: 'POST', body: uploadForm });
+    if (!s3Response.ok) {
+      throw new Error('Failed to upload file attachment');
+    }
+    return upload.key;
   };
 
   const handleSubmit = async (e: React.FormEvent) => {
@@ -161,35 +176,35 @@ ${file ? `- Attachment: ${file.name}` : ''}
 Additional Info: ${formData.additionalInfo || 'None'}
     `.trim();
 
-    // Prepare file attachment if present
+    if (!apiUrl) {
+      // Fallback for development
+      console.log('Quote form submission:', { ...formData, message: quoteMessage, attachment: file ? { filename: file.name, size: file.size } : null });
+      console.log('reCAPTCHA token:', recaptchaToken);
+      await new Promise((resolve) => setTimeout(resolve, 1500));
+      trackQuoteRequest(formData.partType, formData.material);
+      gtagQuoteFormSubmit();
+      router.push(`/quote/thank-you?lang=${locale}`);
+      return;
+    }
+
+    // Upload file attachment if present - only the S3 key is sent with the form
     let attachment = null;
     if (file) {
       try {
-        const base64Data = await fileToBase64(file);
+        const key = await uploadAttachment(apiUrl, file);
         attachment = {
           filename: file.name,
-          content: base64Data,
+          key,
           contentType: file.type || 'application/octet-stream',
         };
-      } catch {
-        console.error('Error encoding file');
-        setErrorMessage('Failed to process file attachment. Please try again.');
+      } catch (error) {
+        console.error('Error uploading file:', error);
+        setErrorMessage(error instanceof Error ? error.message : 'Failed to process file attachment. Please try again.');
         setFormStatus('error');
         return;
       }
     }
 
-    if (!apiUrl) {
-      // Fallback for development
-      console.log('Quote form submission:', { ...formData, message: quoteMessage, attachment: attachment ? { filename: attachment.filename, size: file?.size } : null });
-      console.log('reCAPTCHA token:', recaptchaToken);
-      await new Promise((resolve) => setTimeout(resolve, 1500));
-      trackQuoteRequest(formData.partType, formData.material);
-      gtagQuoteFormSubmit();
-      router.push(`/quote/thank-you?lang=${locale}`);
-      return;
-    }
-
     try {
       const response = await fetch(apiUrl, {
         method: 'POST',
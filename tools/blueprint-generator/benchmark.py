@@ -0,0 +1,152 @@
+"""
+Blueprint generator benchmarks
+
+Times blueprint generation against local reference DXFs (or synthetic parts)
+so changes to the generator can be compared before and after.
+
+Usage:
+    python benchmark.py pdf                   # synthetic plates, 50-2000 holes
+    python benchmark.py pdf bracket.dxf panel.dxf --repeat 5
+    python benchmark.py pages bracket.dxf     # per-page times, sequential vs parallel
+    python benchmark.py cache bracket.dxf     # regeneration with and without the analysis cache
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import ezdxf
+
+import generate_blueprint
+
+
+def timed(func, *args, repeat=3, **kwargs):
+    """Run func repeat times. Returns (last result, median seconds)."""
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        durations.append(time.perf_counter() - start)
+    return result, statistics.median(durations)
+
+
+def quiet(func, *args, **kwargs):
+    """Call func with its console output suppressed."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def synthetic_part(path, holes):
+    """A 12 x 8 plate with a row of slots and a grid of holes, saved to path."""
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    msp.add_lwpolyline([(0, 0), (12, 0), (12, 8), (0, 8)], close=True)
+    for i in range(6):
+        x = 1.5 + i * 1.7
+        msp.add_lwpolyline([(x, 3), (x + 0.8, 3), (x + 0.8, 5), (x, 5)], close=True)
+
+    columns = max(1, int((holes * 1.5) ** 0.5))
+    for k in range(holes):
+        row, col = divmod(k, columns)
+        msp.add_circle((0.5 + 11 * col / columns, 0.5 + 2 * row / max(1, holes // columns)),
+                       0.05 + 0.02 * (k % 3))
+    msp.add_arc((1, 7), 0.6, 270, 360)
+    doc.saveas(path)
+    return path
+
+
+def reference_files(paths, directory, sizes):
+    """The given DXFs, or synthetic parts of each size written to directory."""
+    if paths:
+        return [Path(p) for p in paths]
+    return [Path(synthetic_part(os.path.join(directory, f'plate_{n}.dxf'), n)) for n in sizes]
+
+
+def bench_pdf(paths, repeat):
+    """Vector pages against the 150 dpi raster pages: time and file size.
+
+    Parts above VECTOR_MAX_VERTICES fall back to raster views in vector mode too.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        files = reference_files(paths, tmp, (50, 300, 2000))
+        print(f"{'file':<28} {'raster s':>9} {'vector s':>9} {'speedup':>8} "
+              f"{'raster KB':>10} {'vector KB':>10}")
+        for path in files:
+            row = []
+            for vector in (False, True):
+                output = os.path.join(tmp, f'{path.stem}_{"vector" if vector else "raster"}.pdf')
+                _, seconds = timed(quiet, generate_blueprint.generate_blueprint,
+                                   str(path), output, vector=vector, repeat=repeat)
+                row.append((seconds, os.path.getsize(output) / 1024))
+            (raster_s, raster_kb), (vector_s, vector_kb) = row
+            print(f"{path.name:<28} {raster_s:>9.2f} {vector_s:>9.2f} {raster_s / vector_s:>7.1f}x "
+                  f"{raster_kb:>10.0f} {vector_kb:>10.0f}")
+
+
+def bench_pages(paths, repeat):
+    """Time of each page, then all pages sequentially and in parallel worker processes."""
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in reference_files(paths, tmp, (300, 5000)):
+            data = generate_blueprint.build_blueprint_data(ezdxf.readfile(path), path.stem)
+            page_times = []
+            for add_page in generate_blueprint.BLUEPRINT_PAGES:
+                def one_page():
+                    with PdfPages(io.BytesIO()) as pdf:
+                        add_page(pdf, data)
+                page_times.append(timed(one_page, repeat=repeat)[1])
+
+            output = os.path.join(tmp, 'pages.pdf')
+            _, sequential = timed(generate_blueprint.write_blueprint_pdf, data, output, repeat=repeat)
+            _, parallel = timed(generate_blueprint.write_blueprint_pdf, data, output,
+                                parallel=True, repeat=repeat)
+            pages = '  '.join(f"p{i + 1} {t:.2f}" for i, t in enumerate(page_times))
+            print(f"{path.name:<24} {pages}  |  slowest {max(page_times):.2f}s  "
+                  f"sequential {sequential:.2f}s  parallel {parallel:.2f}s  ({os.cpu_count()} CPUs)")
+
+
+def bench_cache(paths, repeat):
+    """Regenerating a blueprint: full analysis against an analysis cache hit."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = generate_blueprint.AnalysisCache(os.path.join(tmp, 'cache'))
+        print(f"{'file':<28} {'uncached s':>10} {'cached s':>9} {'speedup':>8} {'entry KB':>9}")
+        for path in reference_files(paths, tmp, (300, 5000, 20000)):
+            output = os.path.join(tmp, 'cache.pdf')
+            _, uncached = timed(quiet, generate_blueprint.generate_blueprint,
+                                str(path), output, repeat=repeat)
+            quiet(generate_blueprint.generate_blueprint, str(path), output, cache=cache)
+            _, cached = timed(quiet, generate_blueprint.generate_blueprint,
+                              str(path), output, cache=cache, repeat=repeat)
+            entry = cache.entry_path(cache.digest(path.read_bytes()))
+            print(f"{path.name:<28} {uncached:>10.2f} {cached:>9.2f} {uncached / cached:>7.1f}x "
+                  f"{entry.stat().st_size / 1024:>9.0f}")
+
+
+BENCHMARKS = {
+    'pdf': bench_pdf,
+    'pages': bench_pages,
+    'cache': bench_cache,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark blueprint generation')
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('files', nargs='*', help='Reference DXF files')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (median reported)')
+    args = parser.parse_args()
+
+    BENCHMARKS[args.benchmark](args.files, args.repeat)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
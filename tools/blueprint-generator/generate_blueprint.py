@@ -4,6 +4,14 @@ Blueprint Generator - Creates clean dimensioned technical drawings from DXF file
 
 Usage:
     python generate_blueprint.py input.dxf [output.png] [--thickness 0.5] [--title "Part Name"]
+    python generate_blueprint.py parts/ [output_dir] [--workers 8]
+    python generate_blueprint.py "kit/*.dxf" [output_dir]
+    python generate_blueprint.py manifest.csv [output_dir]
+
+Library use (no files touched):
+    from generate_blueprint import blueprint_data, blueprint_pdf, blueprint_png
+    data = blueprint_data(dxf_bytes, 'BRACKET', thickness=0.25)  # or an ezdxf document
+    pdf_bytes, png_bytes = blueprint_pdf(data), blueprint_png(data, view='dimensioned')
 
 Features:
     - Clean engineering drawing style (white background)
@@ -11,23 +19,38 @@ Features:
     - Overall bounding box dimensions
     - Feature dimensions for internal cutouts/holes
     - Configurable material thickness
+    - Analyses cached on disk by DXF content, so re-running with a new
+      --title or --thickness skips the DXF (BLUEPRINT_CACHE_DIR, BLUEPRINT_CACHE_MAX_MB)
 """
 
 import argparse
+import bisect
+import contextlib
+import csv
+import glob
+import hashlib
 import io
+import os
+import pickle
 import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import List, Tuple, Optional, Set
+from typing import BinaryIO, List, Tuple, Optional, Set, Union
 import numpy as np
 
 try:
     import ezdxf
     from ezdxf.addons.drawing import Frontend, RenderContext
-    from ezdxf.addons.drawing.matplotlib import MatplotlibBackend
+    from ezdxf.addons.drawing.recorder import (
+        Recorder, FilledPathsRecord, PathRecord, PointsRecord, SolidLinesRecord)
     import matplotlib.pyplot as plt
     import matplotlib.patches as mpatches
+    from matplotlib.collections import LineCollection
+    from matplotlib.path import Path as MplPath
 except ImportError as e:
     print(f"Missing dependency: {e}")
     print("Install with: pip install ezdxf matplotlib numpy")
@@ -44,6 +67,25 @@ COLORS = {
     'border': '#000000',
 }
 
+# Arrowhead length as a fraction of the part's largest dimension
+ARROW_HEAD = 0.012
+
+# Coordinates closer than this (drawing units) are the same edge or position, and
+# collinear segments with gaps up to this are one edge (see merge_collinear_segments)
+COORDINATE_TOLERANCE = 0.001
+
+# Part views with more path vertices than this are embedded as 150 dpi images even in
+# vector mode. Each of the three view pages repeats the whole path at about 5 bytes per
+# vertex, so past roughly this size a dense sheet's vector PDF outgrows the raster one.
+VECTOR_MAX_VERTICES = int(os.environ.get('BLUEPRINT_VECTOR_MAX_VERTICES', '20000'))
+
+# On-disk cache of DXF analyses (see AnalysisCache). Bump ANALYSIS_VERSION whenever
+# analyze_geometry, generate_smart_dimensions or render_geometry change their output.
+ANALYSIS_VERSION = 4
+CACHE_DIR = os.environ.get('BLUEPRINT_CACHE_DIR',
+                           os.path.join(os.path.expanduser('~'), '.cache', 'blueprint-generator'))
+CACHE_MAX_MB = float(os.environ.get('BLUEPRINT_CACHE_MAX_MB', '256'))
+
 
 @dataclass
 class Dimension:
@@ -69,152 +111,631 @@ class GeometryAnalysis:
     unique_y: List[float] = field(default_factory=list)
 
 
-def collect_entities(doc, msp):
-    """Collect entities including from block references."""
-    entities = []
-
-    for entity in msp:
-        if entity.dxftype() == 'INSERT':
-            block = doc.blocks.get(entity.dxf.name)
-            if block:
-                insert_point = entity.dxf.insert
-                scale_x = getattr(entity.dxf, 'xscale', 1)
-                scale_y = getattr(entity.dxf, 'yscale', 1)
-                rotation = getattr(entity.dxf, 'rotation', 0)
-
-                for block_entity in block:
-                    entities.append({
-                        'entity': block_entity,
-                        'transform': {
-                            'insert': insert_point,
-                            'scale': (scale_x, scale_y),
-                            'rotation': rotation
-                        }
-                    })
-        else:
-            entities.append({'entity': entity, 'transform': None})
-
-    return entities
+@dataclass
+class BlockGeometry:
+    """Flattened geometry of a layout or block definition, in its own coordinates."""
+    segments: np.ndarray  # (N, 2, 2) start/end of each LINE and LWPOLYLINE edge
+    arcs: np.ndarray  # (A, 5) cx, cy, radius, start_angle, end_angle
+    circles: np.ndarray  # (C, 3) cx, cy, radius
+    points: np.ndarray  # (P, 2) points that define the extents
 
 
-def transform_point(x, y, transform):
-    """Apply block transformation to a point."""
-    if transform is None:
-        return x, y
+@dataclass
+class BlueprintData:
+    """Everything the blueprint pages are drawn from. Picklable, so page
+    workers can render from it without the DXF."""
+    part_name: str
+    thickness: float
+    bounds: Tuple[float, float, float, float]
+    scale: float  # Largest part extent
+    feature_counts: Tuple[int, int, int]  # lines, arcs, circles
+    dimensions: List[Dimension]
+    geometry: MplPath  # see render_geometry
+    generated: str  # Timestamp shown on the title page
+    vector: bool = True  # Vector part views (see VECTOR_MAX_VERTICES)
+    analysis_cached: bool = False  # Analysis was loaded from the AnalysisCache
 
-    x *= transform['scale'][0]
-    y *= transform['scale'][1]
 
-    if transform['rotation'] != 0:
-        angle = np.radians(transform['rotation'])
-        cos_a, sin_a = np.cos(angle), np.sin(angle)
-        x, y = x * cos_a - y * sin_a, x * sin_a + y * cos_a
+def insert_matrices(insert) -> List[np.ndarray]:
+    """3x3 affine matrices mapping block coordinates into the parent, one per MINSERT cell.
 
-    x += transform['insert'].x
-    y += transform['insert'].y
+    Includes the block base point, scale, rotation and insert point.
+    """
+    matrices = []
+    for cell in (insert.multi_insert() if insert.mcount > 1 else [insert]):
+        # ezdxf matrices transform row vectors: p' = p @ m
+        m = np.array(list(cell.matrix44().rows()))
+        matrices.append(np.array([
+            [m[0, 0], m[1, 0], m[3, 0]],
+            [m[0, 1], m[1, 1], m[3, 1]],
+            [0.0, 0.0, 1.0],
+        ]))
+    return matrices
+
+
+def apply_matrix(points: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Apply a 3x3 affine matrix to (..., 2) points."""
+    return points @ matrix[:2, :2].T + matrix[:2, 2]
+
+
+def transform_geometry(geometry: BlockGeometry, matrix: np.ndarray) -> BlockGeometry:
+    """Instance block geometry with an affine matrix.
+
+    Radii scale by the square root of the area scale, so non-uniformly
+    scaled circles and arcs report their equivalent radius. Arc angles follow
+    the transformed end directions; a mirroring matrix swaps start and end to
+    keep arcs counter-clockwise.
+    """
+    linear = matrix[:2, :2]
+    det = np.linalg.det(linear)
+    radius_scale = np.sqrt(abs(det))
+
+    arcs = np.empty_like(geometry.arcs)
+    arcs[:, :2] = apply_matrix(geometry.arcs[:, :2], matrix)
+    arcs[:, 2] = geometry.arcs[:, 2] * radius_scale
+    for col in (3, 4):
+        rad = np.radians(geometry.arcs[:, col])
+        direction = np.column_stack([np.cos(rad), np.sin(rad)]) @ linear.T
+        arcs[:, col] = np.degrees(np.arctan2(direction[:, 1], direction[:, 0])) % 360
+    if det < 0:
+        arcs[:, [3, 4]] = arcs[:, [4, 3]]
+
+    circles = np.empty_like(geometry.circles)
+    circles[:, :2] = apply_matrix(geometry.circles[:, :2], matrix)
+    circles[:, 2] = geometry.circles[:, 2] * radius_scale
+
+    return BlockGeometry(
+        segments=apply_matrix(geometry.segments, matrix),
+        arcs=arcs,
+        circles=circles,
+        points=apply_matrix(geometry.points, matrix),
+    )
 
-    return x, y
 
+def concat_geometry(parts: List[BlockGeometry]) -> BlockGeometry:
+    """Join geometry parts, keeping their order."""
+    return BlockGeometry(
+        segments=np.concatenate([p.segments for p in parts]).reshape(-1, 2, 2),
+        arcs=np.concatenate([p.arcs for p in parts]).reshape(-1, 5),
+        circles=np.concatenate([p.circles for p in parts]).reshape(-1, 3),
+        points=np.concatenate([p.points for p in parts]).reshape(-1, 2),
+    )
 
-def analyze_geometry(doc, msp) -> GeometryAnalysis:
-    """Analyze DXF geometry and extract features."""
-    entities = collect_entities(doc, msp)
 
-    lines = []
-    arcs = []
-    circles = []
-    all_points = []
+def extract_geometry(entities) -> BlockGeometry:
+    """Gather LINE, LWPOLYLINE, ARC and CIRCLE entities into arrays, in entity order."""
+    line_rows, line_seq = [], []  # (x1, y1, x2, y2) per LINE
+    polyline_vertices, polyline_seq = [], []  # (n, 2) array per LWPOLYLINE
+    arc_rows = []  # (cx, cy, r, start_angle, end_angle)
+    circle_rows = []  # (cx, cy, r)
 
-    for item in entities:
-        entity = item['entity']
-        transform = item['transform']
+    for seq, entity in enumerate(entities):
         dtype = entity.dxftype()
 
         if dtype == 'LINE':
-            x1, y1 = transform_point(entity.dxf.start.x, entity.dxf.start.y, transform)
-            x2, y2 = transform_point(entity.dxf.end.x, entity.dxf.end.y, transform)
-            length = np.sqrt((x2-x1)**2 + (y2-y1)**2)
-
-            if abs(y2 - y1) < 0.001:
-                orientation = 'horizontal'
-            elif abs(x2 - x1) < 0.001:
-                orientation = 'vertical'
-            else:
-                orientation = 'angled'
-
-            lines.append({
-                'start': (x1, y1),
-                'end': (x2, y2),
-                'length': length,
-                'orientation': orientation
-            })
-            all_points.extend([(x1, y1), (x2, y2)])
+            start, end = entity.dxf.start, entity.dxf.end
+            line_rows.append((start.x, start.y, end.x, end.y))
+            line_seq.append(seq)
 
         elif dtype == 'ARC':
-            cx, cy = transform_point(entity.dxf.center.x, entity.dxf.center.y, transform)
-            radius = entity.dxf.radius * (transform['scale'][0] if transform else 1)
-            arcs.append({
-                'center': (cx, cy),
-                'radius': radius,
-                'start_angle': entity.dxf.start_angle,
-                'end_angle': entity.dxf.end_angle
-            })
-            for angle in [entity.dxf.start_angle, entity.dxf.end_angle]:
-                rad = np.radians(angle)
-                px, py = cx + radius * np.cos(rad), cy + radius * np.sin(rad)
-                all_points.append((px, py))
+            center = entity.dxf.center
+            arc_rows.append((center.x, center.y, entity.dxf.radius,
+                             entity.dxf.start_angle, entity.dxf.end_angle))
 
         elif dtype == 'CIRCLE':
-            cx, cy = transform_point(entity.dxf.center.x, entity.dxf.center.y, transform)
-            radius = entity.dxf.radius * (transform['scale'][0] if transform else 1)
-            circles.append({
-                'center': (cx, cy),
-                'radius': radius,
-                'diameter': radius * 2
-            })
-            all_points.append((cx, cy))
+            center = entity.dxf.center
+            circle_rows.append((center.x, center.y, entity.dxf.radius))
 
         elif dtype == 'LWPOLYLINE':
-            points = list(entity.get_points())
-            for i, pt in enumerate(points):
-                x, y = transform_point(pt[0], pt[1], transform)
-                all_points.append((x, y))
-                if i > 0:
-                    px, py = transform_point(points[i-1][0], points[i-1][1], transform)
-                    length = np.sqrt((x-px)**2 + (y-py)**2)
-                    if abs(y - py) < 0.001:
-                        orientation = 'horizontal'
-                    elif abs(x - px) < 0.001:
-                        orientation = 'vertical'
-                    else:
-                        orientation = 'angled'
-                    lines.append({
-                        'start': (px, py),
-                        'end': (x, y),
-                        'length': length,
-                        'orientation': orientation
-                    })
+            # Packed (x, y, start_width, end_width, bulge) rows
+            polyline_vertices.append(np.asarray(entity.lwpoints.values).reshape(-1, 5)[:, :2])
+            polyline_seq.append(seq)
+
+    lines = np.array(line_rows, dtype=np.float64).reshape(-1, 2, 2)
+
+    # Polyline edges join consecutive vertices of the same polyline
+    counts = np.array([len(v) for v in polyline_vertices], dtype=np.int64)
+    vertices = (np.concatenate(polyline_vertices) if polyline_vertices
+                else np.empty((0, 2))).astype(np.float64)
+    vertex_seq = np.repeat(np.array(polyline_seq, dtype=np.int64), counts)
+    edge = vertex_seq[:-1] == vertex_seq[1:]
+    edges = np.stack([vertices[:-1][edge], vertices[1:][edge]], axis=1).reshape(-1, 2, 2)
+
+    # Segments in entity order, as LINEs and polyline edges appear in the file
+    order = np.argsort(np.concatenate([np.array(line_seq, dtype=np.int64), vertex_seq[:-1][edge]]),
+                       kind='stable')
+    segments = np.concatenate([lines, edges])[order]
+
+    arcs = np.array(arc_rows, dtype=np.float64).reshape(-1, 5)
+    circles = np.array(circle_rows, dtype=np.float64).reshape(-1, 3)
+
+    # Arc end points are kept as points so they follow any later transform exactly
+    rad = np.radians(arcs[:, 3:])
+    arc_ends = [arcs[:, :2] + arcs[:, 2:3] * np.column_stack([np.cos(rad[:, k]), np.sin(rad[:, k])])
+                for k in range(2)]
+
+    return BlockGeometry(
+        segments=segments,
+        arcs=arcs,
+        circles=circles,
+        points=np.concatenate([lines.reshape(-1, 2), vertices, *arc_ends, circles[:, :2]]),
+    )
+
+
+def collect_geometry(doc, layout, cache: Optional[dict] = None, active: Optional[Set[str]] = None) -> BlockGeometry:
+    """Collect a layout's geometry with block references expanded recursively.
+
+    Each block definition is extracted once and cached by name in its own
+    coordinates; every INSERT (and each MINSERT cell) then instances it with
+    one matrix. Nested inserts compose through the cached geometry of the
+    blocks that contain them.
+    """
+    if cache is None:
+        cache = {}
+    if active is None:
+        active = set()
+
+    parts = []
+    run = []  # consecutive non-INSERT entities
+    for entity in layout:
+        if entity.dxftype() != 'INSERT':
+            run.append(entity)
+            continue
+
+        name = entity.dxf.name
+        if name not in cache:
+            block = doc.blocks.get(name)
+            if block is None or name in active:  # missing or self-referencing block
+                continue
+            active.add(name)
+            cache[name] = collect_geometry(doc, block, cache, active)
+            active.discard(name)
+
+        if run:
+            parts.append(extract_geometry(run))
+            run = []
+        parts.extend(transform_geometry(cache[name], matrix) for matrix in insert_matrices(entity))
+
+    parts.append(extract_geometry(run))
+    return concat_geometry(parts)
+
 
-    if not all_points:
+def analyze_geometry(doc, msp) -> GeometryAnalysis:
+    """Analyze DXF geometry and extract features.
+
+    Lines are edges, with collinear pieces merged (see merge_collinear_segments).
+    """
+    geometry = collect_geometry(doc, msp)
+    if len(geometry.points) == 0:
         raise ValueError("No geometry found in DXF file")
 
-    points_array = np.array(all_points)
-    xmin, ymin = points_array.min(axis=0)
-    xmax, ymax = points_array.max(axis=0)
+    xmin, ymin = geometry.points.min(axis=0)
+    xmax, ymax = geometry.points.max(axis=0)
+
+    _, unique_x = cluster_values(geometry.points[:, 0], COORDINATE_TOLERANCE)
+    _, unique_y = cluster_values(geometry.points[:, 1], COORDINATE_TOLERANCE)
 
-    unique_x = sorted(set(round(p[0], 3) for p in all_points))
-    unique_y = sorted(set(round(p[1], 3) for p in all_points))
+    return make_analysis((xmin, ymin, xmax, ymax), merge_collinear_segments(geometry.segments),
+                         geometry.arcs, geometry.circles, unique_x, unique_y)
+
+
+def anchored_run_starts(ordered: np.ndarray, widths, breaks: Optional[np.ndarray] = None,
+                        highs: Optional[np.ndarray] = None) -> np.ndarray:
+    """Split sorted values into runs no wider than their first member allows.
+
+    A run starting at i holds the following members up to ordered[i] + widths[i]
+    (widths may be a scalar), so unlike chaining neighbours a run can never
+    drift. Members that are intervals pass their upper ends as highs, and the
+    whole interval must fit. breaks marks positions that must start a run.
+    Returns the start index of every run.
+    """
+    n = len(ordered)
+    widths = np.broadcast_to(np.asarray(widths, dtype=float), (n,))
+    highs = ordered if highs is None else highs
+    limits = ordered + widths
+    # No run can cross a gap wider than every width, so split there first
+    forced = np.r_[True, np.diff(ordered) > widths.max()]
+    if breaks is not None:
+        forced |= breaks
+    forced_starts = np.flatnonzero(forced)
+    forced_ends = np.r_[forced_starts[1:], n]
+
+    # Most forced runs already fit within their first member's width
+    wide = np.maximum.reduceat(highs, forced_starts) > limits[forced_starts]
+    if not wide.any():
+        return forced_starts
+
+    starts = [forced_starts[~wide]]
+    values, high_values, limit_values = ordered.tolist(), highs.tolist(), limits.tolist()
+    for lo, hi in zip(forced_starts[wide].tolist(), forced_ends[wide].tolist()):
+        run_starts = [lo]
+        if highs is ordered:
+            while True:
+                lo = bisect.bisect_right(values, limit_values[lo], lo, hi)
+                if lo >= hi:
+                    break
+                run_starts.append(lo)
+        else:
+            limit = limit_values[lo]
+            for i in range(lo + 1, hi):
+                if high_values[i] > limit:
+                    run_starts.append(i)
+                    limit = limit_values[i]
+        starts.append(np.array(run_starts, dtype=np.int64))
+    return np.sort(np.concatenate(starts))
+
+
+def cluster_values(values, tolerance: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Cluster 1D values: each cluster spans at most tolerance from its lowest value.
+
+    Returns (labels, centers): each value's cluster index, and one representative
+    per cluster in ascending order (its middle member, so exact input values survive).
+    Unlike rounding, values either side of a rounding boundary still cluster together,
+    and unlike chaining neighbours, evenly spaced values never merge into one wide cluster.
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+
+    order = np.argsort(values, kind='stable')
+    ordered = values[order]
+    starts = anchored_run_starts(ordered, tolerance)
+    ends = np.r_[starts[1:], len(values)]
+
+    labels = np.empty(len(values), dtype=np.int64)
+    labels[order] = np.repeat(np.arange(len(starts)), ends - starts)
+    return labels, ordered[(starts + ends - 1) // 2]
+
+
+def run_labels(starts: np.ndarray, n: int) -> np.ndarray:
+    """Run index of each of n sorted positions, given the runs' start indices."""
+    return np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+
+
+def merge_collinear_segments(segments: np.ndarray, tolerance: float = COORDINATE_TOLERANCE) -> np.ndarray:
+    """Merge collinear segments that overlap or touch into single segments.
+
+    Exporters often write one edge as many pieces, with shared vertices jittered
+    by rounding. Segments are grouped into lines by direction, then by
+    perpendicular offset: a segment joins a line only if both its endpoints lie
+    within tolerance of it, so short pieces may deviate in angle by about
+    tolerance / length. Groups are anchored at their first member rather than
+    chained, so finely tessellated curves do not collapse into long chords.
+    Each line's segments are sorted along it and swept, starting a new edge at
+    any gap wider than tolerance. Merged edges run between the outermost
+    original endpoints; segments that merge with nothing (including any shorter
+    than tolerance) are returned unchanged, and edges keep the order of their
+    first segment.
+    """
+    if len(segments) < 2:
+        return segments
+
+    start, end = segments[:, 0], segments[:, 1]
+    delta = end - start
+    length = np.hypot(delta[:, 0], delta[:, 1])
+
+    # Every segment is its own line until grouped below
+    line_ids = np.arange(len(segments))
+    direction = np.tile([1.0, 0.0], (len(segments), 1))
+    np.divide(delta, length[:, None], out=direction, where=length[:, None] > 0)
+
+    candidates = np.flatnonzero(length > tolerance)
+    if len(candidates) > 1:
+        # Direction in [-spread, pi - spread), so near-0 and near-pi agree. A piece's
+        # endpoints stay within tolerance of a line up to `spread` radians off it either
+        # way, so a group spans at most twice its first member's spread
+        angle = np.arctan2(delta[candidates, 1], delta[candidates, 0]) % np.pi
+        spread = tolerance / length[candidates]
+        angle[angle >= np.pi - spread] -= np.pi
+        order = np.argsort(angle, kind='stable')
+        groups = np.empty(len(candidates), dtype=np.int64)
+        groups[order] = run_labels(anchored_run_starts(angle[order], 2 * spread[order]), len(candidates))
+
+        # Lines follow each group's summed direction; for a chain of pieces that is
+        # exactly the direction from its first vertex to its last
+        weights = length[candidates]
+        summed = np.stack([np.bincount(groups, weights * np.cos(angle)),
+                           np.bincount(groups, weights * np.sin(angle))], axis=1)
+        summed /= np.hypot(summed[:, 0], summed[:, 1])[:, None]
+        direction[candidates] = summed[groups]
+        normal = np.stack([-direction[candidates, 1], direction[candidates, 0]], axis=1)
+
+        # Lines: every endpoint offset within tolerance of the line's lowest one
+        offset_start = np.einsum('ij,ij->i', start[candidates], normal)
+        offset_end = np.einsum('ij,ij->i', end[candidates], normal)
+        fits = np.abs(offset_end - offset_start) <= tolerance
+        members = candidates[fits]
+        member_groups = groups[fits]
+        offset_low = np.minimum(offset_start, offset_end)[fits]
+        offset_high = np.maximum(offset_start, offset_end)[fits]
+        order = np.lexsort((offset_low, member_groups))
+        group_change = np.r_[True, np.diff(member_groups[order]) != 0]
+        line_starts = anchored_run_starts(offset_low[order], tolerance, breaks=group_change,
+                                          highs=offset_high[order])
+        line_ids[members[order]] = len(segments) + run_labels(line_starts, len(members))
+        _, line_ids = np.unique(line_ids, return_inverse=True)
+
+    # Extent of each segment along its line, low end first
+    t_start = np.einsum('ij,ij->i', start, direction)
+    t_end = np.einsum('ij,ij->i', end, direction)
+    flipped = t_end < t_start
+    low = np.where(flipped, t_end, t_start)
+    high = np.where(flipped, t_start, t_end)
+    low_point = np.where(flipped[:, None], end, start)
+    high_point = np.where(flipped[:, None], start, end)
+
+    # Sweep each line in order of low end. A running max of high ends, kept per line
+    # by lifting each line above the previous one, finds where edges start
+    order = np.lexsort((low, line_ids))
+    lift = line_ids[order] * (high.max() - low.min() + 2 * tolerance + 1)
+    reach = np.maximum.accumulate(high[order] + lift) - lift
+    new_edge = np.r_[True, (np.diff(line_ids[order]) != 0) | (low[order][1:] > reach[:-1] + tolerance)]
+    edge_starts = np.flatnonzero(new_edge)
+    if len(edge_starts) == len(segments):
+        return segments
+
+    edge_ids = np.cumsum(new_edge) - 1
+    counts = np.diff(np.r_[edge_starts, len(segments)])
+    edge_high = np.maximum.reduceat(high[order], edge_starts)
+    # First segment (in sweep order) of each edge that reaches the edge's high end
+    reaches_high = np.flatnonzero(high[order] == edge_high[edge_ids])
+    _, first_high = np.unique(edge_ids[reaches_high], return_index=True)
+
+    merged = np.stack([low_point[order][edge_starts], high_point[order][reaches_high[first_high]]], axis=1)
+    single = counts == 1
+    merged[single] = segments[order[edge_starts[single]]]
+
+    first_index = np.minimum.reduceat(order, edge_starts)
+    return merged[np.argsort(first_index, kind='stable')]
+
+
+def make_analysis(bounds, segments: np.ndarray, arcs: np.ndarray, circles: np.ndarray,
+                  unique_x: np.ndarray, unique_y: np.ndarray) -> GeometryAnalysis:
+    """Build a GeometryAnalysis from feature arrays (see BlockGeometry for their layout)."""
+    start, end = segments[:, 0], segments[:, 1]
+    delta = end - start
+    lengths = np.hypot(delta[:, 0], delta[:, 1])
+    orientations = np.where(np.abs(delta[:, 1]) < 0.001, 'horizontal',
+                            np.where(np.abs(delta[:, 0]) < 0.001, 'vertical', 'angled'))
+    lines = [
+        {'start': (x1, y1), 'end': (x2, y2), 'length': length, 'orientation': orientation}
+        for (x1, y1), (x2, y2), length, orientation
+        in zip(start.tolist(), end.tolist(), lengths.tolist(), orientations.tolist())
+    ]
+    arcs = [
+        {'center': (cx, cy), 'radius': r, 'start_angle': a0, 'end_angle': a1}
+        for cx, cy, r, a0, a1 in arcs.tolist()
+    ]
+    circles = [
+        {'center': (cx, cy), 'radius': r, 'diameter': r * 2}
+        for cx, cy, r in circles.tolist()
+    ]
 
     return GeometryAnalysis(
-        bounds=(xmin, ymin, xmax, ymax),
+        bounds=tuple(bounds),
         lines=lines,
         arcs=arcs,
         circles=circles,
-        unique_x=unique_x,
-        unique_y=unique_y
+        unique_x=np.asarray(unique_x).tolist(),
+        unique_y=np.asarray(unique_y).tolist()
     )
 
 
+# ezdxf path commands (LINE_TO=1, CURVE3_TO=2, CURVE4_TO=3, MOVE_TO=4) as
+# matplotlib path codes, and the vertices each command consumes
+PATH_CODES = np.array([MplPath.STOP, MplPath.LINETO, MplPath.CURVE3, MplPath.CURVE4, MplPath.MOVETO],
+                      dtype=MplPath.code_type)
+PATH_VERTEX_COUNTS = np.array([0, 1, 2, 3, 1])
+
+
+def render_geometry(doc, msp) -> MplPath:
+    """Render the layout once through ezdxf and return every stroke as one compound path.
+
+    Curves stay Bezier segments, so vector pages are exact and compact, and
+    backends emit the whole part as a single stroke. Filled shapes (hatches,
+    solids, text glyphs) contribute their outlines, matching the outline-only
+    blueprint style.
+    """
+    recorder = Recorder()
+    Frontend(RenderContext(doc), recorder).draw_layout(msp, finalize=True)
+
+    vertices = []
+    codes = []
+
+    def add_polyline(points):
+        if len(points) > 1:
+            vertices.append(points)
+            polyline_codes = np.full(len(points), MplPath.LINETO, dtype=MplPath.code_type)
+            polyline_codes[0] = MplPath.MOVETO
+            codes.append(polyline_codes)
+
+    def add_path(path):
+        points = path.np_vertices()
+        commands = np.array(path.command_codes(), dtype=np.int64)
+        path_codes = np.concatenate([[MplPath.MOVETO],
+                                     np.repeat(PATH_CODES[commands], PATH_VERTEX_COUNTS[commands])])
+        if len(points) > 1 and len(path_codes) == len(points):
+            vertices.append(points)
+            codes.append(path_codes.astype(MplPath.code_type))
+
+    for record, _ in recorder.player().recordings():
+        if isinstance(record, SolidLinesRecord):
+            segments = record.lines.np_vertices()
+            vertices.append(segments)
+            segment_codes = np.full(len(segments), MplPath.LINETO, dtype=MplPath.code_type)
+            segment_codes[::2] = MplPath.MOVETO
+            codes.append(segment_codes)
+        elif isinstance(record, PathRecord):
+            add_path(record.path)
+        elif isinstance(record, FilledPathsRecord):
+            for path in record.paths:
+                add_path(path)
+        elif isinstance(record, PointsRecord):
+            points = record.points.np_vertices()
+            add_polyline(np.vstack([points, points[:1]]) if len(points) > 2 else points)
+
+    if not vertices:
+        return MplPath(np.empty((0, 2)))
+    return MplPath(np.concatenate(vertices), np.concatenate(codes))
+
+
+def add_geometry(ax, path: MplPath, linewidth: float, zorder: float = 1):
+    """Add pre-rendered geometry (see render_geometry) to an axes as one unfilled patch.
+
+    Added with add_artist rather than add_patch: views set their limits
+    explicitly, and add_patch would walk every segment to update data limits.
+    """
+    ax.add_artist(mpatches.PathPatch(path, fill=False, edgecolor=COLORS['geometry'],
+                                     linewidth=linewidth, zorder=zorder,
+                                     capstyle='round', joinstyle='round'))
+
+
+class DimensionArtists:
+    """Collects dimension graphics for one axes and draws them as a few batched artists."""
+
+    def __init__(self):
+        self.segments = defaultdict(list)  # (color, linewidth) -> [((x1, y1), (x2, y2)), ...]
+        self.markers = []
+        self.texts = []
+
+    def line(self, x1, y1, x2, y2, color, lw):
+        self.segments[(color, lw)].append(((x1, y1), (x2, y2)))
+
+    def arrow(self, x1, y1, x2, y2, head, color, lw):
+        """Double-headed arrow from (x1, y1) to (x2, y2) with open heads of length head."""
+        self.line(x1, y1, x2, y2, color, lw)
+        length = np.hypot(x2 - x1, y2 - y1)
+        if length == 0:
+            return
+        ux, uy = (x2 - x1) / length, (y2 - y1) / length
+        head = min(head, length / 2)
+        half_width = head * 0.5
+        for (tx, ty), sign in (((x1, y1), 1), ((x2, y2), -1)):
+            bx, by = tx + sign * ux * head, ty + sign * uy * head
+            self.line(tx, ty, bx - uy * half_width, by + ux * half_width, color, lw)
+            self.line(tx, ty, bx + uy * half_width, by - ux * half_width, color, lw)
+
+    def marker(self, x, y):
+        self.markers.append((x, y))
+
+    def text(self, x, y, label, **kwargs):
+        self.texts.append((x, y, label, kwargs))
+
+    def draw(self, ax, zorder: Optional[float] = None):
+        """Add everything collected so far to ax. Text is placed one level above the lines."""
+        line_z = {} if zorder is None else {'zorder': zorder}
+        text_z = {} if zorder is None else {'zorder': zorder + 1}
+        for (color, lw), segments in self.segments.items():
+            ax.add_collection(LineCollection(segments, colors=color, linewidths=lw, **line_z))
+        if self.markers:
+            xs, ys = zip(*self.markers)
+            ax.plot(xs, ys, 'o', linestyle='none', color=COLORS['dimension'], markersize=3,
+                    **line_z)
+        for x, y, label, kwargs in self.texts:
+            ax.text(x, y, label, **kwargs, **text_z)
+
+
+class LabelIndex:
+    """Uniform grid over placed label positions for fixed-radius clearance queries.
+
+    Cells are min_dist wide, so any label closer than min_dist to a point
+    lies in that point's cell or one of its eight neighbours.
+    """
+
+    def __init__(self, min_dist: float):
+        self.min_dist = min_dist
+        self.cell_size = max(min_dist, 1e-12)
+        self.cells = defaultdict(list)  # (i, j) -> [(x, y), ...]
+
+    def add(self, x, y):
+        self.cells[(int(np.floor(x / self.cell_size)), int(np.floor(y / self.cell_size)))].append((x, y))
+
+    def first_clear(self, candidates: np.ndarray) -> int:
+        """Index of the first (x, y) candidate with no label within min_dist, or -1."""
+        cells = np.floor(candidates / self.cell_size).astype(np.int64)
+        keys = {(i + di, j + dj) for i, j in set(map(tuple, cells.tolist()))
+                for di in (-1, 0, 1) for dj in (-1, 0, 1)}
+        nearby = [p for key in keys for p in self.cells.get(key, ())]
+        if not nearby:
+            return 0
+
+        offsets = candidates[:, None, :] - np.array(nearby)[None, :, :]
+        clear = ~((offsets ** 2).sum(axis=2) < self.min_dist ** 2).any(axis=1)
+        return int(np.argmax(clear)) if clear.any() else -1
+
+
+# Label placement candidates, in order of preference
+LABEL_LINE_FRACTIONS = [0.5, 0.3, 0.7, 0.2, 0.8, 0.15, 0.85]
+LABEL_OFFSET_MULTIPLIERS = [1.0, 1.4, 1.8, 2.2, 2.6]
+RADIUS_LABEL_ANGLES = [45, 135, 225, 315, 30, 60, 120, 150, 210, 240, 300, 330]
+
+
+def place_labeled_dimensions(artists, dimensions: List[Dimension], scale: float):
+    """Draw dimensions labeled D1, D2, ... with each label kept clear of earlier ones.
+
+    Linear dimensions try each offset multiplier, then each position along
+    the line; radius labels try each angle. All candidates for a dimension
+    are checked against a LabelIndex in one call.
+
+    Returns:
+        (dim_table, placed_labels): (label, value, dim_type) rows and label positions
+    """
+    index = LabelIndex(scale * 0.06)  # Minimum distance between labels
+    dim_table = []
+    placed_labels = []
+
+    fractions = np.array(LABEL_LINE_FRACTIONS)[None, :]
+    multipliers = np.array(LABEL_OFFSET_MULTIPLIERS)[:, None]
+    angles = np.radians(RADIUS_LABEL_ANGLES)
+
+    for idx, dim in enumerate(dimensions):
+        label = f"D{idx + 1}"
+        dim_table.append((label, dim.value, dim.dim_type))
+
+        if dim.dim_type in ('horizontal', 'vertical'):
+            along = np.broadcast_to(fractions, (len(LABEL_OFFSET_MULTIPLIERS), len(LABEL_LINE_FRACTIONS)))
+            across = np.broadcast_to(multipliers, along.shape)
+            if dim.dim_type == 'horizontal':
+                xs = dim.x1 + (dim.x2 - dim.x1) * along
+                ys = dim.y1 + dim.offset * across * scale
+            else:
+                xs = dim.x1 + dim.offset * across * scale
+                ys = dim.y1 + (dim.y2 - dim.y1) * along
+            candidates = np.column_stack([xs.ravel(), ys.ravel()])
+
+            best = index.first_clear(candidates)
+            if best >= 0:
+                lx, ly = candidates[best].tolist()
+                offset_mult = LABEL_OFFSET_MULTIPLIERS[best // len(LABEL_LINE_FRACTIONS)]
+            else:
+                # Default: first position
+                lx, ly = candidates[0].tolist()
+                offset_mult = 1.0
+            label_pos = lx if dim.dim_type == 'horizontal' else ly
+            draw_labeled_dimension_at(artists, dim.x1, dim.y1, dim.x2, dim.y2,
+                                      dim.offset, dim.dim_type, label, scale, label_pos, offset_mult)
+
+        elif dim.dim_type == 'radius':
+            cx, cy = dim.x1, dim.y1
+            r = dim.value
+            candidates = np.column_stack([cx + r * 1.3 * np.cos(angles), cy + r * 1.3 * np.sin(angles)])
+            best = max(index.first_clear(candidates), 0)
+            lx, ly = candidates[best].tolist()
+            draw_labeled_radius_at(artists, cx, cy, r, label, scale, RADIUS_LABEL_ANGLES[best])
+
+        elif dim.dim_type == 'diameter':
+            draw_labeled_diameter(artists, dim.x1, dim.y1, dim.value, label, scale)
+            lx, ly = dim.x1, dim.y1 + dim.value/2 + scale * 0.02
+
+        else:
+            continue
+
+        placed_labels.append((lx, ly))
+        index.add(lx, ly)
+
+    return dim_table, placed_labels
+
+
 def format_dim(value: float) -> str:
     """Format dimension value nicely."""
     if value < 0.01:
@@ -225,6 +746,19 @@ def format_dim(value: float) -> str:
         return f"{value:.2f}\""
 
 
+def group_lines_by_position(lines: List[dict], axis: int) -> dict:
+    """Group axis-aligned lines by their X (axis 0) or Y (axis 1) position.
+
+    Positions within COORDINATE_TOLERANCE are clustered into one group, keyed
+    by the cluster's representative position.
+    """
+    labels, centers = cluster_values([line['start'][axis] for line in lines], COORDINATE_TOLERANCE)
+    groups = defaultdict(list)
+    for line, label in zip(lines, labels.tolist()):
+        groups[float(centers[label])].append(line)
+    return groups
+
+
 def generate_smart_dimensions(analysis: GeometryAnalysis) -> List[Dimension]:
     """Generate comprehensive dimensions for all features."""
     dims = []
@@ -238,18 +772,12 @@ def generate_smart_dimensions(analysis: GeometryAnalysis) -> List[Dimension]:
     dims.append(Dimension(xmax, ymin, xmax, ymax, height, 'vertical', offset=0.18, priority=0))
 
     # Collect all horizontal lines grouped by Y position
-    h_lines_by_y = defaultdict(list)
-    for line in analysis.lines:
-        if line['orientation'] == 'horizontal' and line['length'] > tolerance:
-            y = round(line['start'][1], 3)
-            h_lines_by_y[y].append(line)
+    h_lines_by_y = group_lines_by_position(
+        [line for line in analysis.lines if line['orientation'] == 'horizontal' and line['length'] > tolerance], 1)
 
     # Collect all vertical lines grouped by X position
-    v_lines_by_x = defaultdict(list)
-    for line in analysis.lines:
-        if line['orientation'] == 'vertical' and line['length'] > tolerance:
-            x = round(line['start'][0], 3)
-            v_lines_by_x[x].append(line)
+    v_lines_by_x = group_lines_by_position(
+        [line for line in analysis.lines if line['orientation'] == 'vertical' and line['length'] > tolerance], 0)
 
     # Get unique Y positions (sorted from bottom to top)
     y_positions = sorted(h_lines_by_y.keys())
@@ -318,8 +846,7 @@ def generate_smart_dimensions(analysis: GeometryAnalysis) -> List[Dimension]:
     # Stagger offsets to prevent text overlap
 
     # Chain dimension Y positions (left side)
-    y_list = sorted(set(round(y, 3) for y in y_positions))
-    y_list = [y for y in y_list if abs(y - ymin) > tolerance and abs(y - ymax) > tolerance]
+    y_list = [y for y in y_positions if abs(y - ymin) > tolerance and abs(y - ymax) > tolerance]
 
     # Add bottom reference + chain with alternating offsets
     if y_list:
@@ -346,8 +873,7 @@ def generate_smart_dimensions(analysis: GeometryAnalysis) -> List[Dimension]:
             ))
 
     # Chain dimension X positions (top side) - alternate up/down
-    x_list = sorted(set(round(x, 3) for x in x_positions))
-    x_list = [x for x in x_list if abs(x - xmin) > tolerance and abs(x - xmax) > tolerance]
+    x_list = [x for x in x_positions if abs(x - xmin) > tolerance and abs(x - xmax) > tolerance]
 
     if x_list:
         # First: from left to first feature
@@ -473,29 +999,28 @@ def generate_smart_dimensions(analysis: GeometryAnalysis) -> List[Dimension]:
     return dims
 
 
-def draw_dimension_line(ax, x1, y1, x2, y2, offset, dim_type, value, scale):
+def draw_dimension_line(artists, x1, y1, x2, y2, offset, dim_type, value, scale):
     """Draw a clean dimension line with arrows and text."""
     color = COLORS['dimension']
     leader_color = COLORS['leader']
 
     text_size = max(8, min(11, scale * 0.8))
     tick_size = scale * 0.015  # Small tick mark at feature
+    head = scale * ARROW_HEAD
 
     if dim_type == 'horizontal':
         yo = y1 + offset * scale
 
         # Extension lines from feature to dimension line
-        ax.plot([x1, x1], [y1, yo], color=leader_color, lw=0.5, linestyle='-')
-        ax.plot([x2, x2], [y2, yo], color=leader_color, lw=0.5, linestyle='-')
+        artists.line(x1, y1, x1, yo, leader_color, 0.5)
+        artists.line(x2, y2, x2, yo, leader_color, 0.5)
 
         # Small tick marks at the feature locations
-        ax.plot([x1 - tick_size, x1 + tick_size], [y1, y1], color=color, lw=1)
-        ax.plot([x2 - tick_size, x2 + tick_size], [y2, y2], color=color, lw=1)
+        artists.line(x1 - tick_size, y1, x1 + tick_size, y1, color, 1)
+        artists.line(x2 - tick_size, y2, x2 + tick_size, y2, color, 1)
 
         # Dimension line with arrows
-        ax.annotate('', xy=(x1, yo), xytext=(x2, yo),
-                    arrowprops=dict(arrowstyle='<->', color=color, lw=1,
-                                   shrinkA=0, shrinkB=0))
+        artists.arrow(x1, yo, x2, yo, head, color, 1)
 
         # Text
         mid_x = (x1 + x2) / 2
@@ -503,25 +1028,23 @@ def draw_dimension_line(ax, x1, y1, x2, y2, offset, dim_type, value, scale):
         va = 'bottom' if offset > 0 else 'top'
         text_y = yo + (text_offset if offset > 0 else -text_offset)
 
-        ax.text(mid_x, text_y, format_dim(value),
-                ha='center', va=va, color=color, fontsize=text_size,
-                fontweight='bold')
+        artists.text(mid_x, text_y, format_dim(value),
+                     ha='center', va=va, color=color, fontsize=text_size,
+                     fontweight='bold')
 
     elif dim_type == 'vertical':
         xo = x1 + offset * scale
 
         # Extension lines from feature to dimension line
-        ax.plot([x1, xo], [y1, y1], color=leader_color, lw=0.5, linestyle='-')
-        ax.plot([x2, xo], [y2, y2], color=leader_color, lw=0.5, linestyle='-')
+        artists.line(x1, y1, xo, y1, leader_color, 0.5)
+        artists.line(x2, y2, xo, y2, leader_color, 0.5)
 
         # Small tick marks at the feature locations
-        ax.plot([x1, x1], [y1 - tick_size, y1 + tick_size], color=color, lw=1)
-        ax.plot([x2, x2], [y2 - tick_size, y2 + tick_size], color=color, lw=1)
+        artists.line(x1, y1 - tick_size, x1, y1 + tick_size, color, 1)
+        artists.line(x2, y2 - tick_size, x2, y2 + tick_size, color, 1)
 
         # Dimension line with arrows
-        ax.annotate('', xy=(xo, y1), xytext=(xo, y2),
-                    arrowprops=dict(arrowstyle='<->', color=color, lw=1,
-                                   shrinkA=0, shrinkB=0))
+        artists.arrow(xo, y1, xo, y2, head, color, 1)
 
         # Text
         mid_y = (y1 + y2) / 2
@@ -529,12 +1052,12 @@ def draw_dimension_line(ax, x1, y1, x2, y2, offset, dim_type, value, scale):
         ha = 'left' if offset > 0 else 'right'
         text_x = xo + (text_offset if offset > 0 else -text_offset)
 
-        ax.text(text_x, mid_y, format_dim(value),
-                ha=ha, va='center', color=color, fontsize=text_size,
-                fontweight='bold', rotation=90)
+        artists.text(text_x, mid_y, format_dim(value),
+                     ha=ha, va='center', color=color, fontsize=text_size,
+                     fontweight='bold', rotation=90)
 
 
-def draw_radius_dimension(ax, cx, cy, radius, scale):
+def draw_radius_dimension(artists, cx, cy, radius, scale):
     """Draw a radius dimension."""
     color = COLORS['dimension']
     text_size = max(8, min(10, scale * 0.7))
@@ -545,116 +1068,77 @@ def draw_radius_dimension(ax, cx, cy, radius, scale):
     ry = cy + radius * np.sin(angle)
 
     # Radius line
-    ax.plot([cx, rx], [cy, ry], color=color, lw=0.8)
-    ax.plot(rx, ry, 'o', color=color, markersize=3)
+    artists.line(cx, cy, rx, ry, color, 0.8)
+    artists.marker(rx, ry)
 
     # Label positioned outside
     label_dist = radius * 1.4
     lx = cx + label_dist * np.cos(angle)
     ly = cy + label_dist * np.sin(angle)
 
-    ax.text(lx, ly, f'R{format_dim(radius)}',
-            ha='left', va='bottom', color=color, fontsize=text_size,
-            fontweight='bold')
+    artists.text(lx, ly, f'R{format_dim(radius)}',
+                 ha='left', va='bottom', color=color, fontsize=text_size,
+                 fontweight='bold')
 
 
-def draw_diameter_dimension(ax, cx, cy, diameter, scale):
+def draw_diameter_dimension(artists, cx, cy, diameter, scale):
     """Draw a diameter dimension."""
     color = COLORS['dimension']
     text_size = max(8, min(10, scale * 0.7))
     r = diameter / 2
 
     # Horizontal diameter line
-    ax.plot([cx - r, cx + r], [cy, cy], color=color, lw=0.8)
-    ax.plot([cx - r, cx + r], [cy, cy], 'o', color=color, markersize=3)
+    artists.line(cx - r, cy, cx + r, cy, color, 0.8)
+    artists.marker(cx - r, cy)
+    artists.marker(cx + r, cy)
 
     # Label above
-    ax.text(cx, cy + r + scale * 0.03, f'⌀{format_dim(diameter)}',
-            ha='center', va='bottom', color=color, fontsize=text_size,
-            fontweight='bold')
+    artists.text(cx, cy + r + scale * 0.03, f'⌀{format_dim(diameter)}',
+                 ha='center', va='bottom', color=color, fontsize=text_size,
+                 fontweight='bold')
 
 
-def draw_labeled_dimension(ax, x1, y1, x2, y2, offset, dim_type, label, scale, position=0.5):
+def draw_labeled_dimension(artists, x1, y1, x2, y2, offset, dim_type, label, scale, position=0.5):
     """Draw a dimension line with a label following the line direction."""
-    color = COLORS['dimension']
-    leader_color = COLORS['leader']
-    text_size = 6
-    tick_size = scale * 0.015
-
     if dim_type == 'horizontal':
-        yo = y1 + offset * scale
-        ax.plot([x1, x1], [y1, yo], color=leader_color, lw=0.5, linestyle='-')
-        ax.plot([x2, x2], [y2, yo], color=leader_color, lw=0.5, linestyle='-')
-        ax.plot([x1 - tick_size, x1 + tick_size], [y1, y1], color=color, lw=1)
-        ax.plot([x2 - tick_size, x2 + tick_size], [y2, y2], color=color, lw=1)
-        ax.annotate('', xy=(x1, yo), xytext=(x2, yo),
-                    arrowprops=dict(arrowstyle='<->', color=color, lw=1, shrinkA=0, shrinkB=0))
-        # Label at variable position along line
-        label_x = x1 + (x2 - x1) * position
-        text_offset = scale * 0.015
-        va = 'bottom' if offset > 0 else 'top'
-        text_y = yo + (text_offset if offset > 0 else -text_offset)
-        ax.text(label_x, text_y, label, ha='center', va=va, color=color, fontsize=text_size, rotation=0)
-
-    elif dim_type == 'vertical':
-        xo = x1 + offset * scale
-        ax.plot([x1, xo], [y1, y1], color=leader_color, lw=0.5, linestyle='-')
-        ax.plot([x2, xo], [y2, y2], color=leader_color, lw=0.5, linestyle='-')
-        ax.plot([x1, x1], [y1 - tick_size, y1 + tick_size], color=color, lw=1)
-        ax.plot([x2, x2], [y2 - tick_size, y2 + tick_size], color=color, lw=1)
-        ax.annotate('', xy=(xo, y1), xytext=(xo, y2),
-                    arrowprops=dict(arrowstyle='<->', color=color, lw=1, shrinkA=0, shrinkB=0))
-        # Label at variable position along line
-        label_y = y1 + (y2 - y1) * position
-        text_offset = scale * 0.015
-        ha = 'left' if offset > 0 else 'right'
-        text_x = xo + (text_offset if offset > 0 else -text_offset)
-        ax.text(text_x, label_y, label, ha=ha, va='center', color=color, fontsize=text_size, rotation=90)
+        label_pos = x1 + (x2 - x1) * position
+    else:
+        label_pos = y1 + (y2 - y1) * position
+    draw_labeled_dimension_at(artists, x1, y1, x2, y2, offset, dim_type, label, scale, label_pos)
 
 
-def draw_labeled_radius(ax, cx, cy, radius, label, scale):
+def draw_labeled_radius(artists, cx, cy, radius, label, scale):
     """Draw a radius dimension with a label following the line direction."""
-    color = COLORS['dimension']
-    text_size = 6
-    angle = np.radians(45)
-    rx = cx + radius * np.cos(angle)
-    ry = cy + radius * np.sin(angle)
-    ax.plot([cx, rx], [cy, ry], color=color, lw=0.8)
-    ax.plot(rx, ry, 'o', color=color, markersize=3)
-    label_dist = radius * 1.2
-    lx = cx + label_dist * np.cos(angle)
-    ly = cy + label_dist * np.sin(angle)
-    ax.text(lx, ly, label, ha='center', va='center', color=color, fontsize=text_size, rotation=45)
+    draw_labeled_radius_at(artists, cx, cy, radius, label, scale, 45, label_factor=1.2)
 
 
-def draw_labeled_radius_at(ax, cx, cy, radius, label, scale, angle_deg):
+def draw_labeled_radius_at(artists, cx, cy, radius, label, scale, angle_deg, label_factor=1.3):
     """Draw a radius dimension with label at specific angle."""
     color = COLORS['dimension']
     text_size = 6
-    z = 10
     angle = np.radians(angle_deg)
     rx = cx + radius * np.cos(angle)
     ry = cy + radius * np.sin(angle)
-    ax.plot([cx, rx], [cy, ry], color=color, lw=0.8, zorder=z)
-    ax.plot(rx, ry, 'o', color=color, markersize=3, zorder=z)
-    label_dist = radius * 1.3
+    artists.line(cx, cy, rx, ry, color, 0.8)
+    artists.marker(rx, ry)
+    label_dist = radius * label_factor
     lx = cx + label_dist * np.cos(angle)
     ly = cy + label_dist * np.sin(angle)
-    ax.text(lx, ly, label, ha='center', va='center', color=color, fontsize=text_size, rotation=angle_deg, zorder=z+1)
+    artists.text(lx, ly, label, ha='center', va='center', color=color, fontsize=text_size, rotation=angle_deg)
 
 
-def draw_labeled_diameter(ax, cx, cy, diameter, label, scale):
+def draw_labeled_diameter(artists, cx, cy, diameter, label, scale):
     """Draw a diameter dimension with a label."""
     color = COLORS['dimension']
     text_size = 6
-    z = 10
     r = diameter / 2
-    ax.plot([cx - r, cx + r], [cy, cy], color=color, lw=0.8, zorder=z)
-    ax.plot([cx - r, cx + r], [cy, cy], 'o', color=color, markersize=3, zorder=z)
-    ax.text(cx, cy + scale * 0.02, label, ha='center', va='bottom', color=color, fontsize=text_size, rotation=0, zorder=z+1)
+    artists.line(cx - r, cy, cx + r, cy, color, 0.8)
+    artists.marker(cx - r, cy)
+    artists.marker(cx + r, cy)
+    artists.text(cx, cy + scale * 0.02, label, ha='center', va='bottom', color=color, fontsize=text_size, rotation=0)
 
 
-def draw_labeled_dimension_at(ax, x1, y1, x2, y2, offset, dim_type, label, scale, label_pos, offset_mult=1.0):
+def draw_labeled_dimension_at(artists, x1, y1, x2, y2, offset, dim_type, label, scale, label_pos, offset_mult=1.0):
     """Draw a dimension line with label at a specific position.
 
     Args:
@@ -664,36 +1148,34 @@ def draw_labeled_dimension_at(ax, x1, y1, x2, y2, offset, dim_type, label, scale
     leader_color = COLORS['leader']
     text_size = 6
     tick_size = scale * 0.015
+    head = scale * ARROW_HEAD
     actual_offset = offset * offset_mult
-    z = 10  # Draw on top of geometry
 
     if dim_type == 'horizontal':
         yo = y1 + actual_offset * scale
-        ax.plot([x1, x1], [y1, yo], color=leader_color, lw=0.5, linestyle='-', zorder=z)
-        ax.plot([x2, x2], [y2, yo], color=leader_color, lw=0.5, linestyle='-', zorder=z)
-        ax.plot([x1 - tick_size, x1 + tick_size], [y1, y1], color=color, lw=1, zorder=z)
-        ax.plot([x2 - tick_size, x2 + tick_size], [y2, y2], color=color, lw=1, zorder=z)
-        ax.annotate('', xy=(x1, yo), xytext=(x2, yo),
-                    arrowprops=dict(arrowstyle='<->', color=color, lw=1, shrinkA=0, shrinkB=0, zorder=z))
+        artists.line(x1, y1, x1, yo, leader_color, 0.5)
+        artists.line(x2, y2, x2, yo, leader_color, 0.5)
+        artists.line(x1 - tick_size, y1, x1 + tick_size, y1, color, 1)
+        artists.line(x2 - tick_size, y2, x2 + tick_size, y2, color, 1)
+        artists.arrow(x1, yo, x2, yo, head, color, 1)
         # label_pos is the x coordinate
         text_offset = scale * 0.015
         va = 'bottom' if actual_offset > 0 else 'top'
         text_y = yo + (text_offset if actual_offset > 0 else -text_offset)
-        ax.text(label_pos, text_y, label, ha='center', va=va, color=color, fontsize=text_size, rotation=0, zorder=z+1)
+        artists.text(label_pos, text_y, label, ha='center', va=va, color=color, fontsize=text_size, rotation=0)
 
     elif dim_type == 'vertical':
         xo = x1 + actual_offset * scale
-        ax.plot([x1, xo], [y1, y1], color=leader_color, lw=0.5, linestyle='-', zorder=z)
-        ax.plot([x2, xo], [y2, y2], color=leader_color, lw=0.5, linestyle='-', zorder=z)
-        ax.plot([x1, x1], [y1 - tick_size, y1 + tick_size], color=color, lw=1, zorder=z)
-        ax.plot([x2, x2], [y2 - tick_size, y2 + tick_size], color=color, lw=1, zorder=z)
-        ax.annotate('', xy=(xo, y1), xytext=(xo, y2),
-                    arrowprops=dict(arrowstyle='<->', color=color, lw=1, shrinkA=0, shrinkB=0, zorder=z))
+        artists.line(x1, y1, xo, y1, leader_color, 0.5)
+        artists.line(x2, y2, xo, y2, leader_color, 0.5)
+        artists.line(x1, y1 - tick_size, x1, y1 + tick_size, color, 1)
+        artists.line(x2, y2 - tick_size, x2, y2 + tick_size, color, 1)
+        artists.arrow(xo, y1, xo, y2, head, color, 1)
         # label_pos is the y coordinate
         text_offset = scale * 0.015
         ha = 'left' if actual_offset > 0 else 'right'
         text_x = xo + (text_offset if actual_offset > 0 else -text_offset)
-        ax.text(text_x, label_pos, label, ha=ha, va='center', color=color, fontsize=text_size, rotation=90, zorder=z+1)
+        artists.text(text_x, label_pos, label, ha=ha, va='center', color=color, fontsize=text_size, rotation=90)
 
 
 def calc_landscape_limits(data_xmin, data_xmax, data_ymin, data_ymax, axes_aspect=1.33, margin_frac=0.1):
@@ -733,13 +1215,17 @@ def calc_landscape_limits(data_xmin, data_xmax, data_ymin, data_ymax, axes_aspec
         return (data_xmin, data_xmax, y_center - target_height/2, y_center + target_height/2)
 
 
+def render_figure_png(fig, dpi: int = 150) -> bytes:
+    """Render a matplotlib figure to PNG bytes, trimmed to its contents."""
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=dpi, facecolor='white', bbox_inches='tight', pad_inches=0.1)
+    return buf.getvalue()
+
+
 def render_figure_to_image(fig):
     """Render a matplotlib figure to a PIL Image."""
     from PIL import Image
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png', dpi=150, facecolor='white', bbox_inches='tight', pad_inches=0.1)
-    buf.seek(0)
-    return Image.open(buf)
+    return Image.open(io.BytesIO(render_figure_png(fig)))
 
 
 def add_image_to_page(pdf, img, page_size=(11, 8.5), caption=None):
@@ -770,6 +1256,13 @@ def add_image_to_page(pdf, img, page_size=(11, 8.5), caption=None):
     ax.imshow(img)
     ax.axis('off')
 
+    add_page_frame(fig, caption)
+    pdf.savefig(fig, facecolor='white')
+    plt.close(fig)
+
+
+def add_page_frame(fig, caption=None):
+    """Add the page border and optional caption."""
     if caption:
         fig.text(0.5, 0.04, caption, ha='center', fontsize=10, color='#666666')
 
@@ -779,391 +1272,708 @@ def add_image_to_page(pdf, img, page_size=(11, 8.5), caption=None):
                                   linewidth=2, transform=fig.transFigure)
     fig.patches.append(border)
 
+
+def view_figure(draw_view):
+    """A 10 x 8 figure holding just the view drawn by draw_view(ax)."""
+    fig = plt.figure(figsize=(10, 8), facecolor='white')
+    ax = fig.add_subplot(111)
+    ax.set_facecolor('white')
+    xlim_min, xlim_max, ylim_min, ylim_max = draw_view(ax)
+    ax.set_xlim(xlim_min, xlim_max)
+    ax.set_ylim(ylim_min, ylim_max)
+    ax.set_aspect('equal')
+    ax.axis('off')
+    return fig
+
+
+def add_view_page(pdf, draw_view, page_size=(11, 8.5), caption=None, vector=True):
+    """Add a page showing a part view.
+
+    draw_view(ax) draws the view and returns the (xmin, xmax, ymin, ymax)
+    region to show. In vector mode it draws straight onto the page, with the
+    region widened by calc_landscape_limits to fill the drawing area at equal
+    scale. Otherwise the view is rendered to an image and placed on the page.
+    """
+    if not vector:
+        fig = view_figure(draw_view)
+        img = render_figure_to_image(fig)
+        plt.close(fig)
+        add_image_to_page(pdf, img, page_size=page_size, caption=caption)
+        return
+
+    fig = plt.figure(figsize=page_size, facecolor='white')
+    # Same drawing area that add_image_to_page fits images into
+    w = 0.88
+    h = 0.82 if caption else 0.88
+    ax = fig.add_axes([(1 - w) / 2, (1 - h) / 2 + (0.03 if caption else 0), w, h])
+    ax.set_facecolor('white')
+
+    limits = draw_view(ax)
+    xlim_min, xlim_max, ylim_min, ylim_max = calc_landscape_limits(
+        *limits, axes_aspect=(w * page_size[0]) / (h * page_size[1]), margin_frac=0)
+    ax.set_xlim(xlim_min, xlim_max)
+    ax.set_ylim(ylim_min, ylim_max)
+    ax.set_aspect('equal')
+    ax.axis('off')
+
+    add_page_frame(fig, caption)
     pdf.savefig(fig, facecolor='white')
     plt.close(fig)
 
 
-def generate_blueprint(input_path: str, output_path: str, thickness: float = 0.5,
-                       title: Optional[str] = None):
-    """Generate a multi-page PDF blueprint from a DXF file."""
+def draw_clean_view(ax, geometry, bounds):
+    """Geometry only. Returns the region to show."""
+    xmin, ymin, xmax, ymax = bounds
+    add_geometry(ax, geometry, 2)
+    margin = max(xmax - xmin, ymax - ymin) * 0.1
+    return (xmin - margin, xmax + margin, ymin - margin, ymax + margin)
+
+
+def draw_dimensioned_view(ax, geometry, dimensions, bounds, scale):
+    """Geometry with value dimensions. Returns the region to show."""
+    xmin, ymin, xmax, ymax = bounds
+    add_geometry(ax, geometry, 1.5)
+
+    artists = DimensionArtists()
+    for dim in dimensions:
+        if dim.dim_type in ['horizontal', 'vertical']:
+            draw_dimension_line(artists, dim.x1, dim.y1, dim.x2, dim.y2,
+                                dim.offset, dim.dim_type, dim.value, scale)
+        elif dim.dim_type == 'radius':
+            draw_radius_dimension(artists, dim.x1, dim.y1, dim.value, scale)
+        elif dim.dim_type == 'diameter':
+            draw_diameter_dimension(artists, dim.x1, dim.y1, dim.value, scale)
+    artists.draw(ax)
+
+    # Dynamically calculate margins based on dimension positions
+    min_dim_x = xmin
+    max_dim_x = xmax
+    min_dim_y = ymin
+    max_dim_y = ymax
+
+    for dim in dimensions:
+        if dim.dim_type == 'horizontal':
+            dim_y = dim.y1 + dim.offset * scale
+            min_dim_y = min(min_dim_y, dim_y)
+            max_dim_y = max(max_dim_y, dim_y)
+        elif dim.dim_type == 'vertical':
+            dim_x = dim.x1 + dim.offset * scale
+            min_dim_x = min(min_dim_x, dim_x)
+            max_dim_x = max(max_dim_x, dim_x)
+
+    margin = max(max_dim_x - min_dim_x, max_dim_y - min_dim_y) * 0.08
+    return (min_dim_x - margin, max_dim_x + margin, min_dim_y - margin, max_dim_y + margin)
+
+
+def draw_labeled_view(ax, geometry, dimensions, bounds, scale):
+    """Geometry with D1, D2, ... labeled dimensions. Returns the region to show."""
+    xmin, ymin, xmax, ymax = bounds
+
+    # Geometry at low z-order so dimensions draw on top
+    add_geometry(ax, geometry, 1.5, zorder=1)
+    artists = DimensionArtists()
+    _, placed_labels = place_labeled_dimensions(artists, dimensions, scale)
+    artists.draw(ax, zorder=10)
+
+    # Use placed_labels to find actual extent
+    min_dim_x = xmin
+    max_dim_x = xmax
+    min_dim_y = ymin
+    max_dim_y = ymax
+    for lx, ly in placed_labels:
+        min_dim_x = min(min_dim_x, lx)
+        max_dim_x = max(max_dim_x, lx)
+        min_dim_y = min(min_dim_y, ly)
+        max_dim_y = max(max_dim_y, ly)
+
+    text_padding = scale * 0.15
+    return (min_dim_x - text_padding, max_dim_x + text_padding,
+            min_dim_y - text_padding, max_dim_y + text_padding)
+
+
+def add_title_page(pdf, data: BlueprintData):
+    """Page 1: title and specifications."""
+    xmin, ymin, xmax, ymax = data.bounds
+    width = xmax - xmin
+    height = ymax - ymin
+    n_lines, n_arcs, n_circles = data.feature_counts
+
+    fig1 = plt.figure(figsize=(11, 8.5), facecolor='white')
+
+    # Title
+    fig1.text(0.5, 0.85, data.part_name, ha='center', va='center',
+              fontsize=32, fontweight='bold', color=COLORS['text'])
+
+    fig1.text(0.5, 0.78, 'TECHNICAL DRAWING', ha='center', va='center',
+              fontsize=14, color='#666666')
+
+    # Specifications box
+    specs = [
+        ('Overall Width', format_dim(width)),
+        ('Overall Height', format_dim(height)),
+        ('Material Thickness', format_dim(data.thickness)),
+        ('', ''),
+        ('Lines', str(n_lines)),
+        ('Arcs', str(n_arcs)),
+        ('Circles', str(n_circles)),
+        ('', ''),
+        ('Total Dimensions', str(len(data.dimensions))),
+        ('Scale', '1:1'),
+        ('Units', 'Inches'),
+    ]
+
+    y_pos = 0.62
+    for label, value in specs:
+        if label:
+            fig1.text(0.35, y_pos, label + ':', ha='right', va='center',
+                      fontsize=12, color='#666666')
+            fig1.text(0.38, y_pos, value, ha='left', va='center',
+                      fontsize=12, fontweight='bold', color=COLORS['text'])
+        y_pos -= 0.04
+
+    # Branding and date
+    fig1.text(0.5, 0.11, 'Pro Plastics Inc.', ha='center', va='center',
+              fontsize=11, color='#999999')
+    fig1.text(0.5, 0.08, f'Generated: {data.generated}',
+              ha='center', va='center', fontsize=10, color='#999999')
+
+    # Border
+    border = mpatches.Rectangle((0.03, 0.03), 0.94, 0.94,
+                                  fill=False, edgecolor=COLORS['border'],
+                                  linewidth=2, transform=fig1.transFigure)
+    fig1.patches.append(border)
+
+    pdf.savefig(fig1, facecolor='white')
+    plt.close(fig1)
+
+
+def size_caption(data: BlueprintData) -> str:
+    xmin, ymin, xmax, ymax = data.bounds
+    return f'Size: {format_dim(xmax - xmin)} × {format_dim(ymax - ymin)} × {format_dim(data.thickness)} thick'
+
+
+def add_clean_view_page(pdf, data: BlueprintData):
+    """Page 2: clean part view."""
+    add_view_page(pdf, lambda ax: draw_clean_view(ax, data.geometry, data.bounds),
+                  caption=size_caption(data), vector=data.vector)
+
+
+def add_dimensioned_view_page(pdf, data: BlueprintData):
+    """Page 3: dimensioned drawing."""
+    add_view_page(pdf, lambda ax: draw_dimensioned_view(ax, data.geometry, data.dimensions,
+                                                        data.bounds, data.scale),
+                  caption=f'{size_caption(data)}  |  Dimensions: {len(data.dimensions)}',
+                  vector=data.vector)
+
+
+def add_labeled_view_page(pdf, data: BlueprintData):
+    """Page 4: labeled dimensions view."""
+    add_view_page(pdf, lambda ax: draw_labeled_view(ax, data.geometry, data.dimensions,
+                                                    data.bounds, data.scale),
+                  caption='LABELED VIEW - See dimension table on next page', vector=data.vector)
+
+
+def add_dimension_table_page(pdf, data: BlueprintData):
+    """Page 5: dimension table for the labeled view."""
+    dim_table = [(f"D{idx + 1}", dim.value, dim.dim_type) for idx, dim in enumerate(data.dimensions)]
+
+    fig5 = plt.figure(figsize=(11, 8.5), facecolor='white')
+
+    fig5.text(0.5, 0.92, data.part_name, ha='center', fontsize=20, fontweight='bold')
+    fig5.text(0.5, 0.87, 'DIMENSION TABLE', ha='center', fontsize=14, color='#666666')
+
+    # Create table data
+    # Split into columns if many dimensions
+    n_dims = len(dim_table)
+    rows_per_col = 20
+
+    # Table headers and data
+    y_start = 0.82
+    x_positions = [0.12, 0.42, 0.72]  # 3 columns
+    row_height = 0.025
+
+    for col_idx, x_pos in enumerate(x_positions):
+        start_idx = col_idx * rows_per_col
+        end_idx = min(start_idx + rows_per_col, n_dims)
+
+        if start_idx >= n_dims:
+            break
+
+        # Column header
+        fig5.text(x_pos, y_start, 'Label', ha='left', fontsize=10, fontweight='bold')
+        fig5.text(x_pos + 0.08, y_start, 'Value', ha='left', fontsize=10, fontweight='bold')
+        fig5.text(x_pos + 0.18, y_start, 'Type', ha='left', fontsize=10, fontweight='bold')
+
+        # Draw header underline
+        fig5.add_artist(plt.Line2D([x_pos - 0.01, x_pos + 0.26], [y_start - 0.008, y_start - 0.008],
+                                    transform=fig5.transFigure, color='black', linewidth=1))
+
+        # Data rows
+        for i, idx in enumerate(range(start_idx, end_idx)):
+            label, value, dim_type = dim_table[idx]
+            y = y_start - (i + 1) * row_height - 0.015
+
+            fig5.text(x_pos, y, label, ha='left', fontsize=9, fontfamily='monospace')
+            fig5.text(x_pos + 0.08, y, format_dim(value), ha='left', fontsize=9,
+                     fontweight='bold', fontfamily='monospace')
+
+            type_str = {'horizontal': 'H', 'vertical': 'V', 'radius': 'R', 'diameter': 'Ø'}.get(dim_type, dim_type)
+            fig5.text(x_pos + 0.18, y, type_str, ha='left', fontsize=9, color='#666666')
+
+    # Summary at bottom
+    fig5.text(0.5, 0.08, f'Total Dimensions: {n_dims}    |    H=Horizontal  V=Vertical  R=Radius  Ø=Diameter',
+              ha='center', fontsize=9, color='#666666')
+
+    border5 = mpatches.Rectangle((0.03, 0.03), 0.94, 0.94,
+                                   fill=False, edgecolor=COLORS['border'],
+                                   linewidth=2, transform=fig5.transFigure)
+    fig5.patches.append(border5)
+
+    pdf.savefig(fig5, facecolor='white')
+    plt.close(fig5)
+
+
+# Blueprint pages in order; each takes (pdf, BlueprintData)
+BLUEPRINT_PAGES = [
+    add_title_page,
+    add_clean_view_page,
+    add_dimensioned_view_page,
+    add_labeled_view_page,
+    add_dimension_table_page,
+]
+
+_page_data: Optional[BlueprintData] = None  # Set in page worker processes
+
+
+def init_page_worker(payload: bytes):
+    """Unpickle the blueprint data once per page worker."""
+    global _page_data
+    _page_data = pickle.loads(payload)
+
+
+def render_page(index: int) -> bytes:
+    """Render one blueprint page to a single-page PDF."""
     from matplotlib.backends.backend_pdf import PdfPages
-    from datetime import datetime
+    buf = io.BytesIO()
+    with PdfPages(buf) as pdf:
+        BLUEPRINT_PAGES[index](pdf, _page_data)
+    return buf.getvalue()
 
-    # Load DXF
-    doc = ezdxf.readfile(input_path)
-    msp = doc.modelspace()
 
-    # Analyze geometry
+def write_blueprint_pdf(data: BlueprintData, output_path: Union[str, BinaryIO], parallel: bool = False,
+                        workers: Optional[int] = None):
+    """Write all blueprint pages to output_path (a path or a binary file object).
+
+    With parallel, pages render concurrently in a process pool. Workers get
+    the pickled BlueprintData once (no DXF re-read) and return single-page
+    PDFs, which are merged in page order with pypdf.
+    """
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    if not parallel:
+        with PdfPages(output_path) as pdf:
+            for add_page in BLUEPRINT_PAGES:
+                add_page(pdf, data)
+        return
+
+    try:
+        from pypdf import PdfReader, PdfWriter
+    except ImportError:
+        raise ImportError("Parallel page rendering needs pypdf: pip install pypdf")
+
+    payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(BLUEPRINT_PAGES)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_page_worker,
+                             initargs=(payload,)) as executor:
+        pages = list(executor.map(render_page, range(len(BLUEPRINT_PAGES))))
+
+    writer = PdfWriter()
+    for page_pdf in pages:
+        writer.append(PdfReader(io.BytesIO(page_pdf)))
+    writer.write(output_path)
+
+
+DIMENSION_TYPES = ('horizontal', 'vertical', 'radius', 'diameter')
+
+
+class AnalysisCache:
+    """On-disk cache of everything derived from a DXF's geometry.
+
+    Entries are .npz files named by the SHA-256 of the DXF content and
+    ANALYSIS_VERSION, holding the GeometryAnalysis features, the dimensions
+    and the rendered geometry path, so a hit skips reading the DXF entirely.
+    Once the directory grows past max_mb, entries from other analysis
+    versions go first, then the least recently used.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, max_mb: float = CACHE_MAX_MB):
+        self.directory = Path(directory)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+
+    @staticmethod
+    def digest(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def entry_path(self, digest: str) -> Path:
+        return self.directory / f"{digest}.v{ANALYSIS_VERSION}.npz"
+
+    def load(self, digest: str) -> Optional[Tuple[GeometryAnalysis, List[Dimension], MplPath]]:
+        """Return (analysis, dimensions, geometry) for a digest, or None on a miss."""
+        path = self.entry_path(digest)
+        try:
+            with np.load(path, allow_pickle=False) as entry:
+                arrays = {name: entry[name] for name in entry.files}
+            os.utime(path)  # Mark as recently used for eviction
+        except Exception:
+            # Missing or unreadable (e.g. truncated) entries are misses
+            return None
+
+        analysis = make_analysis(arrays['bounds'], arrays['segments'], arrays['arcs'],
+                                 arrays['circles'], arrays['unique_x'], arrays['unique_y'])
+        dimensions = [
+            Dimension(x1, y1, x2, y2, value, DIMENSION_TYPES[dim_type], offset, int(priority))
+            for (x1, y1, x2, y2, value, offset, priority), dim_type
+            in zip(arrays['dimensions'].tolist(), arrays['dimension_types'].tolist())
+        ]
+        if len(arrays['path_vertices']):
+            geometry = MplPath(arrays['path_vertices'], arrays['path_codes'])
+        else:
+            geometry = MplPath(np.empty((0, 2)))
+        return analysis, dimensions, geometry
+
+    def store(self, digest: str, analysis: GeometryAnalysis, dimensions: List[Dimension],
+              geometry: MplPath):
+        """Write an entry, then evict down to the size limit. Failures are reported, not raised."""
+        arrays = {
+            'bounds': np.array(analysis.bounds, dtype=float),
+            'segments': np.array([[line['start'], line['end']] for line in analysis.lines],
+                                 dtype=float).reshape(-1, 2, 2),
+            'arcs': np.array([(*arc['center'], arc['radius'], arc['start_angle'], arc['end_angle'])
+                              for arc in analysis.arcs], dtype=float).reshape(-1, 5),
+            'circles': np.array([(*circle['center'], circle['radius']) for circle in analysis.circles],
+                                dtype=float).reshape(-1, 3),
+            'unique_x': np.array(analysis.unique_x, dtype=float),
+            'unique_y': np.array(analysis.unique_y, dtype=float),
+            'dimensions': np.array([(d.x1, d.y1, d.x2, d.y2, d.value, d.offset, d.priority)
+                                    for d in dimensions], dtype=float).reshape(-1, 7),
+            'dimension_types': np.array([DIMENSION_TYPES.index(d.dim_type) for d in dimensions],
+                                        dtype=np.uint8),
+            'path_vertices': np.asarray(geometry.vertices, dtype=float),
+            'path_codes': (np.asarray(geometry.codes, dtype=MplPath.code_type) if geometry.codes is not None
+                           else np.empty(0, dtype=MplPath.code_type)),
+        }
+
+        path = self.entry_path(digest)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp_path, path)  # Atomic, so concurrent batch workers never see partial entries
+        except OSError as e:
+            print(f"Warning: could not write analysis cache entry {path}: {e}")
+            with contextlib.suppress(OSError):
+                tmp_path.unlink()
+            return
+        self.evict()
+
+    def evict(self):
+        """Delete entries until the cache fits in max_bytes; returns the number removed."""
+        entries = []
+        for path in self.directory.glob('*.npz'):
+            with contextlib.suppress(OSError):
+                stat = path.stat()
+                current = path.name.endswith(f".v{ANALYSIS_VERSION}.npz")
+                entries.append((current, stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, _, size, _ in entries)
+        removed = freed = 0
+        # Stale versions first, then oldest
+        for _, _, size, path in sorted(entries, key=lambda entry: entry[:2]):
+            if total <= self.max_bytes:
+                break
+            with contextlib.suppress(OSError):
+                path.unlink()
+                total -= size
+                removed += 1
+                freed += size
+        if removed:
+            print(f"Analysis cache: evicted {removed} entries ({freed / 1024 / 1024:.1f} MB)")
+        return removed
+
+
+def analyze_document(doc) -> Tuple[GeometryAnalysis, List[Dimension], MplPath]:
+    """Analyze a DXF document's modelspace: (analysis, dimensions, rendered geometry)."""
+    msp = doc.modelspace()
     analysis = analyze_geometry(doc, msp)
+    dimensions = generate_smart_dimensions(analysis)
+    # Render the geometry once; every drawing page reuses this path
+    return analysis, dimensions, render_geometry(doc, msp)
+
+
+def make_blueprint_data(analysis: GeometryAnalysis, dimensions: List[Dimension], geometry: MplPath,
+                        part_name: str, thickness: float = 0.5, vector: bool = True,
+                        analysis_cached: bool = False) -> BlueprintData:
+    """Collect what the pages draw from an analysis.
+
+    Geometry too dense for vector pages (see VECTOR_MAX_VERTICES) falls back to raster views.
+    """
+    from datetime import datetime
+
     xmin, ymin, xmax, ymax = analysis.bounds
-    width = xmax - xmin
-    height = ymax - ymin
-    scale = max(width, height)
+    return BlueprintData(
+        part_name=part_name,
+        thickness=thickness,
+        bounds=analysis.bounds,
+        scale=max(xmax - xmin, ymax - ymin),
+        feature_counts=(len(analysis.lines), len(analysis.arcs), len(analysis.circles)),
+        dimensions=dimensions,
+        geometry=geometry,
+        generated=datetime.now().strftime("%Y-%m-%d %H:%M"),
+        vector=vector and len(geometry.vertices) <= VECTOR_MAX_VERTICES,
+        analysis_cached=analysis_cached,
+    )
+
+
+def build_blueprint_data(doc, part_name: str, thickness: float = 0.5,
+                         vector: bool = True) -> BlueprintData:
+    """Analyze a DXF document's modelspace and collect what the pages draw."""
+    return make_blueprint_data(*analyze_document(doc), part_name, thickness, vector)
 
-    # Generate dimensions
-    dimensions = generate_smart_dimensions(analysis)
 
+def default_part_name(filename: str) -> str:
+    """Title-block part name for a file: its stem, upper-cased, underscores as spaces."""
+    return Path(filename).stem.replace('_', ' ').upper()
+
+
+def generate_blueprint(input_path: str, output_path: str, thickness: float = 0.5,
+                       title: Optional[str] = None, vector: bool = True,
+                       parallel_pages: bool = False,
+                       cache: Optional[AnalysisCache] = None) -> BlueprintData:
+    """Generate a multi-page PDF blueprint from a DXF file.
+
+    Args:
+        vector: Draw the part views as vector graphics on the page, unless the
+            geometry exceeds VECTOR_MAX_VERTICES; if False, always render them
+            to 150 dpi images first
+        parallel_pages: Render the pages concurrently in worker processes
+        cache: Reuse the DXF's analysis from this cache, and store it on a miss
+    """
     # Part name
-    part_name = title or Path(input_path).stem.replace('_', ' ').upper()
+    part_name = title or default_part_name(input_path)
+
+    data = blueprint_data(Path(input_path).read_bytes(), part_name, thickness, vector, cache)
 
     # Ensure output is PDF
     output_path = str(output_path)
     if not output_path.lower().endswith('.pdf'):
         output_path = output_path.rsplit('.', 1)[0] + '.pdf'
 
-    with PdfPages(output_path) as pdf:
-        # ========== PAGE 1: Title/Specs Page ==========
-        fig1 = plt.figure(figsize=(11, 8.5), facecolor='white')
-
-        # Title
-        fig1.text(0.5, 0.85, part_name, ha='center', va='center',
-                  fontsize=32, fontweight='bold', color=COLORS['text'])
-
-        fig1.text(0.5, 0.78, 'TECHNICAL DRAWING', ha='center', va='center',
-                  fontsize=14, color='#666666')
-
-        # Specifications box
-        specs = [
-            ('Overall Width', format_dim(width)),
-            ('Overall Height', format_dim(height)),
-            ('Material Thickness', format_dim(thickness)),
-            ('', ''),
-            ('Lines', str(len(analysis.lines))),
-            ('Arcs', str(len(analysis.arcs))),
-            ('Circles', str(len(analysis.circles))),
-            ('', ''),
-            ('Total Dimensions', str(len(dimensions))),
-            ('Scale', '1:1'),
-            ('Units', 'Inches'),
-        ]
+    write_blueprint_pdf(data, output_path, parallel=parallel_pages)
 
-        y_pos = 0.62
-        for label, value in specs:
-            if label:
-                fig1.text(0.35, y_pos, label + ':', ha='right', va='center',
-                          fontsize=12, color='#666666')
-                fig1.text(0.38, y_pos, value, ha='left', va='center',
-                          fontsize=12, fontweight='bold', color=COLORS['text'])
-            y_pos -= 0.04
-
-        # Branding and date
-        fig1.text(0.5, 0.11, 'Pro Plastics Inc.', ha='center', va='center',
-                  fontsize=11, color='#999999')
-        fig1.text(0.5, 0.08, f'Generated: {datetime.now().strftime("%Y-%m-%d %H:%M")}',
-                  ha='center', va='center', fontsize=10, color='#999999')
-
-        # Border
-        border = mpatches.Rectangle((0.03, 0.03), 0.94, 0.94,
-                                      fill=False, edgecolor=COLORS['border'],
-                                      linewidth=2, transform=fig1.transFigure)
-        fig1.patches.append(border)
-
-        pdf.savefig(fig1, facecolor='white')
-        plt.close(fig1)
-
-        # ========== PAGE 2: Clean Part View ==========
-        # Render geometry to image first, then place on consistent page
-        fig2_render = plt.figure(figsize=(10, 8), facecolor='white')
-        ax_clean = fig2_render.add_subplot(111)
-
-        ctx_clean = RenderContext(doc)
-        out_clean = MatplotlibBackend(ax_clean)
-        Frontend(ctx_clean, out_clean).draw_layout(msp, finalize=True)
-
-        # Style clean view
-        ax_clean.set_facecolor('white')
-        for line in ax_clean.get_lines():
-            line.set_color(COLORS['geometry'])
-            line.set_linewidth(2)
-        for coll in ax_clean.collections:
-            coll.set_edgecolor(COLORS['geometry'])
-            coll.set_facecolor('none')
-            coll.set_linewidth(2)
-        for patch in ax_clean.patches:
-            patch.set_edgecolor(COLORS['geometry'])
-            patch.set_facecolor('none')
-            patch.set_linewidth(2)
-
-        margin = max(width, height) * 0.1
-        ax_clean.set_xlim(xmin - margin, xmax + margin)
-        ax_clean.set_ylim(ymin - margin, ymax + margin)
-        ax_clean.set_aspect('equal')
-        ax_clean.axis('off')
-
-        img2 = render_figure_to_image(fig2_render)
-        plt.close(fig2_render)
-
-        add_image_to_page(pdf, img2, caption=f'Size: {format_dim(width)} × {format_dim(height)} × {format_dim(thickness)} thick')
-
-        # ========== PAGE 3: Dimensioned Drawing ==========
-        # Render to image first
-        fig3_render = plt.figure(figsize=(10, 8), facecolor='white')
-        ax = fig3_render.add_subplot(111)
-
-        # Render DXF geometry
-        ctx = RenderContext(doc)
-        out = MatplotlibBackend(ax)
-        Frontend(ctx, out).draw_layout(msp, finalize=True)
-
-        # Style geometry as black lines
-        ax.set_facecolor('white')
-
-        for line in ax.get_lines():
-            line.set_color(COLORS['geometry'])
-            line.set_linewidth(1.5)
-
-        for coll in ax.collections:
-            coll.set_edgecolor(COLORS['geometry'])
-            coll.set_facecolor('none')
-            coll.set_linewidth(1.5)
-
-        for patch in ax.patches:
-            patch.set_edgecolor(COLORS['geometry'])
-            patch.set_facecolor('none')
-            patch.set_linewidth(1.5)
-
-        # Draw dimensions
-        for dim in dimensions:
-            if dim.dim_type in ['horizontal', 'vertical']:
-                draw_dimension_line(ax, dim.x1, dim.y1, dim.x2, dim.y2,
-                                  dim.offset, dim.dim_type, dim.value, scale)
-            elif dim.dim_type == 'radius':
-                draw_radius_dimension(ax, dim.x1, dim.y1, dim.value, scale)
-            elif dim.dim_type == 'diameter':
-                draw_diameter_dimension(ax, dim.x1, dim.y1, dim.value, scale)
-
-        # Dynamically calculate margins based on dimension positions
-        min_dim_x = xmin
-        max_dim_x = xmax
-        min_dim_y = ymin
-        max_dim_y = ymax
-
-        for dim in dimensions:
-            if dim.dim_type == 'horizontal':
-                dim_y = dim.y1 + dim.offset * scale
-                min_dim_y = min(min_dim_y, dim_y)
-                max_dim_y = max(max_dim_y, dim_y)
-            elif dim.dim_type == 'vertical':
-                dim_x = dim.x1 + dim.offset * scale
-                min_dim_x = min(min_dim_x, dim_x)
-                max_dim_x = max(max_dim_x, dim_x)
-
-        margin = max(max_dim_x - min_dim_x, max_dim_y - min_dim_y) * 0.08
-        ax.set_xlim(min_dim_x - margin, max_dim_x + margin)
-        ax.set_ylim(min_dim_y - margin, max_dim_y + margin)
-        ax.set_aspect('equal')
-        ax.axis('off')
-
-        img3 = render_figure_to_image(fig3_render)
-        plt.close(fig3_render)
-
-        add_image_to_page(pdf, img3, caption=f'Size: {format_dim(width)} × {format_dim(height)} × {format_dim(thickness)} thick  |  Dimensions: {len(dimensions)}')
-
-        # ========== PAGE 4: Labeled Dimensions View ==========
-        # Render to image first
-        fig4_render = plt.figure(figsize=(10, 8), facecolor='white')
-        ax4 = fig4_render.add_subplot(111)
-
-        # Render DXF geometry
-        ctx4 = RenderContext(doc)
-        out4 = MatplotlibBackend(ax4)
-        Frontend(ctx4, out4).draw_layout(msp, finalize=True)
-
-        # Style geometry - set low z-order so dimensions draw on top
-        ax4.set_facecolor('white')
-        for line in ax4.get_lines():
-            line.set_color(COLORS['geometry'])
-            line.set_linewidth(1.5)
-            line.set_zorder(1)
-        for coll in ax4.collections:
-            coll.set_edgecolor(COLORS['geometry'])
-            coll.set_facecolor('none')
-            coll.set_linewidth(1.5)
-            coll.set_zorder(1)
-        for patch in ax4.patches:
-            patch.set_edgecolor(COLORS['geometry'])
-            patch.set_facecolor('none')
-            patch.set_linewidth(1.5)
-            patch.set_zorder(1)
-
-        # Draw dimensions with labels (D1, D2, etc.) instead of values
-        # Use collision avoidance to prevent overlapping labels
-        dim_table = []
-        placed_labels = []  # Track (x, y) of placed labels
-
-        def find_clear_position_with_offset(dim, dim_type, line_fractions, offset_multipliers):
-            """Find a position that doesn't overlap, trying different offsets and line positions.
-
-            Returns: (label_x, label_y, offset_multiplier, line_fraction)
-            """
-            min_dist = scale * 0.06  # Minimum distance between labels
-
-            # Try each offset multiplier, then each position along the line
-            for offset_mult in offset_multipliers:
-                for frac in line_fractions:
-                    if dim_type == 'horizontal':
-                        yo = dim.y1 + dim.offset * offset_mult * scale
-                        test_x = dim.x1 + (dim.x2 - dim.x1) * frac
-                        test_y = yo
-                    elif dim_type == 'vertical':
-                        xo = dim.x1 + dim.offset * offset_mult * scale
-                        test_x = xo
-                        test_y = dim.y1 + (dim.y2 - dim.y1) * frac
-
-                    is_clear = True
-                    for px, py in placed_labels:
-                        dist = np.sqrt((test_x - px)**2 + (test_y - py)**2)
-                        if dist < min_dist:
-                            is_clear = False
-                            break
-
-                    if is_clear:
-                        if dim_type == 'horizontal':
-                            return test_x, test_y, offset_mult, test_x
-                        else:
-                            return test_x, test_y, offset_mult, test_y
-
-            # Default: first position
-            if dim_type == 'horizontal':
-                yo = dim.y1 + dim.offset * scale
-                return dim.x1 + (dim.x2 - dim.x1) * 0.5, yo, 1.0, dim.x1 + (dim.x2 - dim.x1) * 0.5
-            else:
-                xo = dim.x1 + dim.offset * scale
-                return xo, dim.y1 + (dim.y2 - dim.y1) * 0.5, 1.0, dim.y1 + (dim.y2 - dim.y1) * 0.5
+    xmin, ymin, xmax, ymax = data.bounds
+    print(f"\nBlueprint generated: {output_path}")
+    print(f"  Part: {part_name}")
+    print(f"  Size: {format_dim(xmax - xmin)} × {format_dim(ymax - ymin)} × {format_dim(thickness)} thick")
+    print("  Features: {} lines, {} arcs, {} circles".format(*data.feature_counts))
+    print(f"  Dimensions: {len(data.dimensions)}")
+    print(f"  Views: {'vector' if data.vector else 'raster'} ({len(data.geometry.vertices)} path vertices)")
+    if cache is not None:
+        print(f"  Analysis cache: {'hit' if data.analysis_cached else 'miss'}")
+    return data
+
+
+# Part views that blueprint_png can render; each draws (ax, BlueprintData)
+BLUEPRINT_VIEWS = {
+    'clean': lambda ax, data: draw_clean_view(ax, data.geometry, data.bounds),
+    'dimensioned': lambda ax, data: draw_dimensioned_view(ax, data.geometry, data.dimensions,
+                                                          data.bounds, data.scale),
+    'labeled': lambda ax, data: draw_labeled_view(ax, data.geometry, data.dimensions,
+                                                  data.bounds, data.scale),
+}
 
-        line_fractions = [0.5, 0.3, 0.7, 0.2, 0.8, 0.15, 0.85]
-        offset_multipliers = [1.0, 1.4, 1.8, 2.2, 2.6]
 
-        for idx, dim in enumerate(dimensions):
-            label = f"D{idx + 1}"
-            dim_table.append((label, dim.value, dim.dim_type))
+def read_dxf_bytes(content: bytes):
+    """Load an ASCII or binary DXF document from bytes without a temp file."""
+    from ezdxf.document import Drawing
+    from ezdxf.filemanagement import dxf_stream_info
+    from ezdxf.lldxf.tagger import binary_tags_loader
 
-            if dim.dim_type == 'horizontal':
-                lx, ly, offset_mult, label_pos = find_clear_position_with_offset(
-                    dim, 'horizontal', line_fractions, offset_multipliers)
-                draw_labeled_dimension_at(ax4, dim.x1, dim.y1, dim.x2, dim.y2,
-                                         dim.offset, 'horizontal', label, scale, label_pos, offset_mult)
-                placed_labels.append((lx, ly))
-
-            elif dim.dim_type == 'vertical':
-                lx, ly, offset_mult, label_pos = find_clear_position_with_offset(
-                    dim, 'vertical', line_fractions, offset_multipliers)
-                draw_labeled_dimension_at(ax4, dim.x1, dim.y1, dim.x2, dim.y2,
-                                         dim.offset, 'vertical', label, scale, label_pos, offset_mult)
-                placed_labels.append((lx, ly))
-
-            elif dim.dim_type == 'radius':
-                # Try different angles for radius label
-                cx, cy = dim.x1, dim.y1
-                r = dim.value
-                angles = [45, 135, 225, 315, 30, 60, 120, 150, 210, 240, 300, 330]
-                min_dist = scale * 0.06
-                best_angle = angles[0]
-                for angle in angles:
-                    test_x = cx + r * 1.3 * np.cos(np.radians(angle))
-                    test_y = cy + r * 1.3 * np.sin(np.radians(angle))
-                    is_clear = True
-                    for px, py in placed_labels:
-                        dist = np.sqrt((test_x - px)**2 + (test_y - py)**2)
-                        if dist < min_dist:
-                            is_clear = False
-                            break
-                    if is_clear:
-                        best_angle = angle
-                        break
-                lx = cx + r * 1.3 * np.cos(np.radians(best_angle))
-                ly = cy + r * 1.3 * np.sin(np.radians(best_angle))
-                draw_labeled_radius_at(ax4, cx, cy, r, label, scale, best_angle)
-                placed_labels.append((lx, ly))
-
-            elif dim.dim_type == 'diameter':
-                draw_labeled_diameter(ax4, dim.x1, dim.y1, dim.value, label, scale)
-                placed_labels.append((dim.x1, dim.y1 + dim.value/2 + scale * 0.02))
-
-        # Set view - use placed_labels to find actual extent
-        min_dim_x = xmin
-        max_dim_x = xmax
-        min_dim_y = ymin
-        max_dim_y = ymax
-        for lx, ly in placed_labels:
-            min_dim_x = min(min_dim_x, lx)
-            max_dim_x = max(max_dim_x, lx)
-            min_dim_y = min(min_dim_y, ly)
-            max_dim_y = max(max_dim_y, ly)
-
-        text_padding = scale * 0.15
-        ax4.set_xlim(min_dim_x - text_padding, max_dim_x + text_padding)
-        ax4.set_ylim(min_dim_y - text_padding, max_dim_y + text_padding)
-        ax4.set_aspect('equal')
-        ax4.axis('off')
-
-        img4 = render_figure_to_image(fig4_render)
-        plt.close(fig4_render)
-
-        add_image_to_page(pdf, img4, caption='LABELED VIEW - See dimension table on next page')
-
-        # ========== PAGE 5: Dimension Table ==========
-        fig5 = plt.figure(figsize=(11, 8.5), facecolor='white')
-
-        fig5.text(0.5, 0.92, part_name, ha='center', fontsize=20, fontweight='bold')
-        fig5.text(0.5, 0.87, 'DIMENSION TABLE', ha='center', fontsize=14, color='#666666')
-
-        # Create table data
-        # Split into columns if many dimensions
-        n_dims = len(dim_table)
-        cols_per_section = 3
-        rows_per_col = 20
-
-        # Table headers and data
-        y_start = 0.82
-        x_positions = [0.12, 0.42, 0.72]  # 3 columns
-        row_height = 0.025
-
-        for col_idx, x_pos in enumerate(x_positions):
-            start_idx = col_idx * rows_per_col
-            end_idx = min(start_idx + rows_per_col, n_dims)
-
-            if start_idx >= n_dims:
-                break
+    if content[:22] == b"AutoCAD Binary DXF\r\n\x1a\x00":
+        return Drawing.load(binary_tags_loader(content))
 
-            # Column header
-            fig5.text(x_pos, y_start, 'Label', ha='left', fontsize=10, fontweight='bold')
-            fig5.text(x_pos + 0.08, y_start, 'Value', ha='left', fontsize=10, fontweight='bold')
-            fig5.text(x_pos + 0.18, y_start, 'Type', ha='left', fontsize=10, fontweight='bold')
+    # Pre-R2007 files declare their code page in the header section
+    header_end = content.find(b'ENDSEC')
+    header = content[:header_end + len(b'ENDSEC')] + b'\n' if header_end >= 0 else content
+    info = dxf_stream_info(io.StringIO(header.decode('utf-8', errors='ignore')))
+    return ezdxf.read(io.StringIO(content.decode(info.encoding, errors='surrogateescape')))
 
-            # Draw header underline
-            fig5.add_artist(plt.Line2D([x_pos - 0.01, x_pos + 0.26], [y_start - 0.008, y_start - 0.008],
-                                        transform=fig5.transFigure, color='black', linewidth=1))
 
-            # Data rows
-            for i, idx in enumerate(range(start_idx, end_idx)):
-                label, value, dim_type = dim_table[idx]
-                y = y_start - (i + 1) * row_height - 0.015
+def blueprint_data(source, part_name: str, thickness: float = 0.5, vector: bool = True,
+                   cache: Optional[AnalysisCache] = None) -> BlueprintData:
+    """BlueprintData for DXF bytes, an ezdxf document or existing BlueprintData.
 
-                fig5.text(x_pos, y, label, ha='left', fontsize=9, fontfamily='monospace')
-                fig5.text(x_pos + 0.08, y, format_dim(value), ha='left', fontsize=9,
-                         fontweight='bold', fontfamily='monospace')
+    With a cache, the analysis of DXF bytes is looked up by content hash first.
+    """
+    if isinstance(source, BlueprintData):
+        return source
+    if not isinstance(source, (bytes, bytearray, memoryview)):
+        return build_blueprint_data(source, part_name, thickness, vector)
+
+    content = bytes(source)
+    if cache is None:
+        return build_blueprint_data(read_dxf_bytes(content), part_name, thickness, vector)
+
+    digest = cache.digest(content)
+    cached = cache.load(digest)
+    if cached:
+        return make_blueprint_data(*cached, part_name, thickness, vector, analysis_cached=True)
+    analysis = analyze_document(read_dxf_bytes(content))
+    cache.store(digest, *analysis)
+    return make_blueprint_data(*analysis, part_name, thickness, vector)
+
+
+def blueprint_pdf(source, part_name: str = 'PART', thickness: float = 0.5,
+                  vector: bool = True, parallel: bool = False) -> bytes:
+    """Generate the multi-page blueprint PDF in memory.
+
+    source is DXF bytes, an ezdxf document or BlueprintData from
+    blueprint_data() (to render the PDF and PNG views from one analysis).
+    """
+    data = blueprint_data(source, part_name, thickness, vector)
+    buf = io.BytesIO()
+    write_blueprint_pdf(data, buf, parallel=parallel)
+    return buf.getvalue()
 
-                type_str = {'horizontal': 'H', 'vertical': 'V', 'radius': 'R', 'diameter': 'Ø'}.get(dim_type, dim_type)
-                fig5.text(x_pos + 0.18, y, type_str, ha='left', fontsize=9, color='#666666')
 
-        # Summary at bottom
-        fig5.text(0.5, 0.08, f'Total Dimensions: {n_dims}    |    H=Horizontal  V=Vertical  R=Radius  Ø=Diameter',
-                  ha='center', fontsize=9, color='#666666')
+def blueprint_png(source, part_name: str = 'PART', thickness: float = 0.5,
+                  view: str = 'dimensioned', dpi: int = 150) -> bytes:
+    """Render one part view ('clean', 'dimensioned' or 'labeled') to PNG bytes."""
+    if view not in BLUEPRINT_VIEWS:
+        raise ValueError(f"Unknown view {view!r}; expected one of {sorted(BLUEPRINT_VIEWS)}")
+    data = blueprint_data(source, part_name, thickness)
+    fig = view_figure(lambda ax: BLUEPRINT_VIEWS[view](ax, data))
+    try:
+        return render_figure_png(fig, dpi)
+    finally:
+        plt.close(fig)
 
-        border5 = mpatches.Rectangle((0.03, 0.03), 0.94, 0.94,
-                                       fill=False, edgecolor=COLORS['border'],
-                                       linewidth=2, transform=fig5.transFigure)
-        fig5.patches.append(border5)
 
-        pdf.savefig(fig5, facecolor='white')
-        plt.close(fig5)
+@dataclass
+class BlueprintJob:
+    """One blueprint to generate in batch mode."""
+    input_path: str
+    output_path: str
+    thickness: float = 0.5
+    title: Optional[str] = None
+    vector: bool = True
 
-    print(f"\nBlueprint generated: {output_path}")
-    print(f"  Part: {part_name}")
-    print(f"  Size: {format_dim(width)} × {format_dim(height)} × {format_dim(thickness)} thick")
-    print(f"  Features: {len(analysis.lines)} lines, {len(analysis.arcs)} arcs, {len(analysis.circles)} circles")
-    print(f"  Dimensions: {len(dimensions)}")
+
+@dataclass
+class BatchResult:
+    """Outcome of one batch job."""
+    job: BlueprintJob
+    seconds: float
+    error: Optional[str] = None
+    cache_hit: bool = False
+
+
+def is_batch_source(source: str) -> bool:
+    """True if source is a directory, a glob pattern or a CSV manifest rather than one DXF."""
+    return (Path(source).is_dir() or glob.has_magic(source)
+            or source.lower().endswith('.csv'))
+
+
+def collect_jobs(source: str, output_dir: Optional[str], thickness: float,
+                 vector: bool = True) -> List[BlueprintJob]:
+    """Build batch jobs from a directory of DXFs, a glob pattern or a CSV manifest.
+
+    The manifest needs a 'file' column and may have 'thickness', 'title' and
+    'output' columns; relative paths are resolved against the manifest's
+    directory. Blueprints are written to output_dir, or next to each DXF.
+    """
+    def output_for(input_path: Path) -> str:
+        directory = Path(output_dir) if output_dir else input_path.parent
+        return str(directory / f"{input_path.stem}_blueprint.pdf")
+
+    if source.lower().endswith('.csv') and not glob.has_magic(source):
+        base = Path(source).parent
+        jobs = []
+        with open(source, newline='') as f:
+            for row in csv.DictReader(f):
+                input_path = base / row['file'].strip()
+                output = (row.get('output') or '').strip()
+                jobs.append(BlueprintJob(
+                    input_path=str(input_path),
+                    output_path=str(base / output) if output else output_for(input_path),
+                    thickness=float(row.get('thickness') or thickness),
+                    title=(row.get('title') or '').strip() or None,
+                    vector=vector,
+                ))
+        return jobs
+
+    if Path(source).is_dir():
+        paths = sorted(p for p in Path(source).iterdir() if p.suffix.lower() == '.dxf')
+    else:
+        paths = sorted(Path(p) for p in glob.glob(source))
+    return [BlueprintJob(str(p), output_for(p), thickness, vector=vector) for p in paths]
+
+
+def init_batch_worker():
+    """Prime a worker once so every job it runs skips font and renderer setup."""
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    msp.add_line((0, 0), (1, 0))
+    msp.add_text('0', dxfattribs={'height': 0.1})
+    render_geometry(doc, msp)
+
+    fig = plt.figure(figsize=(1, 1))
+    fig.text(0.5, 0.5, '0.00" D1', fontweight='bold')
+    render_figure_to_image(fig)
+    plt.close(fig)
+
+
+def run_job(job: BlueprintJob, cache: Optional[AnalysisCache] = None) -> BatchResult:
+    """Generate one blueprint, capturing its console output and any error."""
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            data = generate_blueprint(job.input_path, job.output_path, thickness=job.thickness,
+                                      title=job.title, vector=job.vector, cache=cache)
+    except Exception as e:
+        return BatchResult(job, time.perf_counter() - start, f"{type(e).__name__}: {e}")
+    return BatchResult(job, time.perf_counter() - start, cache_hit=data.analysis_cached)
+
+
+def run_batch(jobs: List[BlueprintJob], workers: Optional[int] = None,
+              cache: Optional[AnalysisCache] = None) -> List[BatchResult]:
+    """Generate blueprints for all jobs across a process pool, printing progress and a summary."""
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    print(f"Generating {len(jobs)} blueprints with {workers} workers")
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_batch_worker) as executor:
+        futures = [executor.submit(run_job, job, cache) for job in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            status = f"FAILED ({result.error})" if result.error else result.job.output_path
+            print(f"  [{len(results)}/{len(jobs)}] {Path(result.job.input_path).name}: "
+                  f"{result.seconds:.2f}s  {status}")
+    elapsed = time.perf_counter() - start
+
+    failed = [r for r in results if r.error]
+    busy = sum(r.seconds for r in results)
+    print(f"\nBatch complete: {len(results) - len(failed)} generated, {len(failed)} failed "
+          f"in {elapsed:.1f}s ({len(results) / elapsed * 60:.1f} parts/min, "
+          f"{busy / len(results):.2f}s per part)")
+    if cache is not None:
+        hits = sum(1 for r in results if r.cache_hit)
+        print(f"Analysis cache: {hits} hits, {len(results) - len(failed) - hits} misses")
+    for r in sorted(failed, key=lambda r: r.job.input_path):
+        print(f"  FAILED {r.job.input_path}: {r.error}")
+    return results
 
 
 def main():
@@ -1175,15 +1985,49 @@ Examples:
   %(prog)s part.dxf
   %(prog)s part.dxf output.png --thickness 0.25
   %(prog)s part.dxf --title "Widget Assembly"
+
+Batch mode (input is a directory, glob pattern or CSV manifest):
+  %(prog)s kit/ blueprints/
+  %(prog)s "kit/*.dxf" --workers 4
+  %(prog)s kit/manifest.csv        # columns: file, thickness, title, output
         '''
     )
-    parser.add_argument('input', help='Input DXF file path')
-    parser.add_argument('output', nargs='?', help='Output PNG file path (default: input_blueprint.png)')
+    parser.add_argument('input', help='Input DXF file path, or a directory, glob or CSV manifest for batch mode')
+    parser.add_argument('output', nargs='?',
+                        help='Output PNG file path (default: input_blueprint.png); '
+                             'output directory in batch mode (default: next to each input)')
     parser.add_argument('--thickness', '-t', type=float, default=0.5,
                         help='Material thickness in inches (default: 0.5)')
     parser.add_argument('--title', help='Part title (default: filename)')
+    parser.add_argument('--raster', action='store_true',
+                        help='Always embed the part views as 150 dpi images (default: vector graphics, '
+                             f'or images above {VECTOR_MAX_VERTICES} path vertices)')
+    parser.add_argument('--parallel-pages', action='store_true',
+                        help='Render the pages concurrently in worker processes')
+    parser.add_argument('--workers', '-j', type=int,
+                        help='Worker processes in batch mode (default: CPU count)')
+    parser.add_argument('--cache-dir', default=CACHE_DIR,
+                        help=f'Analysis cache directory (default: {CACHE_DIR})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Analyze the DXF even if a cached analysis exists, and do not store one')
 
     args = parser.parse_args()
+    cache = None if args.no_cache else AnalysisCache(args.cache_dir)
+
+    if is_batch_source(args.input):
+        # Batch mode already renders one file per CPU; titles come from the manifest
+        if args.parallel_pages:
+            parser.error('--parallel-pages cannot be used in batch mode')
+        if args.title:
+            parser.error('--title cannot be used in batch mode; set titles in a CSV manifest')
+        jobs = collect_jobs(args.input, args.output, args.thickness, vector=not args.raster)
+        if not jobs:
+            print(f"Error: No DXF files found for: {args.input}")
+            sys.exit(1)
+        if args.output:
+            Path(args.output).mkdir(parents=True, exist_ok=True)
+        results = run_batch(jobs, args.workers, cache)
+        sys.exit(1 if any(r.error for r in results) else 0)
 
     input_path = Path(args.input)
     if not input_path.exists():
@@ -1197,10 +2041,10 @@ Examples:
 
     try:
         generate_blueprint(str(input_path), str(output_path),
-                          thickness=args.thickness, title=args.title)
+                          thickness=args.thickness, title=args.title, vector=not args.raster,
+                          parallel_pages=args.parallel_pages, cache=cache)
     except Exception as e:
         print(f"Error generating blueprint: {e}")
-        import traceback
         traceback.print_exc()
         sys.exit(1)
 